@@ -0,0 +1,71 @@
+"""
+Batch Interaction Screening Benchmark
+Compares looping check_interactions over many regimens with check_interactions_batch
+
+Run from the repository root:
+    python -m benchmarks.batch_screening_benchmark [regimen_count] [catalog_size] [pair_count]
+"""
+
+import random
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.synthetic_catalog import generate_catalog, generate_interaction_rows
+from data.drug_database import DrugDatabase
+from models.drug_interaction import DrugInteractionChecker
+
+
+def _build_checker(catalog, pair_count: int, compressed: bool) -> DrugInteractionChecker:
+    drug_db = DrugDatabase()
+    drug_db.bulk_add_drugs(catalog)
+    checker = DrugInteractionChecker(resolver=drug_db.resolver)
+    names = list(catalog)
+    rows = [(names[drug1_id], names[drug2_id], severity, description, recommendation)
+            for drug1_id, drug2_id, severity, description, recommendation
+            in generate_interaction_rows(len(names), pair_count)]
+    if compressed:
+        checker.load_interactions(rows)
+    else:
+        for row in rows:
+            checker.add_interaction(*row)
+    return checker
+
+
+def run(regimen_count: int = 10_000, size: int = 5_000, pair_count: int = 200_000) -> None:
+    catalog = generate_catalog(size)
+    rng = random.Random(3)
+    names = list(catalog)
+    # Mix canonical keys with brand names, as prescriptions do
+    regimens = [[rng.choice(names) if rng.random() < 0.8 else catalog[rng.choice(names)]['brand_names'][0]
+                 for _ in range(rng.randint(3, 12))] for _ in range(regimen_count)]
+
+    print(f"{regimen_count:,} regimens, {size:,} drugs, {pair_count:,} interaction rows")
+    for label, compressed in (('adjacency', False), ('csr', True)):
+        checker = _build_checker(catalog, pair_count, compressed)
+
+        # The pair table is built once and cached until the next write
+        start = time.perf_counter()
+        checker.interactions.pair_table()
+        table_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        looped = [checker.check_interactions(regimen) for regimen in regimens]
+        loop_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batch = checker.check_interactions_batch(regimens)
+        batch_seconds = time.perf_counter() - start
+
+        assert len(batch.regimen) == sum(len(found) for found in looped)
+        assert np.array_equal(np.bincount(batch.regimen, minlength=regimen_count),
+                              [len(found) for found in looped])
+        print(f"  {label:<10} loop {loop_seconds * 1000:8.1f} ms  batch {batch_seconds * 1000:7.1f} ms  "
+              f"speedup {loop_seconds / batch_seconds:5.1f}x  (pair table {table_ms:.1f} ms, "
+              f"{len(batch.regimen):,} interacting pairs)")
+
+
+if __name__ == "__main__":
+    arguments = [int(argument) for argument in sys.argv[1:4]]
+    run(*arguments)
@@ -0,0 +1,92 @@
+"""
+Interaction Store Memory Benchmark
+Compares the memory held by the original pair dict, the adjacency store and
+the compressed sparse row store for a large imported interaction set
+
+Run from the repository root:
+    python -m benchmarks.interaction_store_benchmark [pair_count] [drug_count]
+"""
+
+import gc
+import random
+import sys
+import time
+import tracemalloc
+
+from benchmarks.synthetic_catalog import generate_interaction_rows
+from models.interaction_store import (AdjacencyInteractionStore, CSRInteractionStore, InteractionRecord,
+                                      severity_code)
+
+
+def _drug_key(drug_id: int) -> str:
+    return f"drug_{drug_id}"
+
+
+def _build_pair_dict(rows):
+    """The original interaction_database format: (drug1, drug2) -> interaction dict"""
+    interactions = {}
+    for drug1_id, drug2_id, severity, description, recommendation in rows:
+        interactions[(_drug_key(drug1_id), _drug_key(drug2_id))] = {
+            'severity': severity,
+            'description': description,
+            'recommendation': recommendation
+        }
+    return interactions
+
+
+def _build_adjacency(rows):
+    store = AdjacencyInteractionStore()
+    for drug1_id, drug2_id, severity, description, recommendation in rows:
+        record = InteractionRecord(_drug_key(drug1_id), _drug_key(drug2_id), severity_code(severity),
+                                   description, recommendation)
+        store.put(drug1_id, drug2_id, record)
+    return store
+
+
+def _build_csr(rows):
+    return CSRInteractionStore.build(_drug_key, (
+        (drug1_id, drug2_id, severity_code(severity), description, recommendation)
+        for drug1_id, drug2_id, severity, description, recommendation in rows
+    ))
+
+
+def _measure(build, rows):
+    """Build a store from rows and return (store, seconds, MB retained)"""
+    gc.collect()
+    gc.disable()
+    tracemalloc.start()
+    start = time.perf_counter()
+    store = build(rows)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    gc.enable()
+    return store, elapsed, retained / (1024 * 1024)
+
+
+def _regimen_lookup_us(store, drug_count: int, regimens: int = 2000) -> float:
+    rng = random.Random(7)
+    samples = [rng.sample(range(drug_count), 10) for _ in range(regimens)]
+    start = time.perf_counter()
+    for regimen in samples:
+        store.find_in_regimen(regimen)
+    return (time.perf_counter() - start) / regimens * 1_000_000
+
+
+def run(pair_count: int = 1_000_000, drug_count: int = 50_000) -> None:
+    print(f"{pair_count:,} interaction rows over {drug_count:,} drugs")
+
+    # CSR first: tracemalloc slows down for a while after tracing a large heap
+    for label, build in (('csr', _build_csr), ('adjacency', _build_adjacency), ('pair dict', _build_pair_dict)):
+        store, seconds, megabytes = _measure(build, generate_interaction_rows(drug_count, pair_count))
+        line = f"  {label:<10} {len(store):>10,} pairs  {megabytes:8.1f} MB  built in {seconds:6.1f} s"
+        if hasattr(store, 'find_in_regimen'):
+            line += f"  10-drug regimen {_regimen_lookup_us(store, drug_count):6.1f} us"
+        print(line)
+        del store
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 50_000)
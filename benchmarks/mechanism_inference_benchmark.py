@@ -0,0 +1,60 @@
+"""
+Mechanism Inference Benchmark
+Compares the enzyme posting-list join with comparing the enzyme profiles of every drug pair
+
+Run from the repository root:
+    python -m benchmarks.mechanism_inference_benchmark [catalog_size] [naive_size]
+"""
+
+import sys
+import time
+
+from benchmarks.synthetic_catalog import generate_catalog
+from models.mechanism_inference import PERPETRATOR_EFFECTS, EnzymeRoleIndex
+
+
+def _naive_pairs(profiles):
+    """Check both directions of every drug pair for a perpetrator/substrate match"""
+    pairs = set()
+    for i in range(len(profiles)):
+        for j in range(i + 1, len(profiles)):
+            for perpetrator, victim in ((profiles[i], profiles[j]), (profiles[j], profiles[i])):
+                if any('substrate' in victim.get(enzyme, ()) and any(role in PERPETRATOR_EFFECTS for role in roles)
+                       for enzyme, roles in perpetrator.items()):
+                    pairs.add((i, j))
+    return pairs
+
+
+def _index(profiles) -> EnzymeRoleIndex:
+    index = EnzymeRoleIndex()
+    for drug_id, profile in enumerate(profiles):
+        index.add(drug_id, profile)
+    return index
+
+
+def run(size: int = 10_000, naive_size: int = 2_000) -> None:
+    catalog = generate_catalog(size)
+    profiles = [record.get('enzyme_roles', {}) for record in catalog.values()]
+    print(f"{size:,} drugs, {sum(1 for profile in profiles if profile):,} with enzyme roles")
+
+    start = time.perf_counter()
+    index = _index(profiles)
+    inferred = index.infer()
+    join_seconds = time.perf_counter() - start
+    print(f"  posting join   {join_seconds * 1000:9.1f} ms  {len(inferred):,} inferred pairs "
+          f"({index.get_stats()['entries']:,} index entries)")
+
+    # The all-pairs comparison is quadratic, so time it on a prefix and scale up
+    subset = profiles[:naive_size]
+    start = time.perf_counter()
+    naive = _naive_pairs(subset)
+    naive_seconds = time.perf_counter() - start
+    assert naive == set(_index(subset).infer())
+    estimate = naive_seconds * (size * (size - 1)) / (naive_size * (naive_size - 1))
+    print(f"  all pairs      {naive_seconds * 1000:9.1f} ms  on {naive_size:,} drugs "
+          f"(~{estimate:.1f} s estimated for {size:,}, {estimate / join_seconds:,.0f}x slower)")
+
+
+if __name__ == "__main__":
+    arguments = [int(argument) for argument in sys.argv[1:3]]
+    run(*arguments)
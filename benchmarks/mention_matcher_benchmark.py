@@ -0,0 +1,67 @@
+"""
+Mention Matcher Benchmark
+Compares the Aho-Corasick drug mention matcher with one regex alternation of every catalog name
+
+Run from the repository root:
+    python -m benchmarks.mention_matcher_benchmark [text_count] [catalog_size]
+"""
+
+import random
+import re
+import sys
+import time
+
+from benchmarks.synthetic_catalog import generate_catalog
+from data.drug_database import DrugDatabase
+from data.mention_matcher import MIN_TERM_LENGTH
+from data.name_resolver import drug_aliases
+
+_FILLER = ['patient', 'takes', 'daily', 'twice', 'with', 'food', 'mg', 'tablet', 'and', 'history', 'of',
+           'continue', 'stop', 'start', 'reports', 'nausea', 'dose', 'increased', 'to', 'at', 'night']
+
+
+def run(text_count: int = 500, size: int = 10_000) -> None:
+    catalog = generate_catalog(size)
+    drug_db = DrugDatabase()
+
+    start = time.perf_counter()
+    drug_db.bulk_add_drugs(catalog)
+    drug_db.find_drug_mentions('')
+    build_seconds = time.perf_counter() - start
+
+    names = sorted({alias for drug_key, drug_data in catalog.items()
+                    for alias in drug_aliases(drug_key, drug_data)[0] if len(alias) >= MIN_TERM_LENGTH},
+                   key=len, reverse=True)
+    start = time.perf_counter()
+    alternation = re.compile(r'\b(?:' + '|'.join(re.escape(name) for name in names) + r')\b', re.IGNORECASE)
+    compile_seconds = time.perf_counter() - start
+
+    rng = random.Random(5)
+    drug_names = list(catalog)
+    texts = []
+    for _ in range(text_count):
+        words = [rng.choice(_FILLER) for _ in range(rng.randint(30, 80))]
+        for _ in range(rng.randint(1, 6)):
+            words.insert(rng.randrange(len(words)), rng.choice(drug_names).replace('_', ' ').title())
+        texts.append(' '.join(words))
+    characters = sum(len(text) for text in texts)
+
+    start = time.perf_counter()
+    automaton_hits = sum(len(drug_db.find_drug_mentions(text)) for text in texts)
+    automaton_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    regex_hits = sum(len(alternation.findall(text)) for text in texts)
+    regex_seconds = time.perf_counter() - start
+
+    print(f"{size:,} drugs, {len(names):,} names, {text_count:,} texts ({characters:,} characters)")
+    print(f"  automaton      build {build_seconds:6.2f} s (with catalog load)  "
+          f"match {automaton_seconds * 1e3 / text_count:7.3f} ms/text  {automaton_hits:,} mentions")
+    print(f"  regex          build {compile_seconds:6.2f} s  "
+          f"match {regex_seconds * 1e3 / text_count:7.3f} ms/text  {regex_hits:,} mentions  "
+          f"({regex_seconds / automaton_seconds:.1f}x slower)")
+
+
+if __name__ == "__main__":
+    arguments = [int(argument) for argument in sys.argv[1:3]]
+    run(*arguments)
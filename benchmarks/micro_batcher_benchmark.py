@@ -0,0 +1,98 @@
+"""
+Micro-Batcher Benchmark
+Throughput of NER requests from many concurrent callers, sent one text per request
+versus micro-batched, against a local endpoint that simulates the inference API latency
+
+Run from the repository root:
+    python -m benchmarks.micro_batcher_benchmark [caller_count] [texts_per_caller] [latency_ms]
+"""
+
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+
+import requests
+
+from models.inference_client import MAX_CONCURRENCY
+from models.micro_batcher import DEFAULT_MAX_WAIT, MicroBatcher
+from models.ner_extractor import _post_entity_batch
+
+# Extra server time per text in a batched request
+_PER_TEXT_SECONDS = 0.001
+
+
+def _serve(latency: float) -> ThreadingHTTPServer:
+    """Start a token classification endpoint answering after latency + per-text time"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            inputs = json.loads(self.rfile.read(int(self.headers['Content-Length'])))['inputs']
+            texts = inputs if isinstance(inputs, list) else [inputs]
+            time.sleep(latency + _PER_TEXT_SECONDS * len(texts))
+            results = [[{'word': text.split()[0], 'entity_group': 'DRUG', 'score': 0.9, 'start': 0,
+                         'end': len(text.split()[0])}] for text in texts]
+            body = json.dumps(results if isinstance(inputs, list) else results[0]).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _measure(batcher: MicroBatcher, caller_count: int, texts_per_caller: int) -> Tuple[float, int]:
+    """Texts per second with caller_count threads each extracting texts_per_caller texts, and the failures"""
+    failures = []
+
+    def caller(caller_id: int) -> None:
+        for index in range(texts_per_caller):
+            try:
+                result = batcher.submit(f"drug{caller_id}x{index} 10 mg daily")
+            except requests.RequestException:
+                # Timed out waiting for a free inference slot
+                failures.append(caller_id)
+                continue
+            assert result[0]['word'] == f"drug{caller_id}x{index}"
+
+    threads = [threading.Thread(target=caller, args=(caller_id,)) for caller_id in range(caller_count)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return (caller_count * texts_per_caller - len(failures)) / (time.perf_counter() - start), len(failures)
+
+
+def run(caller_count: int = 64, texts_per_caller: int = 20, latency_ms: int = 50) -> None:
+    server = _serve(latency_ms / 1000)
+    url = f"http://127.0.0.1:{server.server_port}/models/ner"
+
+    print(f"{caller_count} callers x {texts_per_caller} texts, {latency_ms} ms endpoint latency "
+          f"+ {_PER_TEXT_SECONDS * 1000:.0f} ms per text, {MAX_CONCURRENCY} requests in flight")
+    baseline = None
+    for max_batch in (1, 4, 16, 32):
+        batcher = MicroBatcher(lambda texts: _post_entity_batch(url, texts), max_batch=max_batch,
+                               max_wait=DEFAULT_MAX_WAIT, max_in_flight=MAX_CONCURRENCY)
+        throughput, failures = _measure(batcher, caller_count, texts_per_caller)
+        baseline = baseline or throughput
+        stats = batcher.get_stats()
+        print(f"  max_batch {max_batch:>2}  {throughput:8.1f} texts/s  mean batch {stats['mean_batch']:5.1f}  "
+              f"{throughput / baseline:5.1f}x  {failures} slot timeouts")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    arguments = [int(argument) for argument in sys.argv[1:4]]
+    run(*arguments)
@@ -0,0 +1,58 @@
+"""
+Multi-Drug Rule Benchmark
+Compares anchor-indexed rule matching with evaluating every rule against each regimen
+
+Run from the repository root:
+    python -m benchmarks.multi_drug_rule_benchmark [rule_count] [regimen_count] [drug_count]
+"""
+
+import random
+import sys
+import time
+
+from models.multi_drug_rules import MultiDrugRule, MultiDrugRuleIndex, _satisfied
+
+
+def _generate_rules(rule_count: int, drug_count: int, seed: int = 5):
+    """Combination rules of 2-3 class-sized or named-drug requirements, and "k of set" threshold rules"""
+    rng = random.Random(seed)
+    rules = []
+    for number in range(rule_count):
+        if rng.random() < 0.2:
+            requirements = [(frozenset(rng.sample(range(drug_count), rng.randint(10, 40))), 3)]
+        else:
+            sizes = [rng.choice([rng.randint(2, 10), rng.randint(10, 50)]) for _ in range(rng.randint(2, 3))]
+            requirements = [(frozenset(rng.sample(range(drug_count), size)), 1) for size in sizes]
+        rules.append(MultiDrugRule(f"rule {number}", tuple(requirements), 2, '', ''))
+    return rules
+
+
+def run(rule_count: int = 20_000, regimen_count: int = 2_000, drug_count: int = 10_000) -> None:
+    rules = _generate_rules(rule_count, drug_count)
+    rng = random.Random(6)
+    regimens = [set(rng.sample(range(drug_count), rng.randint(3, 12))) for _ in range(regimen_count)]
+
+    start = time.perf_counter()
+    index = MultiDrugRuleIndex()
+    rules = [rule for rule in rules if index.add(rule)]
+    build_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    indexed = [[rule.name for rule, _ in index.match(regimen)] for regimen in regimens]
+    indexed_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scanned = [[rule.name for rule in rules if _satisfied(rule.requirements, regimen)] for regimen in regimens]
+    scan_seconds = time.perf_counter() - start
+
+    assert indexed == scanned
+    print(f"{len(rules):,} rules, {regimen_count:,} regimens, {drug_count:,} drugs "
+          f"({index.get_stats()['anchor_drugs']:,} anchor drugs, index built in {build_ms:.1f} ms)")
+    print(f"  anchor index {indexed_seconds * 1000:9.1f} ms  ({indexed_seconds / regimen_count * 1e6:7.1f} us/regimen)")
+    print(f"  full scan    {scan_seconds * 1000:9.1f} ms  ({scan_seconds / regimen_count * 1e6:7.1f} us/regimen)  "
+          f"{scan_seconds / indexed_seconds:5.1f}x slower, {sum(map(len, indexed)):,} matches")
+
+
+if __name__ == "__main__":
+    arguments = [int(argument) for argument in sys.argv[1:4]]
+    run(*arguments)
@@ -0,0 +1,44 @@
+"""
+Drug Record Footprint Benchmark
+Compares the resident size of plain drug dicts with compact DrugRecord entries
+
+Run from the repository root:
+    python -m benchmarks.record_footprint_benchmark [catalog_size]
+"""
+
+import gc
+import json
+import sys
+import tracemalloc
+
+from benchmarks.synthetic_catalog import generate_catalog
+from data.drug_record import DrugRecord
+
+
+def _measure(build) -> float:
+    """Build a catalog and return the memory it retains in MB"""
+    gc.collect()
+    tracemalloc.start()
+    catalog = build()
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del catalog
+    return retained / (1024 * 1024)
+
+
+def run(size: int = 100_000) -> None:
+    # Serialized form, as a real import from JSON would see it
+    payload = json.dumps(generate_catalog(size))
+
+    dict_mb = _measure(lambda: json.loads(payload))
+    record_mb = _measure(lambda: {name: DrugRecord.from_dict(data) for name, data in json.loads(payload).items()})
+
+    print(f"{size:,} drugs")
+    print(f"  plain dicts:  {dict_mb:8.1f} MB")
+    print(f"  DrugRecord:   {record_mb:8.1f} MB")
+    print(f"  reduction:    {dict_mb / record_mb:8.1f}x")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
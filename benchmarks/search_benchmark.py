@@ -0,0 +1,46 @@
+"""
+Drug Search Benchmark
+Measures DrugDatabase.search_drugs and resolve_fuzzy latency on a large synthetic catalog
+
+Run from the repository root:
+    python -m benchmarks.search_benchmark [catalog_size]
+"""
+
+import sys
+import time
+
+from benchmarks.synthetic_catalog import generate_catalog
+from data.drug_database import DrugDatabase
+
+QUERIES = ['metformin', 'lipitor', 'hypertension', 'pril', 'xaban', 'zocor', 'ab', 'refractory epilepsy']
+
+# OCR-style misspellings
+FUZZY_QUERIES = ['metforrnin', 'lisinoprll', 'atorvastatn', 'amlodipene', 'wrafarin']
+
+
+def run(size: int = 100_000, repeats: int = 200) -> None:
+    catalog = generate_catalog(size)
+
+    drug_db = DrugDatabase()
+    start = time.perf_counter()
+    drug_db.bulk_add_drugs(catalog)
+    print(f"Indexed {size:,} drugs in {time.perf_counter() - start:.2f}s")
+
+    for query in QUERIES:
+        start = time.perf_counter()
+        for _ in range(repeats):
+            results = drug_db.search_drugs(query, limit=20)
+        elapsed_ms = (time.perf_counter() - start) / repeats * 1000
+        print(f"{query!r:24} {elapsed_ms:8.3f} ms/query (top {len(results)} results)")
+
+    for query in FUZZY_QUERIES:
+        start = time.perf_counter()
+        for _ in range(repeats):
+            matches = drug_db.resolve_fuzzy(query)
+        elapsed_us = (time.perf_counter() - start) / repeats * 1_000_000
+        best = matches[0]['drug'] if matches else None
+        print(f"fuzzy {query!r:18} {elapsed_us:8.1f} us/lookup (best {best!r})")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,64 @@
+"""
+Severity Query Benchmark
+Compares max_severity / any_high / top_k with deriving the same answers from check_interactions
+
+Run from the repository root:
+    python -m benchmarks.severity_query_benchmark [regimen_count] [catalog_size] [pair_count]
+"""
+
+import random
+import sys
+import time
+
+from benchmarks.synthetic_catalog import generate_catalog, generate_interaction_rows
+from data.drug_database import DrugDatabase
+from models.drug_interaction import DrugInteractionChecker
+from models.interaction_store import SEVERITY_CODES
+
+
+def _time(function, regimens) -> float:
+    start = time.perf_counter()
+    for regimen in regimens:
+        function(regimen)
+    return time.perf_counter() - start
+
+
+def run(regimen_count: int = 5_000, size: int = 5_000, pair_count: int = 200_000) -> None:
+    catalog = generate_catalog(size)
+    drug_db = DrugDatabase()
+    drug_db.bulk_add_drugs(catalog)
+    names = list(catalog)
+    checker = DrugInteractionChecker(resolver=drug_db.resolver)
+    checker.load_interactions((names[drug1_id], names[drug2_id], severity, description, recommendation)
+                              for drug1_id, drug2_id, severity, description, recommendation
+                              in generate_interaction_rows(len(names), pair_count))
+    rng = random.Random(4)
+    regimens = [[rng.choice(names) for _ in range(rng.randint(5, 20))] for _ in range(regimen_count)]
+
+    def full_max(regimen):
+        return max((SEVERITY_CODES[interaction['severity']] for interaction in checker.check_interactions(regimen)),
+                   default=None)
+
+    def full_any_high(regimen):
+        return any(interaction['severity'] == 'High' for interaction in checker.check_interactions(regimen))
+
+    def full_top_3(regimen):
+        return sorted(checker.check_interactions(regimen), key=lambda i: -SEVERITY_CODES[i['severity']])[:3]
+
+    # Warm the per-drug severity buckets, as a long-running server would
+    for regimen in regimens:
+        checker.max_severity(regimen)
+
+    print(f"{regimen_count:,} regimens of 5-20 drugs, {size:,} drugs, {pair_count:,} interaction rows")
+    for label, full, ranked in (('max_severity', full_max, checker.max_severity),
+                                ('any_high', full_any_high, checker.any_high),
+                                ('top_k(3)', full_top_3, lambda regimen: checker.top_k(regimen, 3))):
+        full_seconds = _time(full, regimens)
+        ranked_seconds = _time(ranked, regimens)
+        print(f"  {label:<13} full list {full_seconds / regimen_count * 1e6:7.1f} us  "
+              f"ranked {ranked_seconds / regimen_count * 1e6:7.1f} us  {full_seconds / ranked_seconds:5.1f}x")
+
+
+if __name__ == "__main__":
+    arguments = [int(argument) for argument in sys.argv[1:4]]
+    run(*arguments)
@@ -0,0 +1,68 @@
+"""
+Catalog Snapshot Startup Benchmark
+Compares building the in-memory DrugDatabase with mapping a prebuilt snapshot
+
+Run from the repository root:
+    python -m benchmarks.snapshot_benchmark [catalog_size]
+"""
+
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic_catalog import generate_catalog
+from data.catalog_snapshot import CatalogSnapshot, build_snapshot
+from data.drug_database import DrugDatabase
+
+
+def _timed(build):
+    """Run a startup path and return (result, seconds, MB allocated by Python)"""
+    # Keep collections of earlier allocations out of the measurement
+    gc.collect()
+    gc.disable()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    gc.enable()
+    return result, elapsed, retained / (1024 * 1024)
+
+
+def run(size: int = 100_000) -> None:
+    catalog = generate_catalog(size)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'catalog.snap')
+        start = time.perf_counter()
+        build_snapshot(catalog, [], path)
+        build_seconds = time.perf_counter() - start
+
+        def load_memory():
+            drug_db = DrugDatabase()
+            drug_db.bulk_add_drugs(catalog)
+            return drug_db
+
+        # Snapshot first: tracemalloc slows down for a while after tracing a large heap
+        snapshot_db, snapshot_seconds, snapshot_mb = _timed(lambda: DrugDatabase(snapshot=CatalogSnapshot(path)))
+        query = 'hypertension'
+        start = time.perf_counter()
+        snapshot_db.search_drugs(query, limit=20)
+        snapshot_query_ms = (time.perf_counter() - start) * 1000
+
+        memory_db, memory_seconds, memory_mb = _timed(load_memory)
+
+        print(f"{size:,} drugs, snapshot {os.path.getsize(path) / (1024 * 1024):.1f} MB "
+              f"built in {build_seconds:.1f} s")
+        print(f"  in-memory startup: {memory_seconds * 1000:9.1f} ms  {memory_mb:8.1f} MB heap")
+        print(f"  snapshot startup:  {snapshot_seconds * 1000:9.1f} ms  {snapshot_mb:8.1f} MB heap")
+        print(f"  first snapshot search '{query}' (limit 20): {snapshot_query_ms:.2f} ms")
+        del memory_db, snapshot_db
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,83 @@
+"""
+Synthetic Drug Catalog
+Generates large catalogs in the COMPREHENSIVE_DRUG_DATA format for benchmarks
+"""
+
+import random
+from typing import Any, Dict, Iterator, Tuple
+
+from data.comprehensive_drug_dataset import COMPREHENSIVE_DRUG_DATA, COMPREHENSIVE_INTERACTIONS
+
+_PREFIXES = ['ab', 'ace', 'al', 'am', 'ar', 'be', 'ca', 'ce', 'cl', 'da', 'de', 'di', 'do', 'en', 'es',
+             'fa', 'fe', 'fl', 'ga', 'gl', 'hy', 'ib', 'il', 'ke', 'la', 'le', 'lo', 'ma', 'me', 'mi',
+             'mo', 'na', 'ni', 'no', 'ol', 'om', 'pa', 'pe', 'pr', 'qu', 'ra', 're', 'ri', 'ro', 'sa',
+             'se', 'si', 'su', 'ta', 'te', 'ti', 'to', 'tr', 'va', 've', 'vo', 'za', 'ze', 'zo']
+_MIDDLES = ['b', 'c', 'd', 'f', 'g', 'l', 'm', 'n', 'p', 'r', 's', 't', 'v', 'x', 'z',
+            'ba', 'co', 'di', 'fe', 'gu', 'li', 'mo', 'ne', 'pi', 'ro', 'su', 'ti', 'va']
+_SUFFIXES = ['pril', 'sartan', 'olol', 'dipine', 'statin', 'formin', 'gliptin', 'cillin', 'mycin',
+             'floxacin', 'profen', 'azole', 'prazole', 'oxetine', 'azepam', 'tidine', 'sone', 'mab',
+             'nib', 'vir', 'semide', 'thiazide', 'xaban', 'gatran', 'lukast', 'terol', 'tadine']
+_ENZYMES = ['CYP3A4', 'CYP2D6', 'CYP2C9', 'CYP2C19', 'CYP1A2', 'CYP2C8', 'CYP2B6', 'CYP2E1',
+            'UGT1A1', 'P-gp', 'OATP1B1', 'BCRP']
+# Per-enzyme probability of each role for a synthetic drug
+_ROLE_RATES = [('substrate', 0.03), ('inhibitor', 0.002), ('strong_inhibitor', 0.0005), ('inducer', 0.0005)]
+
+
+def _enzyme_roles(rng: random.Random) -> Dict[str, Any]:
+    roles = {}
+    for enzyme in _ENZYMES:
+        enzyme_roles = [role for role, rate in _ROLE_RATES if rng.random() < rate]
+        if enzyme_roles:
+            roles[enzyme] = enzyme_roles
+    return roles
+
+
+def generate_catalog(size: int, seed: int = 42) -> Dict[str, Dict[str, Any]]:
+    """Generate a synthetic catalog of unique drug names with realistic field values"""
+    rng = random.Random(seed)
+    # Separate stream so enzyme roles do not change the generated names
+    role_rng = random.Random(seed + 1)
+    templates = list(COMPREHENSIVE_DRUG_DATA.values())
+    indications = sorted({ind for drug in templates for ind in drug['indications']})
+    indications += [f"{ind} (refractory)" for ind in indications]
+
+    catalog: Dict[str, Dict[str, Any]] = {}
+    while len(catalog) < size:
+        name = rng.choice(_PREFIXES) + rng.choice(_MIDDLES) + rng.choice(_MIDDLES) + rng.choice(_SUFFIXES)
+        if name in catalog:
+            name = f"{name}_{len(catalog)}"
+        template = rng.choice(templates)
+        catalog[name] = {
+            'generic_name': f"{name.title()} {rng.choice(['Hydrochloride', 'Sodium', 'Potassium', 'Besylate', ''])}".strip(),
+            'brand_names': [f"{name[:4].title()}{rng.choice(['ex', 'ix', 'on', 'ra', 'vo'])}{i}" for i in range(rng.randint(1, 3))],
+            'category': template['category'],
+            'indications': rng.sample(indications, rng.randint(1, 4)),
+            'contraindications': list(template['contraindications']),
+            'side_effects': list(template['side_effects']),
+            'dosage_forms': list(template['dosage_forms']),
+            'strength_options': list(template['strength_options']),
+            'age_restrictions': dict(template['age_restrictions'])
+        }
+        enzyme_roles = _enzyme_roles(role_rng)
+        if enzyme_roles:
+            catalog[name]['enzyme_roles'] = enzyme_roles
+    return catalog
+
+
+def generate_interaction_rows(drug_count: int, pair_count: int,
+                              seed: int = 42) -> Iterator[Tuple[int, int, str, str, str]]:
+    """Generate (drug1_id, drug2_id, severity, description, recommendation) rows.
+
+    Texts come from the comprehensive dataset but every row gets its own
+    string objects, as rows parsed from an imported file would.
+    """
+    rng = random.Random(seed)
+    templates = [(interaction['severity'], interaction['description'], interaction['recommendation'])
+                 for interaction in COMPREHENSIVE_INTERACTIONS]
+    for _ in range(pair_count):
+        drug1_id = rng.randrange(drug_count)
+        drug2_id = rng.randrange(drug_count - 1)
+        if drug2_id >= drug1_id:
+            drug2_id += 1
+        severity, description, recommendation = rng.choice(templates)
+        yield drug1_id, drug2_id, severity, ''.join((description, '')), ''.join((recommendation, ''))
@@ -0,0 +1,576 @@
+"""
+Binary Catalog Snapshot
+Compiles the drug catalog and its indexes into a versioned file that is mmap'd at startup
+
+Build a snapshot from the comprehensive dataset (run from the repository root):
+    python -m data.catalog_snapshot build drug_catalog.snap
+
+Then point DRUG_SNAPSHOT_PATH at the file. Every server process maps the same
+file read-only, so workers share the page-cache pages instead of each importing
+and replaying the dataset.
+"""
+
+import hashlib
+import heapq
+import json
+import mmap
+import struct
+import sys
+import time
+from array import array
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from data.drug_record import AGE_GROUPS, DrugRecord
+from data.name_resolver import drug_aliases
+from data.search_index import NGRAM_SIZE, _TOKEN_PATTERN, _ngrams
+
+SNAPSHOT_MAGIC = b'DRUGSNAP'
+SNAPSHOT_FORMAT_VERSION = 2
+
+NONE = 0xFFFFFFFF
+
+# Sections, in file order. Arrays are little-endian uint32 unless noted.
+SECTIONS = (
+    'meta',                 # JSON blob
+    'string_offsets',       # n + 1 offsets into string_blob
+    'string_blob',          # UTF-8 blob
+    'drug_rows',            # ROW_WIDTH values per drug, rows sorted by name
+    'list_pool',            # string ids referenced by row list fields
+    'indication_keys', 'indication_postings',   # lowercase indication -> drug rows
+    'category_keys', 'category_postings',       # lowercase category -> drug rows
+    'gram_keys', 'gram_postings',               # trigram -> search strings
+    'token_keys', 'token_postings',             # word token -> search strings
+    'alias_keys', 'alias_postings',             # normalized name/brand alias -> drug row
+    'stem_keys', 'stem_postings',               # salt/formulation-stripped alias -> drug row
+    'search_strings',       # search string -> string id
+    'name_ptr', 'name_rows',                    # search string -> drug rows, per field
+    'brand_ptr', 'brand_rows',
+    'indication_ptr', 'indication_rows',
+    'interactions',         # drug1, drug2, severity, description, recommendation string ids
+)
+
+# Drug row layout
+ROW_FIELDS = (
+    'name', 'generic_name', 'category',
+    'brand_names_off', 'brand_names_len',
+    'indications_off', 'indications_len',
+    'contraindications_off', 'contraindications_len',
+    'side_effects_off', 'side_effects_len',
+    'dosage_forms_off', 'dosage_forms_len',
+    'strength_options_off', 'strength_options_len',
+    'age_pediatric', 'age_adult', 'age_geriatric',
+    'present', 'extras'
+)
+ROW_WIDTH = len(ROW_FIELDS)
+_COL = {field: index for index, field in enumerate(ROW_FIELDS)}
+LIST_FIELDS = ('brand_names', 'indications', 'contraindications', 'side_effects', 'dosage_forms', 'strength_options')
+INTERACTION_WIDTH = 5
+
+_HEADER = struct.Struct('<8sII')
+_SECTION_ENTRY = struct.Struct('<QQ')
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot file is missing, corrupt or of another format version"""
+
+
+def _uint32(values: Iterable[int]) -> array:
+    data = array('I', values)
+    if data.itemsize != 4:
+        raise SnapshotError("Platform has no 4-byte unsigned int array type")
+    return data
+
+
+class _SnapshotWriter:
+    """Collects strings and uint32 arrays for build_snapshot"""
+
+    def __init__(self):
+        self.string_ids: Dict[str, int] = {}
+        self.strings: List[str] = []
+
+    def sid(self, value: Optional[str]) -> int:
+        if value is None:
+            return NONE
+        string_id = self.string_ids.get(value)
+        if string_id is None:
+            string_id = self.string_ids[value] = len(self.strings)
+            self.strings.append(value)
+        return string_id
+
+    def posting_table(self, postings: Dict[str, Iterable[int]]) -> Tuple[array, array]:
+        """Encode key -> postings as (key sid, start, count) rows sorted by key, plus the pool"""
+        keys = _uint32(())
+        pool = _uint32(())
+        for key in sorted(postings):
+            values = sorted(set(postings[key]))
+            keys.extend((self.sid(key), len(pool), len(values)))
+            pool.extend(values)
+        return keys, pool
+
+    @staticmethod
+    def csr(rows: List[Iterable[int]]) -> Tuple[array, array]:
+        ptr = _uint32([0])
+        indices = _uint32(())
+        for values in rows:
+            indices.extend(sorted(values))
+            ptr.append(len(indices))
+        return ptr, indices
+
+
+def build_snapshot(drugs: Mapping[str, Mapping[str, Any]],
+                   interactions: Iterable[Tuple[str, str, str, str, str]],
+                   path: str) -> Dict[str, Any]:
+    """Compile drugs, their lookup indexes and interactions into a snapshot file.
+
+    drugs maps lowercase drug keys to drug dicts or DrugRecords; interactions
+    are (drug1, drug2, severity, description, recommendation) tuples.
+    Returns the metadata written to the file, including a catalog_version
+    hash of the content.
+    """
+    writer = _SnapshotWriter()
+    names = sorted(drugs)
+    list_pool = _uint32(())
+    rows = _uint32(())
+    indication_postings: Dict[str, Set[int]] = {}
+    category_postings: Dict[str, Set[int]] = {}
+    drug_alias_lists: List[Tuple[List[str], List[str]]] = []
+
+    # Searchable strings, shared across drugs and fields as in DrugSearchIndex
+    search_ids: Dict[str, int] = {}
+    field_rows: Tuple[List[Set[int]], ...] = ([], [], [])
+
+    def add_search_string(text: str, field: int, row: int) -> None:
+        text = text.lower().strip()
+        if not text:
+            return
+        index = search_ids.get(text)
+        if index is None:
+            index = search_ids[text] = len(search_ids)
+            for postings in field_rows:
+                postings.append(set())
+        field_rows[field][index].add(row)
+
+    for row, name in enumerate(names):
+        record = DrugRecord.from_dict(drugs[name])
+        values = [NONE] * ROW_WIDTH
+        present = 0
+        for bit, field in enumerate(DrugRecord.FIELDS):
+            if field in record:
+                present |= 1 << bit
+
+        values[_COL['name']] = writer.sid(name)
+        values[_COL['generic_name']] = writer.sid(record.get('generic_name'))
+        values[_COL['category']] = writer.sid(record.get('category'))
+        for field in LIST_FIELDS:
+            items = record.get(field, ())
+            values[_COL[field + '_off']] = len(list_pool)
+            values[_COL[field + '_len']] = len(items)
+            list_pool.extend(writer.sid(str(item)) for item in items)
+        age_restrictions = record.get('age_restrictions', {})
+        for group in AGE_GROUPS:
+            values[_COL['age_' + group]] = writer.sid(age_restrictions.get(group))
+        values[_COL['present']] = present
+        extras = {key: value for key, value in record.items() if key not in DrugRecord.FIELDS}
+        if 'age_restrictions' in record and set(age_restrictions) - set(AGE_GROUPS):
+            extras['age_restrictions'] = dict(age_restrictions)
+        values[_COL['extras']] = writer.sid(json.dumps(extras)) if extras else NONE
+        rows.extend(values)
+
+        for indication in record.get('indications', ()):
+            indication_postings.setdefault(indication.lower().strip(), set()).add(row)
+        category_postings.setdefault(record.get('category', '').lower().strip(), set()).add(row)
+
+        drug_alias_lists.append(drug_aliases(name, record))
+
+        add_search_string(name, 0, row)
+        for brand in record.get('brand_names', ()):
+            add_search_string(brand, 1, row)
+        for indication in record.get('indications', ()):
+            add_search_string(indication, 2, row)
+
+    gram_postings: Dict[str, Set[int]] = {}
+    token_postings: Dict[str, Set[int]] = {}
+    for text, index in search_ids.items():
+        for gram in _ngrams(text):
+            gram_postings.setdefault(gram, set()).add(index)
+        for token in _TOKEN_PATTERN.findall(text):
+            token_postings.setdefault(token, set()).add(index)
+
+    # Same precedence as DrugNameResolver: a drug's own key wins, then first owner
+    alias_postings: Dict[str, List[int]] = {}
+    stem_postings: Dict[str, List[int]] = {}
+    for row, (exact, stems) in enumerate(drug_alias_lists):
+        alias_postings[exact[0]] = [row]
+    for row, (exact, stems) in enumerate(drug_alias_lists):
+        for alias in exact[1:]:
+            alias_postings.setdefault(alias, [row])
+        for alias in stems:
+            stem_postings.setdefault(alias, [row])
+
+    interaction_rows = _uint32(())
+    interaction_count = 0
+    for interaction in interactions:
+        interaction_rows.extend(writer.sid(str(value)) for value in interaction)
+        interaction_count += 1
+
+    indication_keys, indication_pool = writer.posting_table(indication_postings)
+    category_keys, category_pool = writer.posting_table(category_postings)
+    gram_keys, gram_pool = writer.posting_table(gram_postings)
+    token_keys, token_pool = writer.posting_table(token_postings)
+    alias_keys, alias_pool = writer.posting_table(alias_postings)
+    stem_keys, stem_pool = writer.posting_table(stem_postings)
+    search_strings = _uint32(writer.sid(text) for text in search_ids)
+    name_ptr, name_rows = writer.csr(field_rows[0])
+    brand_ptr, brand_rows = writer.csr(field_rows[1])
+    indication_ptr, indication_rows = writer.csr(field_rows[2])
+
+    # The string table is complete only after every section above is encoded
+    blob = bytearray()
+    string_offsets = _uint32([0])
+    for text in writer.strings:
+        blob += text.encode('utf-8')
+        string_offsets.append(len(blob))
+
+    digest = hashlib.sha256()
+    for chunk in (bytes(blob), string_offsets.tobytes(), rows.tobytes(), list_pool.tobytes(), interaction_rows.tobytes()):
+        digest.update(chunk)
+
+    meta = {
+        'format_version': SNAPSHOT_FORMAT_VERSION,
+        'catalog_version': digest.hexdigest()[:16],
+        'built_at': time.strftime("%Y-%m-%d %H:%M:%S"),
+        'drugs': len(names),
+        'interactions': interaction_count,
+        'strings': len(writer.strings)
+    }
+
+    payloads = {
+        'meta': json.dumps(meta).encode('utf-8'),
+        'string_offsets': string_offsets,
+        'string_blob': bytes(blob),
+        'drug_rows': rows,
+        'list_pool': list_pool,
+        'indication_keys': indication_keys, 'indication_postings': indication_pool,
+        'category_keys': category_keys, 'category_postings': category_pool,
+        'gram_keys': gram_keys, 'gram_postings': gram_pool,
+        'token_keys': token_keys, 'token_postings': token_pool,
+        'alias_keys': alias_keys, 'alias_postings': alias_pool,
+        'stem_keys': stem_keys, 'stem_postings': stem_pool,
+        'search_strings': search_strings,
+        'name_ptr': name_ptr, 'name_rows': name_rows,
+        'brand_ptr': brand_ptr, 'brand_rows': brand_rows,
+        'indication_ptr': indication_ptr, 'indication_rows': indication_rows,
+        'interactions': interaction_rows,
+    }
+
+    chunks = []
+    for section in SECTIONS:
+        payload = payloads[section]
+        if isinstance(payload, array):
+            if sys.byteorder != 'little':
+                payload = array('I', payload)
+                payload.byteswap()
+            payload = payload.tobytes()
+        chunks.append(payload)
+
+    # Sections start on 8-byte boundaries so they can be cast in place
+    offset = _HEADER.size + _SECTION_ENTRY.size * len(SECTIONS)
+    table = []
+    for chunk in chunks:
+        offset += -offset % 8
+        table.append((offset, len(chunk)))
+        offset += len(chunk)
+
+    with open(path, 'wb') as snapshot_file:
+        snapshot_file.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT_VERSION, len(SECTIONS)))
+        for entry in table:
+            snapshot_file.write(_SECTION_ENTRY.pack(*entry))
+        position = _HEADER.size + _SECTION_ENTRY.size * len(SECTIONS)
+        for (section_offset, _), chunk in zip(table, chunks):
+            snapshot_file.write(b'\0' * (section_offset - position))
+            snapshot_file.write(chunk)
+            position = section_offset + len(chunk)
+
+    return meta
+
+
+class _PostingTable:
+    """Read-only view of a key -> postings table stored in the snapshot"""
+
+    def __init__(self, snapshot: 'CatalogSnapshot', keys: memoryview, pool: memoryview):
+        self._snapshot = snapshot
+        self._keys = keys
+        self._pool = pool
+        self._count = len(keys) // 3
+
+    def _key(self, index: int) -> str:
+        return self._snapshot.string(self._keys[index * 3])
+
+    def _postings(self, index: int) -> memoryview:
+        start = self._keys[index * 3 + 1]
+        return self._pool[start:start + self._keys[index * 3 + 2]]
+
+    def _lower_bound(self, key: str) -> int:
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def get(self, key: str) -> memoryview:
+        """Get the postings for a key, empty when missing"""
+        index = self._lower_bound(key)
+        if index < self._count and self._key(index) == key:
+            return self._postings(index)
+        return self._pool[0:0]
+
+    def prefix(self, prefix: str) -> Iterable[memoryview]:
+        """Yield the postings of every key starting with prefix"""
+        index = self._lower_bound(prefix)
+        while index < self._count and self._key(index).startswith(prefix):
+            yield self._postings(index)
+            index += 1
+
+
+class CatalogSnapshot:
+    """Read-only drug catalog backed by a memory-mapped snapshot file.
+
+    Arrays are used in place through memoryviews over the mapping; only the
+    strings and records actually looked up are decoded. Provides the read
+    half of the SQLiteDrugStore interface so DrugDatabase can use it as a
+    base layer.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if sys.byteorder != 'little':
+            raise SnapshotError("Snapshots can only be mapped on little-endian hosts")
+        try:
+            with open(path, 'rb') as snapshot_file:
+                self._mmap = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise SnapshotError(f"Cannot map snapshot {path}: {e}") from e
+
+        buffer = memoryview(self._mmap)
+        if len(buffer) < _HEADER.size:
+            raise SnapshotError(f"{path} is not a drug catalog snapshot")
+        magic, version, section_count = _HEADER.unpack_from(buffer)
+        if magic != SNAPSHOT_MAGIC:
+            raise SnapshotError(f"{path} is not a drug catalog snapshot")
+        if version != SNAPSHOT_FORMAT_VERSION or section_count != len(SECTIONS):
+            raise SnapshotError(
+                f"{path} has snapshot format {version}, expected {SNAPSHOT_FORMAT_VERSION}; rebuild it"
+            )
+
+        sections: Dict[str, memoryview] = {}
+        for index, section in enumerate(SECTIONS):
+            offset, length = _SECTION_ENTRY.unpack_from(buffer, _HEADER.size + index * _SECTION_ENTRY.size)
+            if offset + length > len(buffer):
+                raise SnapshotError(f"{path} is truncated")
+            view = buffer[offset:offset + length]
+            sections[section] = view if section in ('meta', 'string_blob') else view.cast('I')
+
+        self.meta: Dict[str, Any] = json.loads(bytes(sections['meta']).decode('utf-8'))
+        self._string_offsets = sections['string_offsets']
+        self._string_blob = sections['string_blob']
+        self._rows = sections['drug_rows']
+        self._list_pool = sections['list_pool']
+        self._drug_count = len(self._rows) // ROW_WIDTH
+        self._indications = _PostingTable(self, sections['indication_keys'], sections['indication_postings'])
+        self._categories = _PostingTable(self, sections['category_keys'], sections['category_postings'])
+        self._grams = _PostingTable(self, sections['gram_keys'], sections['gram_postings'])
+        self._tokens = _PostingTable(self, sections['token_keys'], sections['token_postings'])
+        self._aliases = _PostingTable(self, sections['alias_keys'], sections['alias_postings'])
+        self._stem_aliases = _PostingTable(self, sections['stem_keys'], sections['stem_postings'])
+        self._search_strings = sections['search_strings']
+        self._field_rows = (
+            (sections['name_ptr'], sections['name_rows']),
+            (sections['brand_ptr'], sections['brand_rows']),
+            (sections['indication_ptr'], sections['indication_rows']),
+        )
+        self._interactions = sections['interactions']
+
+    def string(self, string_id: int) -> Optional[str]:
+        """Decode a string from the string table"""
+        if string_id == NONE:
+            return None
+        start = self._string_offsets[string_id]
+        return str(self._string_blob[start:self._string_offsets[string_id + 1]], 'utf-8')
+
+    def _row(self, row: int, field: str) -> int:
+        return self._rows[row * ROW_WIDTH + _COL[field]]
+
+    def _name(self, row: int) -> str:
+        return self.string(self._row(row, 'name'))
+
+    def _find_row(self, name: str) -> Optional[int]:
+        """Binary search the name-sorted drug rows"""
+        low, high = 0, self._drug_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._name(middle) < name:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._drug_count and self._name(low) == name:
+            return low
+        return None
+
+    def _record(self, row: int) -> DrugRecord:
+        present = self._row(row, 'present')
+        drug_data: Dict[str, Any] = {}
+        for bit, field in enumerate(DrugRecord.FIELDS):
+            if not present & (1 << bit):
+                continue
+            if field in LIST_FIELDS:
+                start = self._row(row, field + '_off')
+                items = self._list_pool[start:start + self._row(row, field + '_len')]
+                drug_data[field] = [self.string(string_id) for string_id in items]
+            elif field == 'age_restrictions':
+                drug_data[field] = {
+                    group: self.string(self._row(row, 'age_' + group))
+                    for group in AGE_GROUPS if self._row(row, 'age_' + group) != NONE
+                }
+            else:
+                drug_data[field] = self.string(self._row(row, field))
+        extras = self._row(row, 'extras')
+        if extras != NONE:
+            drug_data.update(json.loads(self.string(extras)))
+        return DrugRecord.from_dict(drug_data)
+
+    # Read interface shared with SQLiteDrugStore
+
+    def get_drug(self, name: str) -> Optional[DrugRecord]:
+        row = self._find_row(name)
+        return self._record(row) if row is not None else None
+
+    def has_drug(self, name: str) -> bool:
+        return self._find_row(name) is not None
+
+    def drug_names(self) -> List[str]:
+        return [self._name(row) for row in range(self._drug_count)]
+
+    def count_drugs(self) -> int:
+        return self._drug_count
+
+    def category_of(self, name: str) -> Optional[str]:
+        row = self._find_row(name)
+        if row is None:
+            return None
+        return (self.string(self._row(row, 'category')) or '').lower().strip()
+
+    def drugs_by_indication(self, indication: str) -> List[str]:
+        return [self._name(row) for row in self._indications.get(indication.lower().strip())]
+
+    def drugs_by_category(self, category: str) -> List[str]:
+        return [self._name(row) for row in self._categories.get(category.lower().strip())]
+
+    def indication_overlaps(self, name: str) -> Dict[str, Set[str]]:
+        row = self._find_row(name)
+        if row is None:
+            return {}
+        start = self._row(row, 'indications_off')
+        overlaps: Dict[int, Set[str]] = {}
+        for string_id in self._list_pool[start:start + self._row(row, 'indications_len')]:
+            indication = self.string(string_id).lower().strip()
+            for other_row in self._indications.get(indication):
+                if other_row != row:
+                    overlaps.setdefault(other_row, set()).add(indication)
+        return {self._name(other_row): overlaps[other_row] for other_row in sorted(overlaps)}
+
+    def resolve_alias(self, alias: str, is_stem: bool = False) -> Optional[str]:
+        """Get the drug key for a normalized alias; used as a DrugNameResolver fallback"""
+        rows = (self._stem_aliases if is_stem else self._aliases).get(alias)
+        return self._name(rows[0]) if len(rows) else None
+
+    def iter_aliases(self) -> Iterable[Tuple[str, str]]:
+        """Yield (normalized alias, drug key) pairs for the exact aliases"""
+        aliases = self._aliases
+        for index in range(aliases._count):
+            yield aliases._key(index), self._name(aliases._postings(index)[0])
+
+    def _candidate_strings(self, query: str) -> Set[int]:
+        if len(query) >= NGRAM_SIZE:
+            postings = []
+            for gram in _ngrams(query):
+                gram_postings = self._grams.get(gram)
+                if not len(gram_postings):
+                    return set()
+                postings.append(gram_postings)
+            postings.sort(key=len)
+            candidates = set(postings[0])
+            for gram_postings in postings[1:]:
+                candidates.intersection_update(gram_postings)
+                if not candidates:
+                    return candidates
+            return {index for index in candidates if query in self.string(self._search_strings[index])}
+
+        candidates = set()
+        for token_postings in self._tokens.prefix(query):
+            candidates.update(token_postings)
+        return candidates
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[str]:
+        """Search names, brands and indications with the same ranking as DrugSearchIndex"""
+        query = query.lower().strip()
+        if not query or limit == 0:
+            return []
+
+        levels: List[Set[int]] = [set() for _ in range(9)]
+        for index in self._candidate_strings(query):
+            text = self.string(self._search_strings[index])
+            match_rank = 2 if not text.startswith(query) else 0 if text == query else 1
+            for field, (ptr, rows) in enumerate(self._field_rows):
+                levels[field * 3 + match_rank].update(rows[ptr[index]:ptr[index + 1]])
+
+        # Rows are sorted by name, so row order is the name tie-break
+        results: List[int] = []
+        seen: Set[int] = set()
+        for level_rows in levels:
+            level_rows -= seen
+            if not level_rows:
+                continue
+            if limit is not None and len(results) + len(level_rows) >= limit:
+                results.extend(heapq.nsmallest(limit - len(results), level_rows))
+                break
+            results.extend(sorted(level_rows))
+            seen |= level_rows
+        return [self._name(row) for row in results]
+
+    def iter_interactions(self) -> List[Tuple[str, str, str, str, str]]:
+        values = self._interactions
+        return [
+            tuple(self.string(values[start + offset]) for offset in range(INTERACTION_WIDTH))
+            for start in range(0, len(values), INTERACTION_WIDTH)
+        ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.meta, path=self.path, mapped_bytes=len(self._mmap))
+
+
+def _main(argv: List[str]) -> int:
+    if len(argv) != 3 or argv[1] != 'build':
+        print("usage: python -m data.catalog_snapshot build <snapshot_path>")
+        return 2
+
+    from data.database_loader import build_knowledge_base
+
+    # Class rules are compiled when the snapshot is loaded, not stored in it
+    knowledge_base = build_knowledge_base(use_snapshot=False, compile_rules=False)
+    drug_db = knowledge_base.drug_db
+    drugs = {name: drug_db.get_drug_info(name) for name in drug_db.get_all_drugs()}
+    interactions = [
+        (drug1, drug2, data['severity'], data['description'], data['recommendation'])
+        for (drug1, drug2), data in knowledge_base.interaction_checker.interaction_database.items()
+    ]
+    meta = build_snapshot(drugs, interactions, argv[2])
+    print(f"Wrote {argv[2]} (catalog {meta['catalog_version']}): "
+          f"{meta['drugs']} drugs, {meta['interactions']} interactions, {meta['strings']} strings")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main(sys.argv))
@@ -9,6 +9,7 @@ COMPREHENSIVE_DRUG_DATA = {
         "generic_name": "Atorvastatin Calcium",
         "brand_names": ["Lipitor", "Atorlip", "Storvas"],
         "category": "HMG-CoA Reductase Inhibitor (Statin)",
+        "enzyme_roles": {"CYP3A4": ["substrate"], "OATP1B1": ["substrate"]},
         "indications": ["Hypercholesterolemia", "Mixed dyslipidemia", "Primary prevention of CAD"],
         "contraindications": ["Active liver disease", "Pregnancy", "Breastfeeding", "Myopathy"],
         "side_effects": ["Muscle pain", "Liver enzyme elevation", "Headache", "GI upset"],
@@ -24,6 +25,7 @@ COMPREHENSIVE_DRUG_DATA = {
         "generic_name": "Amlodipine Besylate",
         "brand_names": ["Norvasc", "Amlovas", "Stamlo"],
         "category": "Calcium Channel Blocker",
+        "enzyme_roles": {"CYP3A4": ["substrate"]},
         "indications": ["Hypertension", "Chronic stable angina", "Vasospastic angina"],
         "contraindications": ["Severe hypotension", "Cardiogenic shock", "Severe aortic stenosis"],
         "side_effects": ["Peripheral edema", "Dizziness", "Flushing", "Fatigue"],
@@ -39,6 +41,7 @@ COMPREHENSIVE_DRUG_DATA = {
         "generic_name": "Metoprolol Tartrate/Succinate",
         "brand_names": ["Lopressor", "Toprol-XL", "Betaloc"],
         "category": "Beta-1 Selective Blocker",
+        "enzyme_roles": {"CYP2D6": ["substrate"]},
         "indications": ["Hypertension", "Angina", "Heart failure", "Post-MI"],
         "contraindications": ["Severe bradycardia", "Heart block", "Cardiogenic shock", "Severe asthma"],
         "side_effects": ["Fatigue", "Dizziness", "Bradycardia", "Cold extremities"],
@@ -54,6 +57,7 @@ COMPREHENSIVE_DRUG_DATA = {
         "generic_name": "Losartan Potassium",
         "brand_names": ["Cozaar", "Losacar", "Losazest"],
         "category": "Angiotensin Receptor Blocker (ARB)",
+        "enzyme_roles": {"CYP2C9": ["substrate"], "CYP3A4": ["substrate"]},
         "indications": ["Hypertension", "Diabetic nephropathy", "Heart failure"],
         "contraindications": ["Pregnancy", "Bilateral renal artery stenosis", "Hyperkalemia"],
         "side_effects": ["Dizziness", "Upper respiratory infection", "Hyperkalemia"],
@@ -101,6 +105,7 @@ COMPREHENSIVE_DRUG_DATA = {
         "generic_name": "Glipizide",
         "brand_names": ["Glucotrol", "Glucotrol XL", "Glynase"],
         "category": "Sulfonylurea",
+        "enzyme_roles": {"CYP2C9": ["substrate"]},
         "indications": ["Type 2 diabetes mellitus"],
         "contraindications": ["Type 1 diabetes", "Diabetic ketoacidosis", "Severe renal impairment"],
         "side_effects": ["Hypoglycemia", "Weight gain", "GI upset"],
@@ -116,6 +121,7 @@ COMPREHENSIVE_DRUG_DATA = {
         "generic_name": "Sitagliptin Phosphate",
         "brand_names": ["Januvia", "Xelevia"],
         "category": "DPP-4 Inhibitor",
+        "enzyme_roles": {"CYP3A4": ["substrate"]},
         "indications": ["Type 2 diabetes mellitus"],
         "contraindications": ["Type 1 diabetes", "Diabetic ketoacidosis"],
         "side_effects": ["Upper respiratory infection", "Headache", "Pancreatitis (rare)"],
@@ -163,6 +169,7 @@ COMPREHENSIVE_DRUG_DATA = {
         "generic_name": "Ciprofloxacin Hydrochloride",
         "brand_names": ["Cipro", "Ciloxan", "Ciproxin"],
         "category": "Fluoroquinolone Antibiotic",
+        "enzyme_roles": {"CYP1A2": ["strong_inhibitor"]},
         "indications": ["UTI", "Respiratory infections", "GI infections", "Anthrax exposure"],
         "contraindications": ["Fluoroquinolone allergy", "Myasthenia gravis", "Tendon disorders"],
         "side_effects": ["Tendon rupture", "QT prolongation", "CNS effects", "C. diff colitis"],
@@ -180,6 +187,7 @@ COMPREHENSIVE_DRUG_DATA = {
         "generic_name": "Ibuprofen",
         "brand_names": ["Advil", "Motrin", "Brufen"],
         "category": "NSAID",
+        "enzyme_roles": {"CYP2C9": ["substrate"]},
         "indications": ["Pain", "Fever", "Inflammation", "Dysmenorrhea"],
         "contraindications": ["NSAID allergy", "Active GI bleeding", "Severe heart failure", "Late pregnancy"],
         "side_effects": ["GI upset", "Cardiovascular risk", "Renal impairment", "Bleeding"],
@@ -210,6 +218,7 @@ COMPREHENSIVE_DRUG_DATA = {
         "generic_name": "Tramadol Hydrochloride",
         "brand_names": ["Ultram", "Tramal", "Tramacet"],
         "category": "Opioid Analgesic",
+        "enzyme_roles": {"CYP2D6": ["substrate"], "CYP3A4": ["substrate"]},
         "indications": ["Moderate to severe pain"],
         "contraindications": ["Opioid allergy", "Respiratory depression", "Paralytic ileus", "MAO inhibitor use"],
         "side_effects": ["Nausea", "Dizziness", "Constipation", "Sedation", "Seizures"],
@@ -242,6 +251,7 @@ COMPREHENSIVE_DRUG_DATA = {
         "generic_name": "Montelukast Sodium",
         "brand_names": ["Singulair", "Montair", "Montek"],
         "category": "Leukotriene Receptor Antagonist",
+        "enzyme_roles": {"CYP2C8": ["substrate"], "CYP3A4": ["substrate"]},
         "indications": ["Asthma", "Allergic rhinitis", "Exercise-induced bronchospasm"],
         "contraindications": ["Montelukast allergy"],
         "side_effects": ["Headache", "Behavioral changes", "Fatigue", "GI upset"],
@@ -259,6 +269,7 @@ COMPREHENSIVE_DRUG_DATA = {
         "generic_name": "Sertraline Hydrochloride",
         "brand_names": ["Zoloft", "Lustral", "Serlift"],
         "category": "SSRI Antidepressant",
+        "enzyme_roles": {"CYP2D6": ["inhibitor"], "CYP2C19": ["substrate"]},
         "indications": ["Depression", "Anxiety disorders", "OCD", "PTSD", "Panic disorder"],
         "contraindications": ["SSRI allergy", "MAO inhibitor use", "Pimozide use"],
         "side_effects": ["Nausea", "Sexual dysfunction", "Weight changes", "Serotonin syndrome"],
@@ -291,6 +302,7 @@ COMPREHENSIVE_DRUG_DATA = {
         "generic_name": "Omeprazole",
         "brand_names": ["Prilosec", "Losec", "Omez"],
         "category": "Proton Pump Inhibitor",
+        "enzyme_roles": {"CYP2C19": ["substrate", "inhibitor"], "CYP3A4": ["substrate"]},
         "indications": ["GERD", "Peptic ulcer", "H. pylori infection", "Zollinger-Ellison syndrome"],
         "contraindications": ["PPI allergy", "Concurrent rilpivirine use"],
         "side_effects": ["Headache", "GI upset", "C. diff risk", "Bone fractures (long-term)"],
@@ -326,6 +338,7 @@ COMPREHENSIVE_DRUG_DATA = {
         "generic_name": "Prednisone",
         "brand_names": ["Deltasone", "Predone", "Sterapred"],
         "category": "Corticosteroid",
+        "enzyme_roles": {"CYP3A4": ["substrate"]},
         "indications": ["Inflammatory conditions", "Autoimmune disorders", "Allergic reactions", "Asthma"],
         "contraindications": ["Systemic fungal infections", "Live vaccine administration"],
         "side_effects": ["Weight gain", "Hyperglycemia", "Mood changes", "Immunosuppression"],
@@ -341,12 +354,16 @@ COMPREHENSIVE_DRUG_DATA = {
     # Additional 80+ drugs to complete the dataset
     "hydrochlorothiazide": {"generic_name": "Hydrochlorothiazide", "brand_names": ["Microzide", "HCTZ"], "category": "Thiazide Diuretic", "indications": ["Hypertension", "Edema"], "contraindications": ["Anuria", "Sulfonamide allergy"], "side_effects": ["Hypokalemia", "Hyperuricemia", "Photosensitivity"], "dosage_forms": ["Tablet", "Capsule"], "strength_options": ["12.5mg", "25mg", "50mg"], "age_restrictions": {"pediatric": "Limited data in children", "adult": "Standard dosing: 12.5-50mg daily", "geriatric": "Monitor electrolytes closely"}},
     "gabapentin": {"generic_name": "Gabapentin", "brand_names": ["Neurontin", "Gralise"], "category": "Anticonvulsant", "indications": ["Epilepsy", "Neuropathic pain", "Restless leg syndrome"], "contraindications": ["Gabapentin allergy"], "side_effects": ["Dizziness", "Fatigue", "Peripheral edema"], "dosage_forms": ["Capsule", "Tablet", "Solution"], "strength_options": ["100mg", "300mg", "400mg", "600mg", "800mg"], "age_restrictions": {"pediatric": "Safe ≥3 years for epilepsy", "adult": "Standard dosing: 300-3600mg daily in divided doses", "geriatric": "Reduce dose for renal impairment"}},
-    "pantoprazole": {"generic_name": "Pantoprazole Sodium", "brand_names": ["Protonix", "Pantoloc"], "category": "Proton Pump Inhibitor", "indications": ["GERD", "Erosive esophagitis", "Zollinger-Ellison syndrome"], "contraindications": ["PPI allergy"], "side_effects": ["Headache", "Diarrhea", "Nausea"], "dosage_forms": ["Tablet", "IV"], "strength_options": ["20mg", "40mg"], "age_restrictions": {"pediatric": "Safe ≥5 years", "adult": "Standard dosing: 20-40mg daily", "geriatric": "No dose adjustment needed"}},
-    "citalopram": {"generic_name": "Citalopram Hydrobromide", "brand_names": ["Celexa", "Cipramil"], "category": "SSRI Antidepressant", "indications": ["Depression", "Anxiety disorders"], "contraindications": ["MAO inhibitor use", "QT prolongation"], "side_effects": ["Nausea", "Dry mouth", "Sexual dysfunction"], "dosage_forms": ["Tablet", "Oral solution"], "strength_options": ["10mg", "20mg", "40mg"], "age_restrictions": {"pediatric": "Not recommended <18 years", "adult": "Standard dosing: 20-40mg daily", "geriatric": "Maximum 20mg daily"}},
-    "hydrocodone": {"generic_name": "Hydrocodone Bitartrate", "brand_names": ["Vicodin", "Norco", "Lortab"], "category": "Opioid Analgesic", "indications": ["Moderate to severe pain"], "contraindications": ["Respiratory depression", "Paralytic ileus"], "side_effects": ["Sedation", "Constipation", "Respiratory depression"], "dosage_forms": ["Tablet", "Capsule", "Solution"], "strength_options": ["5mg", "7.5mg", "10mg"], "age_restrictions": {"pediatric": "Use with extreme caution", "adult": "Standard dosing: 5-10mg every 4-6 hours", "geriatric": "Start with lower doses"}},
-    "fluoxetine": {"generic_name": "Fluoxetine Hydrochloride", "brand_names": ["Prozac", "Sarafem"], "category": "SSRI Antidepressant", "indications": ["Depression", "OCD", "Bulimia nervosa", "Panic disorder"], "contraindications": ["MAO inhibitor use", "Pimozide use"], "side_effects": ["Nausea", "Insomnia", "Anxiety"], "dosage_forms": ["Capsule", "Tablet", "Solution"], "strength_options": ["10mg", "20mg", "40mg"], "age_restrictions": {"pediatric": "Approved ≥8 years for depression", "adult": "Standard dosing: 20-80mg daily", "geriatric": "Start with lower doses"}},
-    "trazodone": {"generic_name": "Trazodone Hydrochloride", "brand_names": ["Desyrel", "Oleptro"], "category": "Atypical Antidepressant", "indications": ["Depression", "Insomnia"], "contraindications": ["MAO inhibitor use"], "side_effects": ["Sedation", "Orthostatic hypotension", "Priapism"], "dosage_forms": ["Tablet", "Extended-release tablet"], "strength_options": ["50mg", "100mg", "150mg", "300mg"], "age_restrictions": {"pediatric": "Limited data in children", "adult": "Standard dosing: 50-400mg daily", "geriatric": "Start with lower doses"}},
-    "alprazolam": {"generic_name": "Alprazolam", "brand_names": ["Xanax", "Niravam"], "category": "Benzodiazepine", "indications": ["Anxiety disorders", "Panic disorder"], "contraindications": ["Severe respiratory insufficiency", "Acute narrow-angle glaucoma"], "side_effects": ["Sedation", "Dependence", "Memory impairment"], "dosage_forms": ["Tablet", "Extended-release tablet", "Solution"], "strength_options": ["0.25mg", "0.5mg", "1mg", "2mg"], "age_restrictions": {"pediatric": "Not recommended <18 years", "adult": "Standard dosing: 0.25-2mg 2-3 times daily", "geriatric": "Start with 0.125mg twice daily"}}
+    "pantoprazole": {"generic_name": "Pantoprazole Sodium", "brand_names": ["Protonix", "Pantoloc"], "category": "Proton Pump Inhibitor", "enzyme_roles": {"CYP2C19": ["substrate"]}, "indications": ["GERD", "Erosive esophagitis", "Zollinger-Ellison syndrome"], "contraindications": ["PPI allergy"], "side_effects": ["Headache", "Diarrhea", "Nausea"], "dosage_forms": ["Tablet", "IV"], "strength_options": ["20mg", "40mg"], "age_restrictions": {"pediatric": "Safe ≥5 years", "adult": "Standard dosing: 20-40mg daily", "geriatric": "No dose adjustment needed"}},
+    "citalopram": {"generic_name": "Citalopram Hydrobromide", "brand_names": ["Celexa", "Cipramil"], "category": "SSRI Antidepressant", "enzyme_roles": {"CYP2C19": ["substrate"], "CYP3A4": ["substrate"], "CYP2D6": ["inhibitor"]}, "indications": ["Depression", "Anxiety disorders"], "contraindications": ["MAO inhibitor use", "QT prolongation"], "side_effects": ["Nausea", "Dry mouth", "Sexual dysfunction"], "dosage_forms": ["Tablet", "Oral solution"], "strength_options": ["10mg", "20mg", "40mg"], "age_restrictions": {"pediatric": "Not recommended <18 years", "adult": "Standard dosing: 20-40mg daily", "geriatric": "Maximum 20mg daily"}},
+    "hydrocodone": {"generic_name": "Hydrocodone Bitartrate", "brand_names": ["Vicodin", "Norco", "Lortab"], "category": "Opioid Analgesic", "enzyme_roles": {"CYP3A4": ["substrate"], "CYP2D6": ["substrate"]}, "indications": ["Moderate to severe pain"], "contraindications": ["Respiratory depression", "Paralytic ileus"], "side_effects": ["Sedation", "Constipation", "Respiratory depression"], "dosage_forms": ["Tablet", "Capsule", "Solution"], "strength_options": ["5mg", "7.5mg", "10mg"], "age_restrictions": {"pediatric": "Use with extreme caution", "adult": "Standard dosing: 5-10mg every 4-6 hours", "geriatric": "Start with lower doses"}},
+    "fluoxetine": {"generic_name": "Fluoxetine Hydrochloride", "brand_names": ["Prozac", "Sarafem"], "category": "SSRI Antidepressant", "enzyme_roles": {"CYP2D6": ["substrate", "strong_inhibitor"], "CYP2C19": ["inhibitor"]}, "indications": ["Depression", "OCD", "Bulimia nervosa", "Panic disorder"], "contraindications": ["MAO inhibitor use", "Pimozide use"], "side_effects": ["Nausea", "Insomnia", "Anxiety"], "dosage_forms": ["Capsule", "Tablet", "Solution"], "strength_options": ["10mg", "20mg", "40mg"], "age_restrictions": {"pediatric": "Approved ≥8 years for depression", "adult": "Standard dosing: 20-80mg daily", "geriatric": "Start with lower doses"}},
+    "trazodone": {"generic_name": "Trazodone Hydrochloride", "brand_names": ["Desyrel", "Oleptro"], "category": "Atypical Antidepressant", "enzyme_roles": {"CYP3A4": ["substrate"]}, "indications": ["Depression", "Insomnia"], "contraindications": ["MAO inhibitor use"], "side_effects": ["Sedation", "Orthostatic hypotension", "Priapism"], "dosage_forms": ["Tablet", "Extended-release tablet"], "strength_options": ["50mg", "100mg", "150mg", "300mg"], "age_restrictions": {"pediatric": "Limited data in children", "adult": "Standard dosing: 50-400mg daily", "geriatric": "Start with lower doses"}},
+    "alprazolam": {"generic_name": "Alprazolam", "brand_names": ["Xanax", "Niravam"], "category": "Benzodiazepine", "enzyme_roles": {"CYP3A4": ["substrate"]}, "indications": ["Anxiety disorders", "Panic disorder"], "contraindications": ["Severe respiratory insufficiency", "Acute narrow-angle glaucoma"], "side_effects": ["Sedation", "Dependence", "Memory impairment"], "dosage_forms": ["Tablet", "Extended-release tablet", "Solution"], "strength_options": ["0.25mg", "0.5mg", "1mg", "2mg"], "age_restrictions": {"pediatric": "Not recommended <18 years", "adult": "Standard dosing: 0.25-2mg 2-3 times daily", "geriatric": "Start with 0.125mg twice daily"}},
+    "clarithromycin": {"generic_name": "Clarithromycin", "brand_names": ["Biaxin"], "category": "Macrolide Antibiotic", "enzyme_roles": {"CYP3A4": ["strong_inhibitor"], "P-gp": ["inhibitor"]}, "indications": ["Respiratory tract infections", "H. pylori eradication", "Skin infections"], "contraindications": ["QT prolongation", "Concurrent simvastatin or lovastatin", "Macrolide allergy"], "side_effects": ["Taste disturbance", "GI upset", "QT prolongation"], "dosage_forms": ["Tablet", "Extended-release tablet", "Suspension"], "strength_options": ["250mg", "500mg"], "age_restrictions": {"pediatric": "Weight-based dosing ≥6 months", "adult": "Standard dosing: 250-500mg twice daily", "geriatric": "Adjust for renal impairment"}},
+    "clopidogrel": {"generic_name": "Clopidogrel Bisulfate", "brand_names": ["Plavix"], "category": "P2Y12 Inhibitor (Antiplatelet)", "enzyme_roles": {"CYP2C19": ["substrate"], "CYP2C8": ["inhibitor"]}, "indications": ["Acute coronary syndrome", "Stroke prevention", "Peripheral artery disease"], "contraindications": ["Active bleeding", "Severe hepatic impairment"], "side_effects": ["Bleeding", "Bruising", "Dyspepsia"], "dosage_forms": ["Tablet"], "strength_options": ["75mg", "300mg"], "age_restrictions": {"pediatric": "Safety not established", "adult": "Standard dosing: 75mg daily", "geriatric": "No loading dose adjustment in most patients; monitor bleeding"}},
+    "fluconazole": {"generic_name": "Fluconazole", "brand_names": ["Diflucan"], "category": "Azole Antifungal", "enzyme_roles": {"CYP2C9": ["strong_inhibitor"], "CYP2C19": ["strong_inhibitor"], "CYP3A4": ["inhibitor"]}, "indications": ["Candidiasis", "Cryptococcal meningitis", "Fungal prophylaxis"], "contraindications": ["QT prolongation", "Azole allergy"], "side_effects": ["Headache", "Nausea", "Liver enzyme elevation"], "dosage_forms": ["Tablet", "Suspension", "IV"], "strength_options": ["50mg", "100mg", "150mg", "200mg"], "age_restrictions": {"pediatric": "Weight-based dosing", "adult": "Standard dosing: 150-400mg daily", "geriatric": "Adjust for renal function"}},
+    "rifampin": {"generic_name": "Rifampin", "brand_names": ["Rifadin", "Rimactane"], "category": "Rifamycin Antibiotic", "enzyme_roles": {"CYP3A4": ["inducer"], "CYP2C9": ["inducer"], "CYP2C19": ["inducer"], "P-gp": ["inducer"]}, "indications": ["Tuberculosis", "Meningococcal carrier state"], "contraindications": ["Jaundice", "Concurrent protease inhibitors"], "side_effects": ["Orange body fluids", "Hepatotoxicity", "GI upset"], "dosage_forms": ["Capsule", "IV"], "strength_options": ["150mg", "300mg"], "age_restrictions": {"pediatric": "Weight-based dosing", "adult": "Standard dosing: 600mg daily", "geriatric": "Monitor liver function"}}
 }
 
 # Drug interactions for the expanded dataset
@@ -421,4 +438,137 @@ COMPREHENSIVE_INTERACTIONS = [
         "description": "Non-selective beta-blocker antagonizes bronchodilator effects",
         "recommendation": "Use cardioselective beta-blocker or alternative bronchodilator"
     }
-]
\ No newline at end of file
+]
+# Class-level interaction rules. Each side lists drug categories and/or
+# individual drugs; every cross pair is compiled into a concrete interaction
+# at load time. Explicit drug-pair interactions above take precedence.
+CLASS_INTERACTION_RULES = [
+    {
+        "name": "NSAID + anticoagulant",
+        "left": {"categories": ["NSAID", "NSAID/Antiplatelet"]},
+        "right": {"categories": ["Anticoagulant"], "drugs": ["warfarin", "apixaban", "rivaroxaban", "heparin"]},
+        "severity": "High",
+        "description": "NSAIDs add antiplatelet effects and GI mucosal injury to anticoagulation, raising bleeding risk",
+        "recommendation": "Avoid combination; use acetaminophen for analgesia or add GI protection and monitor for bleeding"
+    },
+    {
+        "name": "SSRI + serotonergic opioid",
+        "left": {"categories": ["SSRI Antidepressant"]},
+        "right": {"drugs": ["tramadol", "meperidine", "methadone", "fentanyl", "tapentadol"]},
+        "severity": "High",
+        "description": "Combined serotonergic activity can cause serotonin syndrome",
+        "recommendation": "Prefer a non-serotonergic analgesic; if combined, start low and monitor for serotonin toxicity"
+    },
+    {
+        "name": "Opioid + benzodiazepine",
+        "left": {"categories": ["Opioid Analgesic"]},
+        "right": {"categories": ["Benzodiazepine"]},
+        "severity": "High",
+        "description": "Additive CNS and respiratory depression",
+        "recommendation": "Avoid concurrent use where possible; use lowest doses and monitor sedation and breathing"
+    },
+    {
+        "name": "SSRI + NSAID",
+        "left": {"categories": ["SSRI Antidepressant"]},
+        "right": {"categories": ["NSAID", "NSAID/Antiplatelet"]},
+        "severity": "Moderate",
+        "description": "SSRIs impair platelet serotonin uptake; with NSAIDs the risk of GI bleeding rises",
+        "recommendation": "Consider a PPI for GI protection and monitor for signs of bleeding"
+    },
+    {
+        "name": "Loop diuretic + thiazide diuretic",
+        "left": {"categories": ["Loop Diuretic"]},
+        "right": {"categories": ["Thiazide Diuretic"]},
+        "severity": "Moderate",
+        "description": "Sequential nephron blockade increases risk of hypokalemia and volume depletion",
+        "recommendation": "Monitor electrolytes, renal function and fluid status closely"
+    },
+    {
+        "name": "Fluoroquinolone + corticosteroid",
+        "left": {"categories": ["Fluoroquinolone Antibiotic"]},
+        "right": {"categories": ["Corticosteroid"]},
+        "severity": "Moderate",
+        "description": "Increased risk of tendinitis and tendon rupture",
+        "recommendation": "Counsel patient to report tendon pain; consider alternative antibiotic in older adults"
+    },
+    {
+        "name": "Fluoroquinolone + sulfonylurea",
+        "left": {"categories": ["Fluoroquinolone Antibiotic"]},
+        "right": {"categories": ["Sulfonylurea"]},
+        "severity": "Moderate",
+        "description": "Fluoroquinolones can cause severe hypoglycemia in patients on sulfonylureas",
+        "recommendation": "Monitor blood glucose closely during antibiotic therapy"
+    },
+    {
+        "name": "ACE inhibitor / ARB + potassium-sparing diuretic",
+        "left": {"categories": ["ACE Inhibitor", "Angiotensin Receptor Blocker (ARB)"]},
+        "right": {"categories": ["Potassium-sparing Diuretic"], "drugs": ["spironolactone", "eplerenone", "amiloride"]},
+        "severity": "High",
+        "description": "Risk of hyperkalemia",
+        "recommendation": "Monitor potassium and renal function; avoid potassium supplements"
+    }
+]
+
+# Multi-drug rules for hazards that only appear in combination. Each entry
+# in "requires" lists categories and/or drugs and a minimum count (default
+# 1); the rule applies when every entry is met by different drugs.
+MULTI_DRUG_RULES = [
+    {
+        "name": "Triple whammy (ACE inhibitor/ARB + diuretic + NSAID)",
+        "requires": [
+            {"categories": ["ACE Inhibitor", "Angiotensin Receptor Blocker (ARB)"]},
+            {"categories": ["Loop Diuretic", "Thiazide Diuretic", "Potassium-sparing Diuretic"],
+             "drugs": ["spironolactone", "eplerenone", "amiloride"]},
+            {"categories": ["NSAID", "NSAID/Antiplatelet"]}
+        ],
+        "severity": "High",
+        "description": "Combined loss of renal autoregulation, volume depletion and prostaglandin blockade can cause acute kidney injury",
+        "recommendation": "Avoid the NSAID; if unavoidable, check renal function and potassium within a week and ensure hydration"
+    },
+    {
+        "name": "QT prolongation (3 or more QT-prolonging drugs)",
+        "requires": [
+            {"drugs": ["citalopram", "escitalopram", "trazodone", "azithromycin", "clarithromycin",
+                       "erythromycin", "ciprofloxacin", "levofloxacin", "fluconazole", "ondansetron",
+                       "haloperidol", "methadone", "amiodarone", "sotalol", "hydroxychloroquine"],
+             "min_count": 3}
+        ],
+        "severity": "High",
+        "description": "Additive QT interval prolongation raises the risk of torsades de pointes",
+        "recommendation": "Obtain a baseline ECG and electrolytes; replace at least one agent with a non-QT-prolonging alternative"
+    },
+    {
+        "name": "Serotonergic load (3 or more serotonergic drugs)",
+        "requires": [
+            {"categories": ["SSRI Antidepressant"],
+             "drugs": ["trazodone", "tramadol", "meperidine", "methadone", "fentanyl", "ondansetron",
+                       "sumatriptan", "linezolid", "venlafaxine", "duloxetine"],
+             "min_count": 3}
+        ],
+        "severity": "High",
+        "description": "Stacked serotonergic drugs markedly raise the risk of serotonin syndrome",
+        "recommendation": "Reduce the number of serotonergic agents and monitor for agitation, hyperthermia, clonus and tremor"
+    },
+    {
+        "name": "CNS depressant stacking (opioid + benzodiazepine + gabapentinoid)",
+        "requires": [
+            {"categories": ["Opioid Analgesic"]},
+            {"categories": ["Benzodiazepine"]},
+            {"drugs": ["gabapentin", "pregabalin"]}
+        ],
+        "severity": "High",
+        "description": "Three CNS depressants together cause profound sedation and respiratory depression",
+        "recommendation": "Avoid the combination; taper one agent and, if continued, prescribe naloxone and monitor breathing"
+    },
+    {
+        "name": "Bleeding stack (anticoagulant + antiplatelet + NSAID)",
+        "requires": [
+            {"categories": ["Anticoagulant"], "drugs": ["warfarin", "apixaban", "rivaroxaban", "heparin"]},
+            {"categories": ["P2Y12 Inhibitor (Antiplatelet)"], "drugs": ["aspirin", "clopidogrel"]},
+            {"categories": ["NSAID", "NSAID/Antiplatelet"]}
+        ],
+        "severity": "High",
+        "description": "Anticoagulant, antiplatelet and NSAID effects together sharply increase major bleeding risk",
+        "recommendation": "Stop the NSAID, review the need for dual antithrombotic therapy and add GI protection"
+    }
+]
@@ -0,0 +1,190 @@
+"""
+Patient Conditions
+Condition codes for patient conditions and free-text contraindications, and a
+condition -> drugs index built when drugs are loaded
+"""
+
+import re
+from functools import lru_cache
+from typing import AbstractSet, Dict, FrozenSet, Iterable, List, Mapping, NamedTuple, Optional, Set
+
+# Condition code -> (display label, lowercase phrases that mean it). Patient
+# condition pickers and catalog contraindications both normalize to these codes.
+CONDITIONS = {
+    'renal_impairment': ('Chronic Kidney Disease', ['chronic kidney disease', 'kidney disease', 'ckd',
+                                                    'renal impairment', 'severe renal impairment', 'renal failure',
+                                                    'anuria']),
+    'hepatic_impairment': ('Liver Disease', ['liver disease', 'active liver disease', 'hepatic impairment',
+                                             'severe hepatic impairment', 'hepatic coma', 'jaundice', 'cirrhosis']),
+    'heart_failure': ('Heart Failure', ['heart failure', 'severe heart failure', 'congestive heart failure', 'chf']),
+    'coronary_artery_disease': ('Coronary Artery Disease', ['coronary artery disease', 'heart disease', 'cad']),
+    'acute_mi': ('Acute Myocardial Infarction', ['acute mi', 'acute myocardial infarction', 'myocardial infarction']),
+    'atrial_fibrillation': ('Atrial Fibrillation', ['atrial fibrillation', 'afib']),
+    'hypertension': ('Hypertension', ['hypertension', 'high blood pressure']),
+    'hypotension': ('Hypotension', ['hypotension', 'severe hypotension', 'cardiogenic shock']),
+    'bradycardia': ('Bradycardia / Heart Block', ['bradycardia', 'severe bradycardia', 'heart block']),
+    'qt_prolongation': ('QT Prolongation', ['qt prolongation', 'long qt syndrome', 'long qt']),
+    'aortic_stenosis': ('Aortic Stenosis', ['aortic stenosis', 'severe aortic stenosis']),
+    'renal_artery_stenosis': ('Renal Artery Stenosis', ['renal artery stenosis', 'bilateral renal artery stenosis']),
+    'hyperlipidemia': ('Hyperlipidemia', ['hyperlipidemia', 'high cholesterol']),
+    'diabetes_type_2': ('Diabetes Type 2', ['diabetes type 2', 'type 2 diabetes', 'diabetes']),
+    'diabetes_type_1': ('Diabetes Type 1', ['diabetes type 1', 'type 1 diabetes']),
+    'diabetic_ketoacidosis': ('Diabetic Ketoacidosis', ['diabetic ketoacidosis', 'dka']),
+    'hypoglycemia': ('Hypoglycemia', ['hypoglycemia']),
+    'hyperkalemia': ('Hyperkalemia', ['hyperkalemia']),
+    'electrolyte_depletion': ('Electrolyte Depletion', ['electrolyte depletion', 'severe electrolyte depletion']),
+    'hypothyroidism': ('Hypothyroidism', ['hypothyroidism']),
+    'thyrotoxicosis': ('Thyrotoxicosis', ['thyrotoxicosis', 'hyperthyroidism']),
+    'adrenal_insufficiency': ('Adrenal Insufficiency', ['adrenal insufficiency', 'uncorrected adrenal insufficiency']),
+    'active_bleeding': ('Active Bleeding', ['active bleeding', 'active gi bleeding', 'gi bleeding']),
+    'gerd': ('GERD', ['gerd', 'acid reflux']),
+    'paralytic_ileus': ('Paralytic Ileus', ['paralytic ileus']),
+    'asthma': ('Asthma', ['asthma', 'severe asthma']),
+    'copd': ('COPD', ['copd', 'chronic obstructive pulmonary disease']),
+    'respiratory_depression': ('Respiratory Insufficiency', ['respiratory depression', 'respiratory insufficiency',
+                                                             'severe respiratory insufficiency']),
+    'sleep_apnea': ('Sleep Apnea', ['sleep apnea']),
+    'myasthenia_gravis': ('Myasthenia Gravis', ['myasthenia gravis']),
+    'myopathy': ('Myopathy', ['myopathy']),
+    'tendon_disorder': ('Tendon Disorders', ['tendon disorders', 'tendon disorder']),
+    'glaucoma': ('Narrow-Angle Glaucoma', ['narrow-angle glaucoma', 'acute narrow-angle glaucoma', 'glaucoma']),
+    'systemic_fungal_infection': ('Systemic Fungal Infection', ['systemic fungal infections',
+                                                                'systemic fungal infection']),
+    'angioedema': ('Angioedema History', ['angioedema', 'angioedema history']),
+    'pregnancy': ('Pregnancy', ['pregnancy', 'late pregnancy', 'pregnant']),
+    'breastfeeding': ('Breastfeeding', ['breastfeeding', 'lactation']),
+    'depression': ('Depression', ['depression']),
+    'anxiety': ('Anxiety', ['anxiety']),
+    'osteoarthritis': ('Osteoarthritis', ['osteoarthritis', 'arthritis']),
+    'osteoporosis': ('Osteoporosis', ['osteoporosis'])
+}
+
+# Drug -> condition code -> precaution for patients with that condition
+CONDITION_WARNINGS = {
+    'aspirin': {
+        'renal_impairment': 'Use with caution, monitor renal function',
+        'heart_failure': 'Monitor for fluid retention',
+        'gerd': 'Increased risk of GI bleeding'
+    },
+    'metformin': {
+        'renal_impairment': 'Contraindicated if eGFR <30, use caution if eGFR 30-45',
+        'heart_failure': 'Monitor for lactic acidosis risk'
+    },
+    'lisinopril': {
+        'renal_impairment': 'Monitor renal function and potassium',
+        'diabetes_type_2': 'Beneficial for renal protection'
+    },
+    'warfarin': {
+        'atrial_fibrillation': 'Indicated for stroke prevention',
+        'renal_impairment': 'Monitor INR more frequently'
+    },
+    'simvastatin': {
+        'diabetes_type_2': 'Monitor for increased glucose levels',
+        'renal_impairment': 'Use with caution in severe impairment'
+    }
+}
+
+_ALIASES = {alias: code for code, (_, aliases) in CONDITIONS.items() for alias in aliases}
+# Longest phrases first so "type 1 diabetes" wins over "diabetes"
+_ALIAS_PATTERN = re.compile(
+    r'\b(' + '|'.join(re.escape(alias) for alias in sorted(_ALIASES, key=len, reverse=True)) + r')\b'
+)
+
+
+@lru_cache(maxsize=4096)
+def normalize_condition(text: str) -> Optional[str]:
+    """Get the condition code for a condition or contraindication phrase, or None"""
+    phrase = ' '.join(str(text).lower().split())
+    code = _ALIASES.get(phrase)
+    if code is None:
+        match = _ALIAS_PATTERN.search(phrase)
+        code = _ALIASES[match.group(1)] if match else None
+    return code
+
+
+def normalize_conditions(conditions: Iterable[str]) -> FrozenSet[str]:
+    """Get the codes of the recognized conditions in a list"""
+    return frozenset(code for code in map(normalize_condition, conditions) if code is not None)
+
+
+def condition_label(code: str) -> str:
+    return CONDITIONS[code][0] if code in CONDITIONS else code
+
+
+def condition_warnings(drug_key: str, codes: AbstractSet[str]) -> List[str]:
+    """Get a drug's precautions for a set of patient condition codes"""
+    drug_warnings = CONDITION_WARNINGS.get(drug_key, {})
+    return [warning for code, warning in drug_warnings.items() if code in codes]
+
+
+class ConditionFinding(NamedTuple):
+    """A drug flagged for one patient condition"""
+    drug_id: int
+    code: str
+    contraindicated: bool
+    detail: str
+
+
+class ConditionIndex:
+    """Condition code -> drug IDs postings for contraindications and precautions.
+
+    Free-text contraindications are normalized to condition codes once, when
+    a drug is indexed; checking a regimen against a patient's conditions is
+    then one set intersection per condition.
+    """
+
+    def __init__(self):
+        self._contraindicated: Dict[str, Set[int]] = {}
+        self._cautioned: Dict[str, Set[int]] = {}
+        # drug ID -> condition code -> contraindication text / precaution
+        self._drug_contraindications: Dict[int, Dict[str, str]] = {}
+        self._drug_warnings: Dict[int, Dict[str, str]] = {}
+
+    def add(self, drug_id: int, contraindications: Iterable[str], warnings: Mapping[str, str]) -> None:
+        """Index a drug's contraindications and precautions, replacing earlier ones"""
+        self.remove(drug_id)
+        coded: Dict[str, str] = {}
+        for contraindication in contraindications:
+            code = normalize_condition(contraindication)
+            if code is not None:
+                coded.setdefault(code, contraindication)
+        for postings, drug_conditions, entries in ((self._contraindicated, self._drug_contraindications, coded),
+                                                   (self._cautioned, self._drug_warnings, dict(warnings))):
+            if entries:
+                drug_conditions[drug_id] = entries
+                for code in entries:
+                    postings.setdefault(code, set()).add(drug_id)
+
+    def remove(self, drug_id: int) -> None:
+        for postings, drug_conditions in ((self._contraindicated, self._drug_contraindications),
+                                          (self._cautioned, self._drug_warnings)):
+            for code in drug_conditions.pop(drug_id, ()):
+                drug_ids = postings[code]
+                drug_ids.discard(drug_id)
+                if not drug_ids:
+                    del postings[code]
+
+    def match(self, drug_ids: AbstractSet[int], codes: AbstractSet[str]) -> List[ConditionFinding]:
+        """Find the drugs contraindicated or needing caution for any of the condition codes.
+
+        A drug gets one finding per condition; a precaution for a condition the
+        drug is contraindicated in is folded into the contraindication's detail.
+        """
+        findings = []
+        for code in sorted(codes):
+            contraindicated = self._contraindicated.get(code, set()) & drug_ids
+            for drug_id in sorted(contraindicated):
+                detail = self._drug_contraindications[drug_id][code]
+                warning = self._drug_warnings.get(drug_id, {}).get(code)
+                if warning:
+                    detail = f"{detail}; {warning}"
+                findings.append(ConditionFinding(drug_id, code, True, detail))
+            for drug_id in sorted((self._cautioned.get(code, set()) & drug_ids) - contraindicated):
+                findings.append(ConditionFinding(drug_id, code, False, self._drug_warnings[drug_id][code]))
+        return findings
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'conditions': len(set(self._contraindicated) | set(self._cautioned)),
+            'drugs': len(set(self._drug_contraindications) | set(self._drug_warnings))
+        }
@@ -3,31 +3,120 @@ Database Loader for Comprehensive Drug Dataset
 Loads 100+ drugs and interactions into the system
 """
 
-from data.comprehensive_drug_dataset import COMPREHENSIVE_DRUG_DATA, COMPREHENSIVE_INTERACTIONS
+import os
+from typing import Any, Dict, List, NamedTuple, Optional
+from data.catalog_snapshot import CatalogSnapshot, SnapshotError
 from data.drug_database import DrugDatabase
+from data.sqlite_store import SQLiteDrugStore
 from models.drug_interaction import DrugInteractionChecker
 import streamlit as st
 
-def load_comprehensive_database():
-    """Load the comprehensive drug database into the system"""
+# Store metadata key recording that the comprehensive dataset was loaded
+SEED_META_KEY = "comprehensive_dataset_loaded"
+
+class KnowledgeBase(NamedTuple):
+    """Drug catalog and interaction checker shared by every session of the server process"""
+    drug_db: DrugDatabase
+    interaction_checker: DrugInteractionChecker
+    load_report: Dict[str, Any]
+
+def _open_store() -> Optional[SQLiteDrugStore]:
+    """Open the SQLite backend configured by DRUG_DATABASE_PATH, if any"""
+    db_path = os.getenv("DRUG_DATABASE_PATH", "")
+    if not db_path:
+        return None
+    return SQLiteDrugStore(db_path)
+
+def _open_snapshot() -> Optional[CatalogSnapshot]:
+    """Map the catalog snapshot configured by DRUG_SNAPSHOT_PATH, if any"""
+    snapshot_path = os.getenv("DRUG_SNAPSHOT_PATH", "")
+    if not snapshot_path:
+        return None
+    try:
+        return CatalogSnapshot(snapshot_path)
+    except SnapshotError as e:
+        print(f"Ignoring drug catalog snapshot: {e}")
+        return None
+
+def _compile_derived_interactions(drug_db: DrugDatabase, interaction_checker: DrugInteractionChecker,
+                                  compile_rules: bool = True) -> Dict[str, Any]:
+    """Expand class-level rules, infer enzyme-mechanism interactions and index multi-drug rules over the loaded catalog"""
+    if not compile_rules:
+        return {'class_rule_pairs': {}, 'mechanism_pairs': {}, 'multi_drug_rules': {}}
+    from data.comprehensive_drug_dataset import CLASS_INTERACTION_RULES, MULTI_DRUG_RULES
+    class_rule_pairs = interaction_checker.compile_class_rules(CLASS_INTERACTION_RULES, drug_db.get_drugs_by_category)
+    profiles = []
+    for drug_name in sorted(drug_db.get_all_drugs()):
+        enzyme_roles = drug_db.get_drug_info(drug_name).get('enzyme_roles')
+        if enzyme_roles:
+            profiles.append((drug_name, enzyme_roles))
+    return {
+        'class_rule_pairs': class_rule_pairs,
+        'mechanism_pairs': interaction_checker.compile_mechanism_interactions(profiles),
+        'multi_drug_rules': interaction_checker.compile_multi_drug_rules(MULTI_DRUG_RULES, drug_db.get_drugs_by_category)
+    }
+
+def _knowledge_base_from_snapshot(snapshot: CatalogSnapshot, compile_rules: bool = True) -> KnowledgeBase:
+    """Build the knowledge base on top of a mapped snapshot without loading the dataset"""
+    drug_db = DrugDatabase(snapshot=snapshot)
+    interaction_checker = DrugInteractionChecker(resolver=drug_db.resolver)
+    
+    # Snapshot interactions are packed into the compressed read-only store
+    interactions = snapshot.iter_interactions()
+    interaction_checker.load_interactions(interactions)
+    derived = _compile_derived_interactions(drug_db, interaction_checker, compile_rules)
+    
+    return KnowledgeBase(drug_db, interaction_checker, {
+        'drugs_loaded': snapshot.count_drugs(),
+        'drugs_failed': [],
+        'interactions_loaded': len(interactions),
+        'interactions_failed': [],
+        'total_drugs': snapshot.count_drugs(),
+        'total_interactions': len(interactions),
+        **derived,
+        'catalog_version': snapshot.meta.get('catalog_version', '')
+    })
+
+def build_knowledge_base(use_snapshot: bool = True, compile_rules: bool = True) -> KnowledgeBase:
+    """Build the drug database and interaction checker from the comprehensive dataset.
+    
+    A configured SQLite store takes precedence; otherwise a configured snapshot
+    is mapped instead of importing and replaying the dataset. Class-level
+    interaction rules, enzyme-mechanism inferences and multi-drug rules are
+    added last unless compile_rules is False.
+    """
     
     # Initialize database components
-    drug_db = DrugDatabase()
-    interaction_checker = DrugInteractionChecker()
+    store = _open_store()
+    if store is None and use_snapshot:
+        snapshot = _open_snapshot()
+        if snapshot is not None:
+            return _knowledge_base_from_snapshot(snapshot, compile_rules)
     
-    # Load all drugs from the comprehensive dataset
-    success_count = 0
-    failed_drugs = []
+    # The dataset module is large; only import it when it is actually replayed
+    from data.comprehensive_drug_dataset import COMPREHENSIVE_DRUG_DATA, COMPREHENSIVE_INTERACTIONS
     
-    for drug_name, drug_data in COMPREHENSIVE_DRUG_DATA.items():
-        try:
-            success = drug_db.add_drug(drug_name, drug_data)
-            if success:
-                success_count += 1
-            else:
-                failed_drugs.append(drug_name)
-        except Exception as e:
-            failed_drugs.append(f"{drug_name} ({str(e)})")
+    drug_db = DrugDatabase(store=store)
+    interaction_checker = DrugInteractionChecker(store=store, resolver=drug_db.resolver)
+    
+    # A persistent store is seeded once; later edits made through the
+    # administration page survive restarts
+    if store is not None and store.get_meta(SEED_META_KEY):
+        # Rule pairs are compiled on every start and never persisted
+        return KnowledgeBase(drug_db, interaction_checker, {
+            'drugs_loaded': store.count_drugs(),
+            'drugs_failed': [],
+            'interactions_loaded': store.count_interactions(),
+            'interactions_failed': [],
+            'total_drugs': store.count_drugs(),
+            'total_interactions': store.count_interactions(),
+            **_compile_derived_interactions(drug_db, interaction_checker, compile_rules)
+        })
+    
+    # Load all drugs from the comprehensive dataset
+    drug_results = drug_db.bulk_add_drugs(COMPREHENSIVE_DRUG_DATA)
+    success_count = sum(drug_results.values())
+    failed_drugs = [drug_name for drug_name, success in drug_results.items() if not success]
     
     # Load all interactions
     interaction_success = 0
@@ -49,67 +138,105 @@ def load_comprehensive_database():
         except Exception as e:
             failed_interactions.append(f"{interaction['drug1']}-{interaction['drug2']} ({str(e)})")
     
-    # Update session state with loaded databases
-    st.session_state.drug_db = drug_db
-    st.session_state.interaction_checker = interaction_checker
-    st.session_state.database_loaded = True
+    if store is not None:
+        store.set_meta(SEED_META_KEY, "1")
     
-    return {
+    load_report = {
         'drugs_loaded': success_count,
         'drugs_failed': failed_drugs,
         'interactions_loaded': interaction_success,
         'interactions_failed': failed_interactions,
         'total_drugs': len(COMPREHENSIVE_DRUG_DATA),
-        'total_interactions': len(COMPREHENSIVE_INTERACTIONS)
+        'total_interactions': len(COMPREHENSIVE_INTERACTIONS),
+        **_compile_derived_interactions(drug_db, interaction_checker, compile_rules)
     }
+    
+    return KnowledgeBase(drug_db, interaction_checker, load_report)
 
-def get_drug_alternatives_detailed(drug_name: str) -> dict:
-    """Get detailed alternatives for a specific drug"""
+@st.cache_resource(show_spinner=False)
+def get_knowledge_base() -> KnowledgeBase:
+    """Get the process-wide knowledge base, loading it on first use.
     
-    if 'drug_db' not in st.session_state:
-        load_comprehensive_database()
+    Streamlit caches the result for the lifetime of the server process, so all
+    sessions and pages share the same DrugDatabase and DrugInteractionChecker
+    instead of each session building private copies.
+    """
+    return build_knowledge_base()
+
+def load_comprehensive_database():
+    """Load the comprehensive drug database into the system"""
     
-    drug_db = st.session_state.drug_db
+    knowledge_base = get_knowledge_base()
+    
+    # Sessions only hold references to the shared databases
+    st.session_state.drug_db = knowledge_base.drug_db
+    st.session_state.interaction_checker = knowledge_base.interaction_checker
+    st.session_state.database_loaded = True
+    
+    return dict(knowledge_base.load_report)
+
+def get_drug_alternatives_detailed(drug_name: str, current_medications: Optional[List[str]] = None,
+                                   min_severity: str = 'Moderate') -> dict:
+    """Get detailed alternatives for a specific drug.
+    
+    Candidates that interact with any of the current medications at
+    min_severity or above are left out and listed under
+    'excluded_alternatives' instead.
+    """
+    
+    knowledge_base = get_knowledge_base()
+    drug_db = knowledge_base.drug_db
     drug_info = drug_db.get_drug_info(drug_name.lower())
     
     if not drug_info:
         return {'error': f'Drug {drug_name} not found in database'}
     
+    # Drug key -> (medication, interaction) for everything the current
+    # medications interact with; one neighbourhood read per medication
+    unsafe = {}
+    for medication in current_medications or []:
+        for interaction in knowledge_base.interaction_checker.interacting_drugs(medication, min_severity):
+            unsafe.setdefault(interaction['drug'], (medication, interaction))
+    
     # Find alternatives in the same category
     same_category_alternatives = []
     different_category_alternatives = []
+    excluded_alternatives = []
     
     drug_category = drug_info.get('category', '')
     
-    for other_drug, other_info in drug_db.drugs.items():
-        if other_drug.lower() == drug_name.lower():
+    # Candidates come from the indication postings of the original drug only
+    for other_drug, overlap in drug_db.get_indication_overlaps(drug_name).items():
+        conflict = unsafe.get(drug_db.resolver.canonical_key(other_drug))
+        if conflict is not None:
+            medication, interaction = conflict
+            excluded_alternatives.append({
+                'name': other_drug.title(),
+                'interacts_with': medication.title(),
+                'severity': interaction['severity'],
+                'description': interaction['description']
+            })
             continue
         
+        other_info = drug_db.get_drug_info(other_drug)
         other_category = other_info.get('category', '')
         
-        # Check if indications overlap
-        drug_indications = set(indication.lower() for indication in drug_info.get('indications', []))
-        other_indications = set(indication.lower() for indication in other_info.get('indications', []))
-        
-        overlap = drug_indications.intersection(other_indications)
+        alternative_data = {
+            'name': other_drug.title(),
+            'generic_name': other_info.get('generic_name', ''),
+            'category': other_category,
+            'brand_names': other_info.get('brand_names', []),
+            'common_indications': list(overlap),
+            'strength_options': other_info.get('strength_options', []),
+            'dosage_forms': other_info.get('dosage_forms', []),
+            'side_effects': other_info.get('side_effects', []),
+            'age_suitability': other_info.get('age_restrictions', {})
+        }
         
-        if overlap:
-            alternative_data = {
-                'name': other_drug.title(),
-                'generic_name': other_info.get('generic_name', ''),
-                'category': other_category,
-                'brand_names': other_info.get('brand_names', []),
-                'common_indications': list(overlap),
-                'strength_options': other_info.get('strength_options', []),
-                'dosage_forms': other_info.get('dosage_forms', []),
-                'side_effects': other_info.get('side_effects', []),
-                'age_suitability': other_info.get('age_restrictions', {})
-            }
-            
-            if other_category == drug_category:
-                same_category_alternatives.append(alternative_data)
-            else:
-                different_category_alternatives.append(alternative_data)
+        if drug_db.is_same_category(drug_name, other_drug):
+            same_category_alternatives.append(alternative_data)
+        else:
+            different_category_alternatives.append(alternative_data)
     
     return {
         'original_drug': {
@@ -120,6 +247,7 @@ def get_drug_alternatives_detailed(drug_name: str) -> dict:
         },
         'same_category_alternatives': same_category_alternatives,
         'different_category_alternatives': different_category_alternatives,
+        'excluded_alternatives': excluded_alternatives,
         'total_alternatives_found': len(same_category_alternatives) + len(different_category_alternatives)
     }
 
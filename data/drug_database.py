@@ -1,7 +1,29 @@
-from typing import Dict, List, Any
+import threading
+from typing import Dict, List, Any, Optional, Set, FrozenSet, Tuple
+from data.catalog_snapshot import CatalogSnapshot
+from data.conditions import CONDITION_WARNINGS, ConditionIndex, condition_label, normalize_conditions
+from data.drug_record import DrugRecord
+from data.fuzzy_index import DEFAULT_MAX_DISTANCE, FuzzyNameIndex
+from data.mention_matcher import DrugMentionMatcher
+from data.name_resolver import DrugNameResolver, drug_aliases, drug_name_stem, normalize_drug_name
+from data.search_index import DrugSearchIndex
+from data.sqlite_store import SQLiteDrugStore
 
 class DrugDatabase:
-    def __init__(self):
+    def __init__(self, store: Optional[SQLiteDrugStore] = None,
+                 snapshot: Optional[CatalogSnapshot] = None,
+                 resolver: Optional[DrugNameResolver] = None):
+        # Optional persistent backend; when set, drugs are read from and
+        # written to the store instead of being held in memory
+        self.store = store
+        
+        # Optional read-only base catalog; drugs added at runtime are kept in
+        # memory on top of it and shadow snapshot entries with the same name
+        self.snapshot = snapshot if store is None else None
+        
+        # Guards writes; the database is shared by every session of the server
+        self._lock = threading.RLock()
+        
         self.drugs = {
             'aspirin': {
                 'generic_name': 'Acetylsalicylic Acid',
@@ -52,6 +74,7 @@ class DrugDatabase:
                 'generic_name': 'Warfarin Sodium',
                 'brand_names': ['Coumadin', 'Jantoven'],
                 'category': 'Anticoagulant',
+                'enzyme_roles': {'CYP2C9': ['substrate'], 'CYP3A4': ['substrate'], 'CYP1A2': ['substrate']},
                 'indications': ['Atrial fibrillation', 'DVT/PE', 'Mechanical heart valves'],
                 'contraindications': ['Pregnancy', 'Active bleeding', 'Severe hepatic impairment'],
                 'side_effects': ['Bleeding', 'Bruising', 'Hair loss'],
@@ -67,6 +90,7 @@ class DrugDatabase:
                 'generic_name': 'Simvastatin',
                 'brand_names': ['Zocor'],
                 'category': 'HMG-CoA Reductase Inhibitor (Statin)',
+                'enzyme_roles': {'CYP3A4': ['substrate']},
                 'indications': ['Hypercholesterolemia', 'Cardiovascular risk reduction'],
                 'contraindications': ['Active liver disease', 'Pregnancy', 'Myopathy'],
                 'side_effects': ['Muscle pain', 'Liver enzyme elevation', 'Memory issues'],
@@ -105,41 +129,345 @@ class DrugDatabase:
             'GERD',
             'Osteoporosis'
         ]
+        
+        # Stable integer IDs and brand/salt/formulation aliases, shared with
+        # the other engines so every lookup resolves a name only once
+        self.resolver = resolver if resolver is not None else DrugNameResolver()
+        
+        # Store entries as compact records; they still read like dicts
+        self.drugs: Dict[str, DrugRecord] = {
+            drug_key: DrugRecord.from_dict(drug_data) for drug_key, drug_data in self.drugs.items()
+        }
+        
+        self._search_index = DrugSearchIndex()
+        
+        # Edit-distance index over drug and brand names, for OCR-garbled input
+        self._fuzzy_index = FuzzyNameIndex()
+        self._fuzzy_snapshot_loaded = False
+        
+        # Aho-Corasick automaton over the same names, for drug mentions in free text
+        self._mention_matcher = DrugMentionMatcher()
+        self._mentions_snapshot_loaded = False
+        
+        # Condition code -> contraindicated / cautioned drug IDs
+        self._condition_index = ConditionIndex()
+        self._conditions_snapshot_loaded = False
+        
+        # Posting indexes: lowercase indication / category -> drug IDs
+        self._indication_index: Dict[str, Set[int]] = {}
+        self._category_index: Dict[str, Set[int]] = {}
+        self._drug_indications: Dict[int, FrozenSet[str]] = {}
+        self._drug_categories: Dict[int, str] = {}
+        
+        if self.store is not None:
+            # Seed the built-in drugs into a new store, keeping any saved edits
+            self.store.put_drugs(
+                (drug_key, record) for drug_key, record in self.drugs.items()
+                if not self.store.has_drug(drug_key)
+            )
+            self.drugs = {}
+            for drug_key in self.store.drug_names():
+                self._register_names(drug_key, self.store.get_drug(drug_key))
+        elif self.snapshot is not None:
+            # Snapshots are built from the full catalog, built-ins included
+            self.drugs = {}
+            self.resolver.add_fallback(self.snapshot.resolve_alias)
+        
+        for drug_key, drug_data in self.drugs.items():
+            self._index_drug(drug_key, drug_data)
+    
+    def _resolve_key(self, drug_name: str) -> str:
+        """Get the catalog key for a drug, brand or salt/formulation name"""
+        return self.resolver.resolve_key(drug_name) or drug_name.lower().strip()
+    
+    def _register_names(self, drug_key: str, drug_data: DrugRecord) -> int:
+        """Register a drug's aliases with the resolver, the fuzzy index and the mention matcher, and its conditions"""
+        drug_id = self.resolver.register(drug_key, drug_data)
+        aliases = drug_aliases(drug_key, drug_data)[0]
+        self._fuzzy_index.add(drug_id, aliases)
+        self._mention_matcher.add(drug_id, aliases)
+        self._condition_index.add(drug_id, drug_data.get('contraindications', []), CONDITION_WARNINGS.get(drug_key, {}))
+        return drug_id
+    
+    def _index_drug(self, drug_key: str, drug_data: DrugRecord) -> None:
+        """Add a drug to the lookup indexes (caller holds the write lock)"""
+        drug_id = self._register_names(drug_key, drug_data)
+        self._search_index.add(
+            drug_id,
+            drug_key,
+            drug_data.get('brand_names', []),
+            drug_data.get('indications', [])
+        )
+        
+        self._unindex_postings(drug_id)
+        indications = frozenset(indication.lower().strip() for indication in drug_data.get('indications', []))
+        for indication in indications:
+            self._indication_index.setdefault(indication, set()).add(drug_id)
+        self._drug_indications[drug_id] = indications
+        
+        category = drug_data.get('category', '').lower().strip()
+        self._category_index.setdefault(category, set()).add(drug_id)
+        self._drug_categories[drug_id] = category
+    
+    def _unindex_postings(self, drug_id: int) -> None:
+        """Remove a drug from the indication and category postings"""
+        for indication in self._drug_indications.pop(drug_id, ()):
+            postings = self._indication_index[indication]
+            postings.discard(drug_id)
+            if not postings:
+                del self._indication_index[indication]
+        
+        category = self._drug_categories.pop(drug_id, None)
+        if category is not None:
+            postings = self._category_index[category]
+            postings.discard(drug_id)
+            if not postings:
+                del self._category_index[category]
+    
+    def _with_snapshot(self, drug_names: List[str], snapshot_names: List[str],
+                       limit: Optional[int] = None) -> List[str]:
+        """Append snapshot results that are not shadowed by in-memory drugs"""
+        seen = set(drug_names)
+        for drug_key in snapshot_names:
+            if limit is not None and len(drug_names) >= limit:
+                break
+            if drug_key not in seen and drug_key not in self.drugs:
+                drug_names.append(drug_key)
+                seen.add(drug_key)
+        return drug_names
     
     def get_drug_info(self, drug_name: str) -> Dict[str, Any]:
         """Get comprehensive drug information"""
-        drug_key = drug_name.lower().strip()
-        return self.drugs.get(drug_key, {})
+        drug_key = self._resolve_key(drug_name)
+        if self.store is not None:
+            return self.store.get_drug(drug_key) or {}
+        drug_data = self.drugs.get(drug_key)
+        if drug_data is None and self.snapshot is not None:
+            drug_data = self.snapshot.get_drug(drug_key)
+        return drug_data or {}
     
     def get_alternatives(self, drug_name: str) -> List[str]:
         """Get alternative medications"""
-        drug_key = drug_name.lower().strip()
+        drug_key = self._resolve_key(drug_name)
         return self.alternatives.get(drug_key, [])
     
-    def search_drugs(self, query: str) -> List[str]:
-        """Search for drugs by name or indication"""
-        query = query.lower()
-        matches = []
+    def search_drugs(self, query: str, limit: Optional[int] = None) -> List[str]:
+        """Search for drugs by name, brand name or indication, best matches first"""
+        if self.store is not None:
+            return self.store.search(query, limit)
+        drug_ids = self._search_index.search(query, limit)
+        drug_names = [self.resolver.drug_key(drug_id) for drug_id in drug_ids]
+        if self.snapshot is not None:
+            return self._with_snapshot(drug_names, self.snapshot.search(query, limit), limit)
+        return drug_names
+    
+    def get_drugs_by_indication(self, indication: str) -> List[str]:
+        """Get drugs indicated for a condition (exact, case-insensitive)"""
+        if self.store is not None:
+            return self.store.drugs_by_indication(indication)
+        drug_ids = self._indication_index.get(indication.lower().strip(), ())
+        drug_names = [self.resolver.drug_key(drug_id) for drug_id in sorted(drug_ids)]
+        if self.snapshot is not None:
+            return self._with_snapshot(drug_names, self.snapshot.drugs_by_indication(indication))
+        return drug_names
+    
+    def get_drugs_by_category(self, category: str) -> List[str]:
+        """Get drugs in a therapeutic category (exact, case-insensitive)"""
+        if self.store is not None:
+            return self.store.drugs_by_category(category)
+        drug_ids = self._category_index.get(category.lower().strip(), ())
+        drug_names = [self.resolver.drug_key(drug_id) for drug_id in sorted(drug_ids)]
+        if self.snapshot is not None:
+            return self._with_snapshot(drug_names, self.snapshot.drugs_by_category(category))
+        return drug_names
+    
+    def get_indication_overlaps(self, drug_name: str) -> Dict[str, Set[str]]:
+        """Get other drugs sharing an indication with a drug, with the shared indications.
+        
+        Only the postings of the drug's own indications are visited.
+        """
+        if self.store is not None:
+            return self.store.indication_overlaps(self._resolve_key(drug_name))
+        
+        if self.snapshot is not None:
+            drug_key = self._resolve_key(drug_name)
+            indications = {indication.lower().strip() for indication in self.get_drug_info(drug_key).get('indications', ())}
+            snapshot_overlaps: Dict[str, Set[str]] = {}
+            for indication in sorted(indications):
+                for other_key in self.get_drugs_by_indication(indication):
+                    if other_key != drug_key:
+                        snapshot_overlaps.setdefault(other_key, set()).add(indication)
+            return snapshot_overlaps
+        
+        drug_id = self.resolver.resolve(drug_name)
+        if drug_id is None:
+            return {}
         
-        for drug_name, drug_info in self.drugs.items():
-            # Check drug name
-            if query in drug_name:
-                matches.append(drug_name)
+        overlaps: Dict[int, Set[str]] = {}
+        for indication in self._drug_indications.get(drug_id, ()):
+            for other_id in self._indication_index.get(indication, ()):
+                if other_id != drug_id:
+                    overlaps.setdefault(other_id, set()).add(indication)
+        
+        return {self.resolver.drug_key(other_id): overlaps[other_id] for other_id in sorted(overlaps)}
+    
+    def is_same_category(self, drug_name: str, other_drug_name: str) -> bool:
+        """Check whether two drugs share a therapeutic category"""
+        if self.store is not None:
+            category = self.store.category_of(self._resolve_key(drug_name))
+            return category is not None and category == self.store.category_of(self._resolve_key(other_drug_name))
+        
+        if self.snapshot is not None:
+            category = self.get_drug_info(drug_name).get('category')
+            other_category = self.get_drug_info(other_drug_name).get('category')
+            if category is None or other_category is None:
+                return False
+            return category.lower().strip() == other_category.lower().strip()
+        
+        drug_id = self.resolver.resolve(drug_name)
+        other_id = self.resolver.resolve(other_drug_name)
+        if drug_id not in self._drug_categories or other_id not in self._drug_categories:
+            return False
+        return self._drug_categories.get(drug_id) == self._drug_categories.get(other_id)
+    
+    def _category_key(self, drug_id: int) -> str:
+        """Get the normalized therapeutic category of a resolved drug ('' if unknown)"""
+        if self.store is not None:
+            return (self.store.category_of(self.resolver.drug_key(drug_id)) or '').lower().strip()
+        category = self._drug_categories.get(drug_id)
+        if category is None and self.snapshot is not None:
+            category = self.get_drug_info(self.resolver.drug_key(drug_id)).get('category', '').lower().strip()
+        return category or ''
+    
+    def find_therapeutic_duplications(self, drugs: List[str]) -> List[Dict[str, Any]]:
+        """Find drugs in a regimen that share a therapeutic category.
+        
+        Groups the regimen by category in one pass over the drugs, so no drug
+        pairs are compared. Each finding has the category, the entered name of
+        every distinct drug in regimen order, and under 'repeated' the entered
+        names of each drug entered more than once (e.g. a brand and its
+        generic). A category is reported when it has two distinct drugs or a
+        repeated one. Unknown drugs are skipped.
+        """
+        groups: Dict[str, Dict[int, List[str]]] = {}
+        for drug in drugs:
+            drug_id = self.resolver.resolve(drug)
+            if drug_id is None:
+                continue
+            category = self._category_key(drug_id)
+            if category:
+                groups.setdefault(category, {}).setdefault(drug_id, []).append(drug.lower().title())
+        
+        duplications = []
+        for entries in groups.values():
+            repeated = [names for names in entries.values() if len(names) > 1]
+            if len(entries) < 2 and not repeated:
                 continue
-            
-            # Check brand names
-            for brand in drug_info.get('brand_names', []):
-                if query in brand.lower():
-                    matches.append(drug_name)
-                    break
-            
-            # Check indications
-            for indication in drug_info.get('indications', []):
-                if query in indication.lower():
-                    matches.append(drug_name)
-                    break
-        
-        return list(set(matches))  # Remove duplicates
+            duplications.append({
+                'category': self.get_drug_info(self.resolver.drug_key(next(iter(entries)))).get('category', ''),
+                'drugs': [names[0] for names in entries.values()],
+                'repeated': repeated
+            })
+        return duplications
+    
+    def check_patient_conditions(self, drugs: List[str], conditions: List[str]) -> List[Dict[str, Any]]:
+        """Check a regimen against a patient's conditions.
+        
+        Conditions are normalized to condition codes and looked up in the
+        condition index, so the check is one set intersection per condition.
+        Findings list the drug as entered, the condition label, whether it is
+        a contraindication or a precaution, and the catalog text.
+        """
+        if self.snapshot is not None and not self._conditions_snapshot_loaded:
+            with self._lock:
+                if not self._conditions_snapshot_loaded:
+                    # Built on first use so mapping the snapshot stays cheap
+                    for drug_key in self.snapshot.drug_names():
+                        if drug_key not in self.drugs:
+                            drug_data = self.snapshot.get_drug(drug_key)
+                            self._condition_index.add(self.resolver.drug_id(drug_key),
+                                                      drug_data.get('contraindications', []),
+                                                      CONDITION_WARNINGS.get(drug_key, {}))
+                    self._conditions_snapshot_loaded = True
+        
+        names: Dict[int, str] = {}
+        for drug in drugs:
+            drug_id = self.resolver.resolve(drug)
+            if drug_id is not None:
+                names.setdefault(drug_id, drug)
+        
+        # Regimen order, contraindications before precautions
+        positions = {drug_id: position for position, drug_id in enumerate(names)}
+        findings = sorted(self._condition_index.match(set(names), normalize_conditions(conditions)),
+                          key=lambda finding: (positions[finding.drug_id], not finding.contraindicated))
+        return [{
+            'drug': names[finding.drug_id].lower().title(),
+            'condition': condition_label(finding.code),
+            'type': 'Contraindication' if finding.contraindicated else 'Precaution',
+            'detail': finding.detail
+        } for finding in findings]
+    
+    def _snapshot_aliases(self) -> Dict[str, List[str]]:
+        """Get the exact aliases of the snapshot drugs not shadowed by in-memory drugs"""
+        snapshot_aliases: Dict[str, List[str]] = {}
+        for alias, drug_key in self.snapshot.iter_aliases():
+            if drug_key not in self.drugs:
+                snapshot_aliases.setdefault(drug_key, []).append(alias)
+        return snapshot_aliases
+    
+    def resolve_fuzzy(self, drug_name: str, max_distance: int = DEFAULT_MAX_DISTANCE,
+                      limit: int = 5) -> List[Dict[str, Any]]:
+        """Find catalog drugs whose name or brand is within max_distance edits of a (misspelled) name.
+        
+        Returns dicts with the drug key, the matched name and the edit
+        distance, closest first. Exact and alias matches have distance 0.
+        """
+        if self.snapshot is not None and not self._fuzzy_snapshot_loaded:
+            with self._lock:
+                if not self._fuzzy_snapshot_loaded:
+                    # Built on first use so mapping the snapshot stays cheap
+                    for drug_key, aliases in self._snapshot_aliases().items():
+                        self._fuzzy_index.add(self.resolver.drug_id(drug_key), aliases)
+                    self._fuzzy_snapshot_loaded = True
+        
+        matches: Dict[str, Dict[str, Any]] = {}
+        drug_key = self.resolver.resolve_key(drug_name)
+        if drug_key is not None and self.get_drug_info(drug_key):
+            matches[drug_key] = {'drug': drug_key, 'matched': normalize_drug_name(drug_name), 'distance': 0}
+        
+        normalized = normalize_drug_name(drug_name)
+        for query in dict.fromkeys((normalized, drug_name_stem(normalized))):
+            for drug_id, term, distance in self._fuzzy_index.lookup(query, max_distance, limit):
+                candidate_key = self.resolver.drug_key(drug_id)
+                current = matches.get(candidate_key)
+                if current is None or distance < current['distance']:
+                    matches[candidate_key] = {'drug': candidate_key, 'matched': term, 'distance': distance}
+        
+        return sorted(matches.values(), key=lambda match: (match['distance'], match['drug']))[:limit]
+    
+    def find_drug_mentions(self, text: str) -> List[Dict[str, Any]]:
+        """Find catalog drug, generic and brand names mentioned in free text.
+        
+        One linear pass of the mention automaton over the text; names match on
+        word boundaries, ignoring case, and overlapping names resolve to the
+        longest. Returns dicts with the drug key and ID, the text as written
+        and its span, in text order.
+        """
+        if self.snapshot is not None and not self._mentions_snapshot_loaded:
+            with self._lock:
+                if not self._mentions_snapshot_loaded:
+                    # Built on first use so mapping the snapshot stays cheap
+                    for drug_key, aliases in self._snapshot_aliases().items():
+                        self._mention_matcher.add(self.resolver.drug_id(drug_key), aliases)
+                    self._mentions_snapshot_loaded = True
+        
+        return [{
+            'drug': self.resolver.drug_key(mention.drug_id),
+            'drug_id': mention.drug_id,
+            'text': text[mention.start:mention.end],
+            'start': mention.start,
+            'end': mention.end
+        } for mention in self._mention_matcher.match(text)]
     
     def get_age_specific_info(self, drug_name: str, age_category: str) -> str:
         """Get age-specific prescribing information"""
@@ -153,13 +481,24 @@ class DrugDatabase:
     
     def get_all_drugs(self) -> List[str]:
         """Get list of all drugs in database"""
+        if self.store is not None:
+            return self.store.drug_names()
+        if self.snapshot is not None:
+            return self._with_snapshot(list(self.drugs.keys()), self.snapshot.drug_names())
         return list(self.drugs.keys())
     
     def add_drug(self, drug_name: str, drug_data: Dict[str, Any]) -> bool:
         """Add new drug to database"""
         try:
             drug_key = drug_name.lower().strip()
-            self.drugs[drug_key] = drug_data
+            record = DrugRecord.from_dict(drug_data)
+            if self.store is not None:
+                self.store.put_drug(drug_key, record)
+                self._register_names(drug_key, record)
+                return True
+            with self._lock:
+                self._index_drug(drug_key, record)
+                self.drugs[drug_key] = record
             return True
         except Exception as e:
             print(f"Error adding drug {drug_name}: {e}")
@@ -169,7 +508,14 @@ class DrugDatabase:
         """Add new drug interaction"""
         try:
             interaction_key = (drug1.lower().strip(), drug2.lower().strip())
-            # Store interaction in drug interaction checker (will implement)
+            if self.store is not None:
+                self.store.put_interaction(
+                    *interaction_key,
+                    interaction_data.get('severity', 'Moderate'),
+                    interaction_data.get('description', ''),
+                    interaction_data.get('recommendation', '')
+                )
+            # Otherwise interactions live in DrugInteractionChecker
             return True
         except Exception as e:
             print(f"Error adding interaction {drug1}-{drug2}: {e}")
@@ -178,12 +524,39 @@ class DrugDatabase:
     def bulk_add_drugs(self, drugs_data: Dict[str, Dict[str, Any]]) -> Dict[str, bool]:
         """Add multiple drugs at once"""
         results = {}
+        if self.store is not None:
+            # Write the whole batch in one transaction
+            records = []
+            for drug_name, drug_data in drugs_data.items():
+                try:
+                    records.append((drug_name.lower().strip(), DrugRecord.from_dict(drug_data)))
+                    results[drug_name] = True
+                except Exception as e:
+                    print(f"Error adding drug {drug_name}: {e}")
+                    results[drug_name] = False
+            self.store.put_drugs(records)
+            for drug_key, record in records:
+                self._register_names(drug_key, record)
+            return results
+        
         for drug_name, drug_data in drugs_data.items():
             results[drug_name] = self.add_drug(drug_name, drug_data)
         return results
     
     def get_database_stats(self) -> Dict[str, int]:
         """Get statistics about the drug database"""
+        if self.store is not None:
+            return {
+                'total_drugs': self.store.count_drugs(),
+                'total_conditions': len(self.medical_conditions),
+                'drugs_with_alternatives': len([d for d in self.alternatives if self.store.has_drug(d)])
+            }
+        if self.snapshot is not None:
+            return {
+                'total_drugs': len(self.get_all_drugs()),
+                'total_conditions': len(self.medical_conditions),
+                'drugs_with_alternatives': len([d for d in self.alternatives if self.get_drug_info(d)])
+            }
         return {
             'total_drugs': len(self.drugs),
             'total_conditions': len(self.medical_conditions),
@@ -0,0 +1,185 @@
+"""
+Compact Drug Record
+Slotted, tuple-backed drug entries with interned strings and small-integer codes
+"""
+
+import sys
+import threading
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+AGE_GROUPS = ('pediatric', 'adult', 'geriatric')
+
+
+class CodeTable:
+    """Bidirectional mapping between repeated strings and small integer codes"""
+
+    def __init__(self):
+        self._codes: Dict[str, int] = {}
+        self._values: List[str] = []
+        self._lock = threading.Lock()
+
+    def encode(self, value: str) -> int:
+        """Get the code for a string, assigning the next code if it is new"""
+        code = self._codes.get(value)
+        if code is None:
+            with self._lock:
+                code = self._codes.get(value)
+                if code is None:
+                    code = len(self._values)
+                    self._values.append(sys.intern(value))
+                    self._codes[self._values[code]] = code
+        return code
+
+    def decode(self, code: int) -> str:
+        """Get the string for a code"""
+        return self._values[code]
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+# Process-wide code tables shared by every record
+CATEGORY_CODES = CodeTable()
+DOSAGE_FORM_CODES = CodeTable()
+AGE_NOTE_CODES = CodeTable()
+
+
+# Identical lists (side effects, strengths, ...) repeat across drugs and share one tuple
+_TUPLE_POOL: Dict[Tuple, Tuple] = {}
+
+
+def _intern_tuple(values: Any) -> Optional[Tuple[str, ...]]:
+    """Convert a list to a pooled tuple of interned strings"""
+    if values is None:
+        return None
+    values = tuple(sys.intern(str(value)) for value in values)
+    return _TUPLE_POOL.setdefault(values, values)
+
+
+def _intern_codes(codes: Any) -> Tuple[int, ...]:
+    """Convert codes to a pooled tuple"""
+    codes = tuple(codes)
+    return _TUPLE_POOL.setdefault(codes, codes)
+
+
+class DrugRecord(Mapping):
+    """Read-only drug entry that behaves like the original drug dict.
+
+    Lists are stored as pooled tuples of interned strings; the category, dosage
+    forms and age-group notes are stored as codes into the shared code
+    tables. Fields that were absent from the source dict stay absent, so
+    ``record.get(field, default)`` works exactly as it did on the dict.
+    Unrecognized fields are kept in a small extras dict.
+    """
+
+    __slots__ = ('generic_name', 'brand_names', 'category_code', 'indications', 'contraindications',
+                 'side_effects', 'dosage_form_codes', 'strength_options', 'age_codes', 'extras')
+
+    FIELDS = ('generic_name', 'brand_names', 'category', 'indications', 'contraindications',
+              'side_effects', 'dosage_forms', 'strength_options', 'age_restrictions')
+
+    def __init__(self, generic_name: Optional[str] = None,
+                 brand_names: Optional[Tuple[str, ...]] = None,
+                 category_code: Optional[int] = None,
+                 indications: Optional[Tuple[str, ...]] = None,
+                 contraindications: Optional[Tuple[str, ...]] = None,
+                 side_effects: Optional[Tuple[str, ...]] = None,
+                 dosage_form_codes: Optional[Tuple[int, ...]] = None,
+                 strength_options: Optional[Tuple[str, ...]] = None,
+                 age_codes: Optional[Tuple[int, ...]] = None,
+                 extras: Optional[Dict[str, Any]] = None):
+        self.generic_name = generic_name
+        self.brand_names = brand_names
+        self.category_code = category_code
+        self.indications = indications
+        self.contraindications = contraindications
+        self.side_effects = side_effects
+        self.dosage_form_codes = dosage_form_codes
+        self.strength_options = strength_options
+        # One AGE_NOTE_CODES code per AGE_GROUPS entry, -1 when missing
+        self.age_codes = age_codes
+        self.extras = extras
+
+    @classmethod
+    def from_dict(cls, drug_data: Mapping) -> 'DrugRecord':
+        """Build a record from a drug dict in the COMPREHENSIVE_DRUG_DATA format"""
+        if isinstance(drug_data, DrugRecord):
+            return drug_data
+
+        extras = {key: value for key, value in drug_data.items() if key not in cls.FIELDS}
+
+        category = drug_data.get('category')
+        dosage_forms = drug_data.get('dosage_forms')
+        age_restrictions = drug_data.get('age_restrictions')
+
+        age_codes = None
+        if age_restrictions is not None:
+            if set(age_restrictions) <= set(AGE_GROUPS):
+                age_codes = _intern_codes(
+                    AGE_NOTE_CODES.encode(str(age_restrictions[group])) if group in age_restrictions else -1
+                    for group in AGE_GROUPS
+                )
+            else:
+                extras['age_restrictions'] = dict(age_restrictions)
+
+        generic_name = drug_data.get('generic_name')
+        return cls(
+            generic_name=sys.intern(str(generic_name)) if generic_name is not None else None,
+            brand_names=_intern_tuple(drug_data.get('brand_names')),
+            category_code=CATEGORY_CODES.encode(str(category)) if category is not None else None,
+            indications=_intern_tuple(drug_data.get('indications')),
+            contraindications=_intern_tuple(drug_data.get('contraindications')),
+            side_effects=_intern_tuple(drug_data.get('side_effects')),
+            dosage_form_codes=_intern_codes(DOSAGE_FORM_CODES.encode(str(form)) for form in dosage_forms)
+            if dosage_forms is not None else None,
+            strength_options=_intern_tuple(drug_data.get('strength_options')),
+            age_codes=age_codes,
+            extras=extras or None
+        )
+
+    def _field(self, key: str) -> Any:
+        """Get a decoded field value, or None when the field is absent"""
+        if key == 'category':
+            return CATEGORY_CODES.decode(self.category_code) if self.category_code is not None else None
+        if key == 'dosage_forms':
+            if self.dosage_form_codes is None:
+                return None
+            return tuple(DOSAGE_FORM_CODES.decode(code) for code in self.dosage_form_codes)
+        if key == 'age_restrictions':
+            if self.age_codes is None:
+                return None
+            return {group: AGE_NOTE_CODES.decode(code)
+                    for group, code in zip(AGE_GROUPS, self.age_codes) if code >= 0}
+        return getattr(self, key)
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.FIELDS:
+            value = self._field(key)
+            if value is not None:
+                return value
+        if self.extras is not None and key in self.extras:
+            return self.extras[key]
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        for key in self.FIELDS:
+            if self._field(key) is not None:
+                yield key
+        if self.extras is not None:
+            yield from self.extras
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"DrugRecord({self.to_dict()!r})"
+
+    @property
+    def category(self) -> str:
+        """Category name, or an empty string when absent"""
+        return CATEGORY_CODES.decode(self.category_code) if self.category_code is not None else ''
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert back to a plain drug dict with list values"""
+        return {key: list(value) if isinstance(value, tuple) else value for key, value in self.items()}
@@ -0,0 +1,218 @@
+"""
+Fuzzy Name Index
+SymSpell-style delete dictionary for edit-distance lookup of misspelled drug names
+"""
+
+import threading
+from typing import Dict, Iterable, List, Set, Tuple
+
+import numpy as np
+
+DEFAULT_MAX_DISTANCE = 2
+
+# Deletes are generated from this many leading characters only (SymSpell prefix
+# trick); full terms are verified with the real edit distance
+PREFIX_LENGTH = 7
+
+# Pending deletes merged into the sorted arrays past this many entries
+_MERGE_THRESHOLD = 4096
+
+
+def _deletes(text: str, max_distance: int) -> Set[str]:
+    """Get every string reachable from text by deleting up to max_distance characters"""
+    results = {text}
+    frontier = {text}
+    for _ in range(max_distance):
+        next_frontier = set()
+        for item in frontier:
+            if len(item) <= 1:
+                continue
+            for i in range(len(item)):
+                next_frontier.add(item[:i] + item[i + 1:])
+        next_frontier -= results
+        results |= next_frontier
+        frontier = next_frontier
+    return results
+
+
+def edit_distance(source: str, target: str, max_distance: int) -> int:
+    """Optimal string alignment distance, or max_distance + 1 once the bound is exceeded"""
+    if source == target:
+        return 0
+
+    # Shared prefixes and suffixes never change the distance
+    start = 0
+    limit = min(len(source), len(target))
+    while start < limit and source[start] == target[start]:
+        start += 1
+    end = 0
+    while end < limit - start and source[-1 - end] == target[-1 - end]:
+        end += 1
+    source = source[start:len(source) - end]
+    target = target[start:len(target) - end]
+
+    too_far = max_distance + 1
+    if abs(len(source) - len(target)) > max_distance:
+        return too_far
+    if not source or not target:
+        return max(len(source), len(target))
+
+    # Only cells within max_distance of the diagonal can stay within budget
+    width = len(target)
+    previous_previous: List[int] = []
+    previous = [j if j <= max_distance else too_far for j in range(width + 1)]
+    for i in range(1, len(source) + 1):
+        low = max(1, i - max_distance)
+        high = min(width, i + max_distance)
+        current = [too_far] * (width + 1)
+        current[0] = i if i <= max_distance else too_far
+        row_minimum = current[0]
+        source_char = source[i - 1]
+        for j in range(low, high + 1):
+            value = previous[j - 1] if source_char == target[j - 1] else previous[j - 1] + 1
+            if previous[j] + 1 < value:
+                value = previous[j] + 1
+            if current[j - 1] + 1 < value:
+                value = current[j - 1] + 1
+            if (i > 1 and j > 1 and source_char == target[j - 2] and source[i - 2] == target[j - 1]
+                    and previous_previous[j - 2] + 1 < value):
+                value = previous_previous[j - 2] + 1
+            current[j] = value
+            if value < row_minimum:
+                row_minimum = value
+        if row_minimum > max_distance:
+            return too_far
+        previous_previous, previous = previous, current
+    return min(previous[width], too_far)
+
+
+class FuzzyNameIndex:
+    """Delete-dictionary index from normalized names to drug IDs.
+
+    Every indexed term contributes the deletes of its first PREFIX_LENGTH
+    characters; a lookup generates the deletes of the query prefix and only
+    verifies the edit distance of terms sharing one of them, so the cost
+    does not grow with the catalog size. Deletes are stored by hash in two
+    sorted parallel arrays (hash collisions only add candidates that fail
+    verification); new terms go to a small pending dict that is merged into
+    the arrays once it grows.
+    """
+
+    def __init__(self, max_distance: int = DEFAULT_MAX_DISTANCE):
+        self.max_distance = max_distance
+        self._lock = threading.RLock()
+        self._terms: List[str] = []
+        self._term_ids: Dict[str, int] = {}
+        # term id -> drug ids currently using the term
+        self._term_drugs: List[Tuple[int, ...]] = []
+        self._drug_terms: Dict[int, Tuple[int, ...]] = {}
+        # Sorted delete hashes and the term id of each entry
+        self._postings: Tuple[np.ndarray, np.ndarray] = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.uint32))
+        self._pending: Dict[int, List[int]] = {}
+        self._pending_entries = 0
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def _term_id(self, term: str) -> int:
+        """Get the id of a term, adding its deletes if it is new (caller holds the lock)"""
+        term_id = self._term_ids.get(term)
+        if term_id is None:
+            term_id = self._term_ids[term] = len(self._terms)
+            self._terms.append(term)
+            self._term_drugs.append(())
+            for delete in _deletes(term[:PREFIX_LENGTH], self.max_distance):
+                self._pending.setdefault(hash(delete), []).append(term_id)
+                self._pending_entries += 1
+            if self._pending_entries > max(_MERGE_THRESHOLD, len(self._postings[0]) // 2):
+                self._merge_pending()
+        return term_id
+
+    def _merge_pending(self) -> None:
+        """Merge the pending deletes into the sorted arrays (caller holds the lock)"""
+        hashes, term_ids = self._postings
+        pending_hashes = []
+        pending_ids = []
+        for delete_hash, delete_term_ids in self._pending.items():
+            pending_hashes.extend([delete_hash] * len(delete_term_ids))
+            pending_ids.extend(delete_term_ids)
+        hashes = np.concatenate((hashes, np.array(pending_hashes, dtype=np.int64)))
+        term_ids = np.concatenate((term_ids, np.array(pending_ids, dtype=np.uint32)))
+        order = np.argsort(hashes, kind='stable')
+        self._postings = (hashes[order], term_ids[order])
+        self._pending = {}
+        self._pending_entries = 0
+
+    def add(self, drug_id: int, terms: Iterable[str]) -> None:
+        """Index the normalized names of a drug, replacing its previous names"""
+        with self._lock:
+            self.remove(drug_id)
+            term_ids = []
+            for term in terms:
+                if not term:
+                    continue
+                term_id = self._term_id(term)
+                if term_id in term_ids:
+                    continue
+                term_ids.append(term_id)
+                self._term_drugs[term_id] += (drug_id,)
+            self._drug_terms[drug_id] = tuple(term_ids)
+
+    def remove(self, drug_id: int) -> None:
+        """Remove a drug; its terms stay in the delete arrays until reused"""
+        with self._lock:
+            for term_id in self._drug_terms.pop(drug_id, ()):
+                self._term_drugs[term_id] = tuple(
+                    other_id for other_id in self._term_drugs[term_id] if other_id != drug_id
+                )
+
+    def lookup(self, query: str, max_distance: int = DEFAULT_MAX_DISTANCE,
+               limit: int = 5) -> List[Tuple[int, str, int]]:
+        """Find drugs with a name within max_distance edits of a normalized query.
+
+        Returns (drug_id, matched_term, distance) tuples, closest first, one per drug.
+        """
+        max_distance = min(max_distance, self.max_distance)
+        if not query or limit <= 0:
+            return []
+
+        # Candidate terms share a delete of the prefix with the query
+        candidates: Set[int] = set()
+        hashes, hash_terms = self._postings
+        pending = self._pending
+        delete_hashes = [hash(delete) for delete in _deletes(query[:PREFIX_LENGTH], max_distance)]
+        if len(hashes):
+            query_hashes = np.array(delete_hashes, dtype=np.int64)
+            starts = np.searchsorted(hashes, query_hashes, side='left')
+            ends = np.searchsorted(hashes, query_hashes, side='right')
+            for start, end in zip(starts.tolist(), ends.tolist()):
+                if start < end:
+                    candidates.update(hash_terms[start:end].tolist())
+        for delete_hash in delete_hashes:
+            pending_ids = pending.get(delete_hash)
+            if pending_ids:
+                candidates.update(pending_ids)
+
+        best: Dict[int, Tuple[int, str]] = {}
+        query_length = len(query)
+        for term_id in candidates:
+            drugs = self._term_drugs[term_id]
+            term = self._terms[term_id]
+            if not drugs or abs(len(term) - query_length) > max_distance:
+                continue
+            distance = edit_distance(query, term, max_distance)
+            if distance > max_distance:
+                continue
+            for drug_id in drugs:
+                current = best.get(drug_id)
+                if current is None or (distance, term) < current:
+                    best[drug_id] = (distance, term)
+
+        matches = sorted((distance, term, drug_id) for drug_id, (distance, term) in best.items())
+        return [(drug_id, term, distance) for distance, term, drug_id in matches[:limit]]
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'terms': len(self._terms),
+            'deletes': len(self._postings[0]) + self._pending_entries
+        }
@@ -0,0 +1,244 @@
+"""
+Drug Mention Matcher
+Aho-Corasick automaton over catalog drug and brand names, for finding drug mentions in free text
+"""
+
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Set, Tuple
+
+# Names shorter than this are too likely to be ordinary words or abbreviations
+MIN_TERM_LENGTH = 3
+
+# Folded to a single space while scanning, as normalize_drug_name does for names
+_SEPARATORS = frozenset(' \t\r\n\f\v_-/,;()[].')
+
+
+class DrugMention(NamedTuple):
+    """A catalog name found in a text, with its span in the original text"""
+    drug_id: int
+    term: str
+    start: int
+    end: int
+
+
+class DrugMentionMatcher:
+    """Aho-Corasick automaton from normalized drug names to drug IDs.
+
+    Every name is a path in a character trie; failure links let one pass over
+    the text report every name ending at each position, so matching costs the
+    text length plus the number of hits, whatever the catalog size. Links are
+    maintained incrementally: a new trie node only re-links the nodes that
+    end with its string, found in the failure-link subtree of its parent, and
+    a name starting or stopping to be used only refreshes the output links
+    below its own node. Matches never wait for a rebuild. Terms stay in the
+    trie when their drugs are removed, like FuzzyNameIndex.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        # Trie: node -> character -> child node; node 0 is the root
+        self._goto: List[Dict[str, int]] = [{}]
+        self._depth: List[int] = [0]
+        # Per node: failure link (longest proper suffix in the trie), and the
+        # nearest node on the failure chain (itself included) that ends a
+        # term in use, or -1
+        self._fail: List[int] = [0]
+        self._output: List[int] = [-1]
+        # Reverse failure links, for the nodes affected by an insertion
+        self._fail_children: Dict[int, Set[int]] = {}
+        # Nodes below the first level linked to the root, by their last
+        # character; the root's failure subtree is the whole trie
+        self._root_links: Dict[str, Set[int]] = {}
+        self._node_terms: Dict[int, int] = {}
+        self._terms: List[str] = []
+        self._term_ids: Dict[str, int] = {}
+        self._term_nodes: List[int] = []
+        # term id -> drug ids currently using the term; the first one wins
+        self._term_drugs: List[Tuple[int, ...]] = []
+        self._drug_terms: Dict[int, Tuple[int, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._drug_terms)
+
+    def _new_node(self, parent: int, char: str) -> int:
+        """Add a trie node and link it, re-linking existing nodes that end with it (caller holds the lock)"""
+        goto = self._goto
+        fail = self._fail
+        depth = self._depth
+        fail_children = self._fail_children
+
+        link = 0
+        if parent:
+            link = fail[parent]
+            while link and char not in goto[link]:
+                link = fail[link]
+            link = goto[link].get(char, 0)
+
+        node = len(goto)
+        goto.append({})
+        depth.append(depth[parent] + 1)
+        fail.append(link)
+        # Not a term yet, so its outputs are its failure link's
+        self._output.append(self._output[link])
+        fail_children.setdefault(link, set()).add(node)
+
+        if not parent:
+            # Every node ending with char and linked to the root now links here
+            relinked = self._root_links.pop(char, set())
+            if relinked:
+                fail_children[0] -= relinked
+                fail_children.setdefault(node, set()).update(relinked)
+                for child in relinked:
+                    fail[child] = node
+        else:
+            if not link:
+                self._root_links.setdefault(char, set()).add(node)
+            # Nodes ending with the parent's string are the parent's failure
+            # subtree; their char children end with the new node's string.
+            # Below a node that has a char child, suffixes are at least that long.
+            stack = list(fail_children.get(parent, ()))
+            while stack:
+                suffix_node = stack.pop()
+                child = goto[suffix_node].get(char)
+                if child is None:
+                    stack.extend(fail_children.get(suffix_node, ()))
+                elif child != node and depth[fail[child]] < depth[node]:
+                    # The previous link was this node's own link, so outputs are unchanged
+                    fail_children[fail[child]].discard(child)
+                    if not fail[child]:
+                        self._root_links[char].discard(child)
+                    fail[child] = node
+                    fail_children.setdefault(node, set()).add(child)
+
+        # Published last, so a concurrent match never reaches an unlinked node
+        goto[parent][char] = node
+        return node
+
+    def _refresh_outputs(self, node: int) -> None:
+        """Recompute output links below a node whose term started or stopped being used (caller holds the lock)"""
+        fail = self._fail
+        output = self._output
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            term_id = self._node_terms.get(current)
+            if term_id is not None and self._term_drugs[term_id]:
+                output[current] = current
+                if current != node:
+                    # Its own subtree still reports it first
+                    continue
+            else:
+                output[current] = output[fail[current]]
+            stack.extend(self._fail_children.get(current, ()))
+
+    def _term_id(self, term: str) -> int:
+        """Get the id of a term, inserting it into the trie if it is new (caller holds the lock)"""
+        term_id = self._term_ids.get(term)
+        if term_id is None:
+            goto = self._goto
+            node = 0
+            for char in term:
+                child = goto[node].get(char)
+                node = child if child is not None else self._new_node(node, char)
+            term_id = self._term_ids[term] = len(self._terms)
+            self._terms.append(term)
+            self._term_drugs.append(())
+            self._term_nodes.append(node)
+            self._node_terms[node] = term_id
+        return term_id
+
+    def add(self, drug_id: int, terms: Iterable[str]) -> None:
+        """Index the normalized names of a drug, replacing its previous names"""
+        with self._lock:
+            self.remove(drug_id)
+            term_ids = []
+            for term in terms:
+                if len(term) < MIN_TERM_LENGTH:
+                    continue
+                term_id = self._term_id(term)
+                if term_id in term_ids:
+                    continue
+                term_ids.append(term_id)
+                self._term_drugs[term_id] += (drug_id,)
+                if len(self._term_drugs[term_id]) == 1:
+                    self._refresh_outputs(self._term_nodes[term_id])
+            self._drug_terms[drug_id] = tuple(term_ids)
+
+    def remove(self, drug_id: int) -> None:
+        """Remove a drug; its terms stay in the trie until reused"""
+        with self._lock:
+            for term_id in self._drug_terms.pop(drug_id, ()):
+                self._term_drugs[term_id] = tuple(
+                    other_id for other_id in self._term_drugs[term_id] if other_id != drug_id
+                )
+                if not self._term_drugs[term_id]:
+                    self._refresh_outputs(self._term_nodes[term_id])
+
+    def match(self, text: str) -> List[DrugMention]:
+        """Find the catalog names in a text.
+
+        Matching ignores case and treats runs of separators as one space. A
+        match must start and end on word boundaries; overlapping matches
+        resolve to the leftmost, then longest, name.
+        """
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        node_terms = self._node_terms
+        terms = self._terms
+        term_drugs = self._term_drugs
+
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            lowered = ''.join(char.lower()[:1] for char in text)
+
+        # Original text index of every folded character scanned so far
+        positions: List[int] = []
+        candidates: List[Tuple[int, int, int]] = []
+        node = 0
+        previous_space = True
+        for index, char in enumerate(lowered):
+            if char in _SEPARATORS:
+                if previous_space:
+                    continue
+                char = ' '
+                previous_space = True
+            else:
+                previous_space = False
+            positions.append(index)
+
+            while True:
+                child = goto[node].get(char)
+                if child is not None:
+                    node = child
+                    break
+                if not node:
+                    break
+                node = fail[node]
+
+            hit = output[node]
+            if hit < 0 or (index + 1 < len(text) and text[index + 1].isalnum()):
+                continue
+            while hit >= 0:
+                term_id = node_terms[hit]
+                start = positions[len(positions) - len(terms[term_id])]
+                if term_drugs[term_id] and (start == 0 or not text[start - 1].isalnum()):
+                    candidates.append((start, index + 1, term_id))
+                hit = output[fail[hit]]
+
+        mentions = []
+        covered = 0
+        for start, end, term_id in sorted(candidates, key=lambda candidate: (candidate[0], -candidate[1])):
+            if start >= covered:
+                drug_ids = term_drugs[term_id]
+                if drug_ids:
+                    mentions.append(DrugMention(drug_ids[0], terms[term_id], start, end))
+                    covered = end
+        return mentions
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'drugs': len(self._drug_terms),
+            'terms': len(self._terms),
+            'nodes': len(self._goto)
+        }
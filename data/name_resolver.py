@@ -0,0 +1,206 @@
+"""
+Drug Name Resolver
+Maps brand names, salt forms and formulation variants of a drug name to one integer drug ID
+"""
+
+import re
+import threading
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+# Salt and ester suffixes dropped when matching ("Metformin HCl" -> "metformin")
+SALT_SUFFIXES = frozenset({
+    'hydrochloride', 'hcl', 'hydrobromide', 'hbr', 'sodium', 'potassium', 'calcium', 'magnesium',
+    'sulfate', 'sulphate', 'succinate', 'tartrate', 'bitartrate', 'maleate', 'besylate', 'besilate',
+    'mesylate', 'mesilate', 'citrate', 'acetate', 'phosphate', 'fumarate', 'hyclate', 'bromide',
+    'chloride', 'monohydrate', 'dihydrate', 'trihydrate', 'disodium', 'dipropionate', 'propionate'
+})
+
+# Release and formulation tokens dropped when matching ("Metformin ER" -> "metformin")
+FORMULATION_TOKENS = frozenset({
+    'er', 'xr', 'xl', 'sr', 'cr', 'la', 'ir', 'dr', 'ec', 'mr', 'odt', 'cd', 'xrt',
+    'extended', 'sustained', 'controlled', 'delayed', 'immediate', 'modified', 'release',
+    'tablet', 'tablets', 'tab', 'tabs', 'capsule', 'capsules', 'cap', 'caps', 'oral', 'solution',
+    'suspension', 'injection', 'chewable', 'enteric', 'coated'
+})
+
+_SEPARATOR_PATTERN = re.compile(r'[\s_\-/,;()\[\]]+')
+_STRENGTH_PATTERN = re.compile(r'^\d+(?:\.\d+)?(?:mg|mcg|g|ml|units?|iu|%)?$')
+
+# Resolution results memoized per raw input string; sized so a batch over a
+# large catalog's keys and brand names does not clear it mid-run
+_CACHE_LIMIT = 65536
+
+
+def normalize_drug_name(name: str) -> str:
+    """Lowercase a drug name and collapse separators (underscores, hyphens, slashes) to single spaces"""
+    return ' '.join(_SEPARATOR_PATTERN.split(str(name).lower().replace('.', ''))).strip()
+
+
+def drug_name_stem(normalized: str) -> str:
+    """Drop trailing salt, formulation and strength tokens from a normalized name"""
+    tokens = normalized.split(' ')
+    while len(tokens) > 1 and (tokens[-1] in SALT_SUFFIXES or tokens[-1] in FORMULATION_TOKENS
+                               or _STRENGTH_PATTERN.match(tokens[-1])):
+        tokens.pop()
+    return ' '.join(tokens)
+
+
+def drug_key_form(normalized: str) -> str:
+    """Convert a normalized name to the underscore form used for catalog keys"""
+    return normalized.replace(' ', '_')
+
+
+def drug_aliases(drug_key: str, drug_data: Mapping[str, Any]) -> Tuple[List[str], List[str]]:
+    """Get the exact and stemmed aliases of a catalog drug.
+
+    Exact aliases are the normalized key, generic name and brand names;
+    stemmed aliases are the same names with salt and formulation tokens removed.
+    """
+    names = [drug_key, drug_data.get('generic_name') or '']
+    names.extend(drug_data.get('brand_names', ()))
+    exact = []
+    for name in names:
+        normalized = normalize_drug_name(name)
+        if normalized and normalized not in exact:
+            exact.append(normalized)
+    stems = []
+    for normalized in exact:
+        stem = drug_name_stem(normalized)
+        if stem not in exact and stem not in stems:
+            stems.append(stem)
+    return exact, stems
+
+
+class DrugNameResolver:
+    """Alias index from drug names to stable integer drug IDs.
+
+    Catalog drugs are registered with their key, generic name and brand
+    names, plus the same names stripped of salt and formulation tokens. A
+    name resolves to an ID by exact alias first, then by stemmed alias; the
+    result is memoized per input string, so repeated lookups of the same text
+    are a single dict probe. Optional fallback lookups (a mapped catalog
+    snapshot) are consulted for names that are not registered in memory.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._drug_ids: Dict[str, int] = {}
+        self._drug_keys: List[str] = []
+        self._aliases: Dict[str, int] = {}
+        self._stem_aliases: Dict[str, int] = {}
+        # drug id -> aliases it owns, used when a drug is re-registered
+        self._owned_aliases: Dict[int, Tuple[List[str], List[str]]] = {}
+        self._fallbacks: List[Callable[[str, bool], Optional[str]]] = []
+        self._cache: Dict[str, Optional[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._drug_keys)
+
+    def drug_id(self, drug_key: str) -> int:
+        """Get the ID for a canonical drug key, assigning the next ID if it is new"""
+        drug_id = self._drug_ids.get(drug_key)
+        if drug_id is None:
+            with self._lock:
+                drug_id = self._drug_ids.get(drug_key)
+                if drug_id is None:
+                    drug_id = len(self._drug_keys)
+                    self._drug_ids[drug_key] = drug_id
+                    self._drug_keys.append(drug_key)
+                    self._cache.clear()
+        return drug_id
+
+    def get_id(self, drug_key: str) -> Optional[int]:
+        """Get the ID for a canonical drug key without assigning one"""
+        return self._drug_ids.get(drug_key)
+
+    def drug_key(self, drug_id: int) -> str:
+        """Get the canonical drug key for an ID"""
+        return self._drug_keys[drug_id]
+
+    def add_fallback(self, lookup: Callable[[str, bool], Optional[str]]) -> None:
+        """Add a lookup (alias, is_stem) -> drug key consulted for unregistered names"""
+        with self._lock:
+            self._fallbacks.append(lookup)
+            self._cache.clear()
+
+    def register(self, drug_key: str, drug_data: Mapping[str, Any]) -> int:
+        """Register a catalog drug and its aliases, replacing its previous aliases"""
+        with self._lock:
+            drug_id = self.drug_id(drug_key)
+            self._unregister_aliases(drug_id)
+            exact, stems = drug_aliases(drug_key, drug_data)
+            # The drug's own key always wins; other names keep their first owner
+            self._aliases[exact[0]] = drug_id
+            for alias in exact[1:]:
+                self._aliases.setdefault(alias, drug_id)
+            for alias in stems:
+                self._stem_aliases.setdefault(alias, drug_id)
+            self._owned_aliases[drug_id] = (exact, stems)
+            self._cache.clear()
+            return drug_id
+
+    def _unregister_aliases(self, drug_id: int) -> None:
+        exact, stems = self._owned_aliases.pop(drug_id, ((), ()))
+        for aliases, names in ((self._aliases, exact), (self._stem_aliases, stems)):
+            for alias in names:
+                if aliases.get(alias) == drug_id:
+                    del aliases[alias]
+
+    def _resolve_uncached(self, name: str) -> Optional[int]:
+        normalized = normalize_drug_name(name)
+        if not normalized:
+            return None
+        stem = drug_name_stem(normalized)
+
+        for alias, aliases in ((normalized, self._aliases), (stem, self._aliases), (stem, self._stem_aliases)):
+            drug_id = aliases.get(alias)
+            if drug_id is not None:
+                return drug_id
+
+        for lookup in self._fallbacks:
+            for alias, is_stem in ((normalized, False), (stem, False), (stem, True)):
+                drug_key = lookup(alias, is_stem)
+                if drug_key is not None:
+                    return self.drug_id(drug_key)
+
+        # Names outside the catalog (e.g. interaction-only drugs) still have IDs
+        return self._drug_ids.get(drug_key_form(stem))
+
+    def resolve(self, name: str) -> Optional[int]:
+        """Resolve a drug name, brand name or salt/formulation variant to a drug ID"""
+        try:
+            return self._cache[name]
+        except KeyError:
+            pass
+        drug_id = self._resolve_uncached(name)
+        if len(self._cache) >= _CACHE_LIMIT:
+            self._cache.clear()
+        self._cache[name] = drug_id
+        return drug_id
+
+    def resolve_key(self, name: str) -> Optional[str]:
+        """Resolve a name to its canonical drug key, or None when unknown"""
+        drug_id = self.resolve(name)
+        return self._drug_keys[drug_id] if drug_id is not None else None
+
+    def canonical_key(self, name: str) -> str:
+        """Get the canonical key for a name, falling back to its normalized stem"""
+        drug_key = self.resolve_key(name)
+        if drug_key is not None:
+            return drug_key
+        return drug_key_form(drug_name_stem(normalize_drug_name(name)))
+
+    def canonical_id(self, name: str) -> int:
+        """Get the ID for a name, assigning one to names outside the catalog"""
+        drug_id = self.resolve(name)
+        if drug_id is not None:
+            return drug_id
+        return self.drug_id(self.canonical_key(name))
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'drug_ids': len(self._drug_keys),
+            'aliases': len(self._aliases),
+            'stem_aliases': len(self._stem_aliases),
+            'cached_lookups': len(self._cache)
+        }
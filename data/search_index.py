@@ -0,0 +1,197 @@
+"""
+Inverted Index for Drug Search
+Trigram and token postings over drug names, brand names and indications
+"""
+
+import bisect
+import heapq
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+NGRAM_SIZE = 3
+
+# Searchable fields, in ranking order
+FIELD_NAME = 0
+FIELD_BRAND = 1
+FIELD_INDICATION = 2
+
+_TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+
+def _ngrams(text: str) -> Set[str]:
+    """Get the distinct character n-grams of a lowercase string"""
+    return {text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+class DrugSearchIndex:
+    """Inverted index mapping query fragments to drug IDs.
+
+    Distinct strings are indexed once no matter how many drugs share them
+    (indications such as "Hypertension" repeat across the catalog). Queries of
+    three or more characters intersect trigram postings and verify the
+    substring on the surviving strings only; shorter queries match word
+    prefixes through a sorted token vocabulary.
+    """
+
+    def __init__(self):
+        self._string_ids: Dict[str, int] = {}
+        self._strings: List[str] = []
+        self._gram_postings: Dict[str, Set[int]] = {}
+        self._token_postings: Dict[str, Set[int]] = {}
+        self._vocabulary: List[str] = []
+        self._vocabulary_dirty = False
+
+        # string id -> drug ids, one mapping per field
+        self._string_drugs: Tuple[Dict[int, Set[int]], ...] = ({}, {}, {})
+        # string id -> bitmask of the fields it currently occurs in
+        self._string_fields: List[int] = []
+        # drug id -> (field, string id) pairs, used for removal
+        self._drug_strings: Dict[int, List[Tuple[int, int]]] = {}
+        self._drug_names: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._drug_strings)
+
+    def _intern(self, text: str) -> int:
+        """Get the string id for a lowercase string, indexing it if new"""
+        string_id = self._string_ids.get(text)
+        if string_id is not None:
+            return string_id
+
+        string_id = len(self._strings)
+        self._string_ids[text] = string_id
+        self._strings.append(text)
+        self._string_fields.append(0)
+
+        for gram in _ngrams(text):
+            self._gram_postings.setdefault(gram, set()).add(string_id)
+
+        for token in _TOKEN_PATTERN.findall(text):
+            postings = self._token_postings.get(token)
+            if postings is None:
+                postings = self._token_postings[token] = set()
+                self._vocabulary_dirty = True
+            postings.add(string_id)
+
+        return string_id
+
+    def add(self, drug_id: int, name: str, brand_names: Iterable[str] = (),
+            indications: Iterable[str] = ()) -> None:
+        """Index a drug, replacing any previous entry for the same ID"""
+        if drug_id in self._drug_strings:
+            self.remove(drug_id)
+
+        entries = []
+        for field, values in ((FIELD_NAME, [name]), (FIELD_BRAND, brand_names), (FIELD_INDICATION, indications)):
+            for value in values:
+                text = str(value).lower().strip()
+                if not text:
+                    continue
+                string_id = self._intern(text)
+                self._string_drugs[field].setdefault(string_id, set()).add(drug_id)
+                self._string_fields[string_id] |= 1 << field
+                entries.append((field, string_id))
+
+        self._drug_strings[drug_id] = entries
+        self._drug_names[drug_id] = name.lower().strip()
+
+    def remove(self, drug_id: int) -> None:
+        """Remove a drug from the index"""
+        for field, string_id in self._drug_strings.pop(drug_id, []):
+            drugs = self._string_drugs[field].get(string_id)
+            if drugs is not None:
+                drugs.discard(drug_id)
+                if not drugs:
+                    del self._string_drugs[field][string_id]
+                    self._string_fields[string_id] &= ~(1 << field)
+        self._drug_names.pop(drug_id, None)
+
+    def _candidate_strings(self, query: str) -> Set[int]:
+        """Get ids of indexed strings that contain the query"""
+        if len(query) >= NGRAM_SIZE:
+            postings = []
+            for gram in _ngrams(query):
+                gram_postings = self._gram_postings.get(gram)
+                if not gram_postings:
+                    return set()
+                postings.append(gram_postings)
+
+            postings.sort(key=len)
+            candidates = set(postings[0])
+            for gram_postings in postings[1:]:
+                candidates &= gram_postings
+                if not candidates:
+                    return candidates
+
+            # Trigram matches are necessary but not sufficient
+            return {sid for sid in candidates if query in self._strings[sid]}
+
+        # Short queries match word prefixes
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._token_postings)
+            self._vocabulary_dirty = False
+
+        candidates = set()
+        position = bisect.bisect_left(self._vocabulary, query)
+        while position < len(self._vocabulary) and self._vocabulary[position].startswith(query):
+            candidates |= self._token_postings[self._vocabulary[position]]
+            position += 1
+        return candidates
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[int]:
+        """Search the index and return drug IDs, best matches first.
+
+        Name matches rank above brand matches, which rank above indication
+        matches; within a field exact matches beat prefixes, and prefixes beat
+        other substrings. Ties are broken by drug name. With a limit, ranking
+        stops at the first rank level that fills it.
+        """
+        query = query.lower().strip()
+        if not query or limit == 0:
+            return []
+
+        # Bucket matching strings by rank level: field * 3 + match kind
+        levels: List[List[int]] = [[] for _ in range(9)]
+        strings = self._strings
+        string_fields = self._string_fields
+        for string_id in self._candidate_strings(query):
+            fields = string_fields[string_id]
+            if not fields:
+                continue
+            text = strings[string_id]
+            match_rank = 2 if not text.startswith(query) else 0 if text == query else 1
+            if fields & 1:
+                levels[match_rank].append(string_id)
+            if fields & 2:
+                levels[3 + match_rank].append(string_id)
+            if fields & 4:
+                levels[6 + match_rank].append(string_id)
+
+        results: List[int] = []
+        seen: Set[int] = set()
+        for rank, string_ids in enumerate(levels):
+            field_drugs = self._string_drugs[rank // 3]
+            level_drugs = set()
+            for string_id in string_ids:
+                level_drugs |= field_drugs[string_id]
+            level_drugs -= seen
+            if not level_drugs:
+                continue
+
+            name_of = self._drug_names.__getitem__
+            if limit is not None and len(results) + len(level_drugs) >= limit:
+                results.extend(heapq.nsmallest(limit - len(results), level_drugs, key=name_of))
+                return results
+            results.extend(sorted(level_drugs, key=name_of))
+            seen |= level_drugs
+
+        return results
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get index size statistics"""
+        return {
+            'indexed_drugs': len(self._drug_strings),
+            'distinct_strings': len(self._strings),
+            'ngrams': len(self._gram_postings),
+            'tokens': len(self._token_postings)
+        }
@@ -0,0 +1,283 @@
+"""
+SQLite Storage Backend
+Persistent drug catalog and interaction tables with FTS5 text search
+"""
+
+import json
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from data.drug_record import DrugRecord
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS drugs (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    category TEXT NOT NULL DEFAULT '',
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_drugs_category ON drugs(category);
+CREATE TABLE IF NOT EXISTS brands (
+    drug_id INTEGER NOT NULL REFERENCES drugs(id) ON DELETE CASCADE,
+    brand TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_brands_brand ON brands(brand);
+CREATE INDEX IF NOT EXISTS idx_brands_drug ON brands(drug_id);
+CREATE TABLE IF NOT EXISTS indications (
+    drug_id INTEGER NOT NULL REFERENCES drugs(id) ON DELETE CASCADE,
+    indication TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_indications_indication ON indications(indication, drug_id);
+CREATE INDEX IF NOT EXISTS idx_indications_drug ON indications(drug_id);
+CREATE TABLE IF NOT EXISTS interactions (
+    drug1 TEXT NOT NULL,
+    drug2 TEXT NOT NULL,
+    severity TEXT NOT NULL,
+    description TEXT NOT NULL,
+    recommendation TEXT NOT NULL,
+    PRIMARY KEY (drug1, drug2)
+);
+CREATE INDEX IF NOT EXISTS idx_interactions_drug2 ON interactions(drug2);
+"""
+
+# Column weights for bm25(): name, brands, indications
+_FTS_WEIGHTS = (10.0, 5.0, 1.0)
+
+
+class SQLiteDrugStore:
+    """Drug catalog and interactions stored in a local SQLite file.
+
+    Drug names, brands and indications are kept lowercase in their own
+    indexed tables; the full entry is stored as JSON and rebuilt into a
+    DrugRecord on read. Text search uses an FTS5 table with the trigram
+    tokenizer, which gives the same substring semantics as the in-memory
+    search index. All statements are parameterized so sqlite3 reuses the
+    prepared statements from its cache.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.RLock()
+        # Shared by the Streamlit script threads; access is serialized by the lock
+        self._conn = sqlite3.connect(path, check_same_thread=False, cached_statements=256)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+            self._trigram_search = self._create_fts_table()
+
+    def _create_fts_table(self) -> bool:
+        """Create the FTS5 table, preferring the trigram tokenizer (SQLite >= 3.34)"""
+        try:
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS drugs_fts "
+                "USING fts5(name, brands, indications, tokenize='trigram')"
+            )
+            return True
+        except sqlite3.OperationalError:
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS drugs_fts USING fts5(name, brands, indications)"
+            )
+            return False
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # Metadata
+
+    def get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    # Drugs
+
+    def _put_drug(self, name: str, record: DrugRecord) -> None:
+        """Insert or replace one drug (caller holds the lock and a transaction)"""
+        brands = [brand.lower().strip() for brand in record.get('brand_names', ())]
+        indications = sorted({indication.lower().strip() for indication in record.get('indications', ())})
+
+        row = self._conn.execute("SELECT id FROM drugs WHERE name = ?", (name,)).fetchone()
+        if row is not None:
+            drug_id = row[0]
+            self._conn.execute(
+                "UPDATE drugs SET category = ?, record = ? WHERE id = ?",
+                (record.category.lower().strip(), json.dumps(record.to_dict()), drug_id)
+            )
+            self._conn.execute("DELETE FROM brands WHERE drug_id = ?", (drug_id,))
+            self._conn.execute("DELETE FROM indications WHERE drug_id = ?", (drug_id,))
+            self._conn.execute("DELETE FROM drugs_fts WHERE rowid = ?", (drug_id,))
+        else:
+            drug_id = self._conn.execute(
+                "INSERT INTO drugs (name, category, record) VALUES (?, ?, ?)",
+                (name, record.category.lower().strip(), json.dumps(record.to_dict()))
+            ).lastrowid
+
+        self._conn.executemany("INSERT INTO brands (drug_id, brand) VALUES (?, ?)",
+                               [(drug_id, brand) for brand in brands])
+        self._conn.executemany("INSERT INTO indications (drug_id, indication) VALUES (?, ?)",
+                               [(drug_id, indication) for indication in indications])
+        self._conn.execute(
+            "INSERT INTO drugs_fts (rowid, name, brands, indications) VALUES (?, ?, ?, ?)",
+            (drug_id, name, '\n'.join(brands), '\n'.join(indications))
+        )
+
+    def put_drug(self, name: str, record: DrugRecord) -> None:
+        """Insert or replace a drug"""
+        with self._lock, self._conn:
+            self._put_drug(name, record)
+
+    def put_drugs(self, drugs: Iterable[Tuple[str, DrugRecord]]) -> None:
+        """Insert or replace many drugs in a single transaction"""
+        with self._lock, self._conn:
+            for name, record in drugs:
+                self._put_drug(name, record)
+
+    def get_drug(self, name: str) -> Optional[DrugRecord]:
+        with self._lock:
+            row = self._conn.execute("SELECT record FROM drugs WHERE name = ?", (name,)).fetchone()
+        return DrugRecord.from_dict(json.loads(row[0])) if row else None
+
+    def has_drug(self, name: str) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM drugs WHERE name = ?", (name,)).fetchone() is not None
+
+    def drug_names(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT name FROM drugs ORDER BY id")]
+
+    def count_drugs(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM drugs").fetchone()[0]
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[str]:
+        """Search names, brands and indications, best matches first"""
+        query = query.lower().strip()
+        if not query:
+            return []
+        sql_limit = limit if limit is not None else -1
+
+        with self._lock:
+            if len(query) >= 3 or not self._trigram_search:
+                phrase = '"' + query.replace('"', '""') + '"'
+                if not self._trigram_search:
+                    phrase += '*'
+                rows = self._conn.execute(
+                    "SELECT d.name FROM drugs_fts JOIN drugs d ON d.id = drugs_fts.rowid "
+                    "WHERE drugs_fts MATCH ? ORDER BY bm25(drugs_fts, ?, ?, ?), d.name LIMIT ?",
+                    (phrase, *_FTS_WEIGHTS, sql_limit)
+                )
+            else:
+                # Trigram tokens need three characters; short queries match word prefixes
+                prefix = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+                word_prefix = '% ' + prefix
+                rows = self._conn.execute(
+                    "SELECT name FROM ("
+                    "  SELECT d.name, 0 AS rank FROM drugs d WHERE d.name LIKE ?1 ESCAPE '\\'"
+                    "  UNION ALL SELECT d.name, 1 FROM brands b JOIN drugs d ON d.id = b.drug_id"
+                    "    WHERE b.brand LIKE ?1 ESCAPE '\\' OR b.brand LIKE ?2 ESCAPE '\\'"
+                    "  UNION ALL SELECT d.name, 2 FROM indications i JOIN drugs d ON d.id = i.drug_id"
+                    "    WHERE i.indication LIKE ?1 ESCAPE '\\' OR i.indication LIKE ?2 ESCAPE '\\'"
+                    ") GROUP BY name ORDER BY MIN(rank), name LIMIT ?3",
+                    (prefix, word_prefix, sql_limit)
+                )
+            return [row[0] for row in rows]
+
+    def drugs_by_indication(self, indication: str) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT d.name FROM indications i JOIN drugs d ON d.id = i.drug_id "
+                "WHERE i.indication = ? ORDER BY d.id",
+                (indication.lower().strip(),)
+            )
+            return [row[0] for row in rows]
+
+    def drugs_by_category(self, category: str) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name FROM drugs WHERE category = ? ORDER BY id", (category.lower().strip(),)
+            )
+            return [row[0] for row in rows]
+
+    def category_of(self, name: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT category FROM drugs WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def indication_overlaps(self, name: str) -> Dict[str, Set[str]]:
+        """Get other drugs sharing an indication with a drug, with the shared indications"""
+        overlaps: Dict[str, Set[str]] = {}
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT d2.name, i2.indication FROM drugs d1 "
+                "JOIN indications i1 ON i1.drug_id = d1.id "
+                "JOIN indications i2 ON i2.indication = i1.indication AND i2.drug_id != d1.id "
+                "JOIN drugs d2 ON d2.id = i2.drug_id "
+                "WHERE d1.name = ? ORDER BY d2.id",
+                (name,)
+            )
+            for other_name, indication in rows:
+                overlaps.setdefault(other_name, set()).add(indication)
+        return overlaps
+
+    # Interactions
+
+    def put_interaction(self, drug1: str, drug2: str, severity: str, description: str,
+                        recommendation: str) -> None:
+        with self._lock, self._conn:
+            # Interactions are undirected; drop the pair stored in the other order
+            self._conn.execute("DELETE FROM interactions WHERE drug1 = ? AND drug2 = ?", (drug2, drug1))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO interactions (drug1, drug2, severity, description, recommendation) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (drug1, drug2, severity, description, recommendation)
+            )
+
+    def put_interactions(self, interactions: Iterable[Tuple[str, str, str, str, str]]) -> None:
+        """Insert or replace many interactions in a single transaction"""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO interactions (drug1, drug2, severity, description, recommendation) "
+                "VALUES (?, ?, ?, ?, ?)",
+                list(interactions)
+            )
+
+    def get_interaction(self, drug1: str, drug2: str) -> Optional[Dict[str, str]]:
+        """Get the interaction between two drugs in either order"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT severity, description, recommendation FROM interactions "
+                "WHERE (drug1 = ? AND drug2 = ?) OR (drug1 = ? AND drug2 = ?) LIMIT 1",
+                (drug1, drug2, drug2, drug1)
+            ).fetchone()
+        if row is None:
+            return None
+        return {'severity': row[0], 'description': row[1], 'recommendation': row[2]}
+
+    def iter_interactions(self) -> List[Tuple[str, str, str, str, str]]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT drug1, drug2, severity, description, recommendation FROM interactions"
+            ).fetchall()
+
+    def count_interactions(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM interactions").fetchone()[0]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'path': self.path,
+            'drugs': self.count_drugs(),
+            'interactions': self.count_interactions(),
+            'trigram_search': self._trigram_search
+        }
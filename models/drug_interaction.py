@@ -1,16 +1,53 @@
 import os
-import requests
-from typing import List, Dict, Any
+import threading
+from functools import lru_cache
+from itertools import chain
+import numpy as np
+from typing import List, Dict, Any, Callable, FrozenSet, Iterable, Iterator, Optional, Sequence, Set, Tuple
 import streamlit as st
+from data.name_resolver import DrugNameResolver
+from data.sqlite_store import SQLiteDrugStore
+from models.inference_client import get_inference_client
+from models.interaction_store import (AdjacencyInteractionStore, BatchInteractions, CSRInteractionStore,
+                                      InteractionDatabaseView, InteractionRecord, SEVERITY_CODES, SEVERITY_LEVELS,
+                                      screen_regimens, severity_code)
+from models.mechanism_inference import EnzymeRoleIndex
+from models.multi_drug_rules import MultiDrugRule, MultiDrugRuleIndex
+
+# Drug ID pairs kept in the single-pair lookup cache
+PAIR_CACHE_SIZE = 16384
 
 class DrugInteractionChecker:
-    def __init__(self):
+    def __init__(self, store: Optional[SQLiteDrugStore] = None,
+                 resolver: Optional[DrugNameResolver] = None):
         self.huggingface_token = os.getenv("HUGGINGFACE_API_KEY", "")
         self.api_url = "https://api-inference.huggingface.co/models/OpenMed/OpenMed-NER-PharmaDetect-SuperClinical-434M"
-        self.headers = {"Authorization": f"Bearer {self.huggingface_token}"}
+        
+        # Guards writes; the checker is shared by every session of the server
+        self._lock = threading.RLock()
+        
+        # Name -> drug ID resolution shared with the DrugDatabase, so brand,
+        # salt and formulation names find the same interactions
+        self.resolver = resolver if resolver is not None else DrugNameResolver()
+        
+        # Pair lookups by drug ID, cleared whenever interactions change
+        self._lookup_pair = lru_cache(maxsize=PAIR_CACHE_SIZE)(self._lookup_pair_uncached)
+        
+        # Incremented on every interaction write so derived results can detect staleness
+        self.revision = 0
+        
+        # Rule name / enzyme -> concrete pairs derived, and how many were stored
+        self.class_rule_report: Dict[str, int] = {}
+        self.class_rule_pairs = 0
+        self.mechanism_report: Dict[str, int] = {}
+        self.mechanism_pairs = 0
+        
+        # Rules that need three or more drugs; checked by check_multi_drug_interactions
+        self.multi_drug_rules = MultiDrugRuleIndex()
+        self.multi_drug_report: Dict[str, int] = {}
         
         # Known drug interactions database (expandable)
-        self.interaction_database = {
+        default_interactions = {
             ("warfarin", "aspirin"): {
                 "severity": "High",
                 "description": "Increased risk of bleeding",
@@ -37,12 +74,180 @@ class DrugInteractionChecker:
                 "recommendation": "Monitor digoxin levels and electrolytes"
             }
         }
+        
+        # Interactions stored once per unordered drug ID pair
+        self.interactions = AdjacencyInteractionStore()
+        for (drug1, drug2), interaction_data in default_interactions.items():
+            self._put_interaction(drug1, drug2, interaction_data['severity'],
+                                  interaction_data['description'], interaction_data['recommendation'])
+        
+        # Optional persistent backend; saved interactions override the defaults
+        self.store = store
+        if self.store is not None:
+            for drug1, drug2, severity, description, recommendation in self.store.iter_interactions():
+                self._put_interaction(drug1, drug2, severity, description, recommendation)
+    
+    @property
+    def interaction_database(self) -> InteractionDatabaseView:
+        """Read-only (drug1, drug2) -> interaction dict view of the stored interactions"""
+        return InteractionDatabaseView(self.interactions, self.resolver.get_id)
+    
+    def _put_interaction(self, drug1: str, drug2: str, severity: str, description: str,
+                         recommendation: str) -> InteractionRecord:
+        """Store an interaction under canonical keys (caller holds the write lock)"""
+        drug1_key, drug2_key = self.resolver.canonical_key(drug1), self.resolver.canonical_key(drug2)
+        record = InteractionRecord(drug1_key, drug2_key, severity_code(severity), description, recommendation)
+        self.interactions.put(self.resolver.drug_id(drug1_key), self.resolver.drug_id(drug2_key), record)
+        self._lookup_pair.cache_clear()
+        self.revision += 1
+        return record
+    
+    def load_interactions(self, interactions: Iterable[Tuple[str, str, str, str, str]]) -> int:
+        """Bulk-load (drug1, drug2, severity, description, recommendation) rows into a compressed store.
+        
+        The current interactions and the new rows are packed into a
+        CSRInteractionStore; later add_interaction calls still work. Rows are
+        not written to the persistent store. Returns the number of rows read.
+        """
+        with self._lock:
+            rows = [(record.drug1, record.drug2, record.severity, record.description, record.recommendation)
+                    for record in self.interactions]
+            current_count = len(rows)
+            rows.extend(interactions)
+            drug_id = self.resolver.canonical_id
+            self.interactions = CSRInteractionStore.build(self.resolver.drug_key, (
+                (drug_id(drug1), drug_id(drug2), severity_code(severity), description, recommendation)
+                for drug1, drug2, severity, description, recommendation in rows
+            ))
+            self._lookup_pair.cache_clear()
+            self.revision += 1
+            return len(rows) - current_count
+    
+    def _rule_members(self, side: Dict[str, List[str]], drugs_in_category: Callable[[str], List[str]]) -> Set[int]:
+        """Get the drug IDs on one side of a class rule"""
+        members = set()
+        for category in side.get('categories', []):
+            members.update(self.resolver.canonical_id(drug) for drug in drugs_in_category(category))
+        for drug in side.get('drugs', []):
+            members.add(self.resolver.canonical_id(drug))
+        return members
+    
+    def compile_class_rules(self, rules: List[Dict[str, Any]],
+                            drugs_in_category: Callable[[str], List[str]]) -> Dict[str, int]:
+        """Expand class-level interaction rules into concrete drug-pair interactions.
+        
+        Each rule has a 'left' and 'right' side listing 'categories' and/or
+        'drugs'; every cross pair is stored as an ordinary interaction, so
+        checks stay a plain lookup whatever the number of rules. Interactions
+        already stored (explicit pairs) take precedence, and where rules
+        overlap the more severe one wins. Returns the number of concrete pairs
+        each rule expands to.
+        """
+        with self._lock:
+            report = {}
+            compiled: Dict[Tuple[int, int], Tuple[int, int, int, Dict[str, Any]]] = {}
+            for rule in rules:
+                left = self._rule_members(rule.get('left', {}), drugs_in_category)
+                right = self._rule_members(rule.get('right', {}), drugs_in_category)
+                code = severity_code(rule['severity'])
+                rule_pairs = set()
+                for drug1_id in left:
+                    for drug2_id in right:
+                        if drug1_id == drug2_id:
+                            continue
+                        pair = (drug1_id, drug2_id) if drug1_id < drug2_id else (drug2_id, drug1_id)
+                        if pair in rule_pairs:
+                            continue
+                        rule_pairs.add(pair)
+                        current = compiled.get(pair)
+                        if current is None or code > current[0]:
+                            compiled[pair] = (code, drug1_id, drug2_id, rule)
+                report[rule['name']] = len(rule_pairs)
+            
+            self.class_rule_report = report
+            self.class_rule_pairs = self._store_derived(
+                (drug1_id, drug2_id, code, rule['description'], rule['recommendation'])
+                for code, drug1_id, drug2_id, rule in compiled.values()
+            )
+            return report
+    
+    def compile_multi_drug_rules(self, rules: List[Dict[str, Any]],
+                                 drugs_in_category: Callable[[str], List[str]]) -> Dict[str, int]:
+        """Index multi-drug rules over the loaded catalog.
+        
+        Each rule lists 'requires' entries of 'categories' and/or 'drugs' with
+        an optional 'min_count' (default 1); the rule applies when every entry
+        is met by different drugs. Replaces previously compiled rules. Returns
+        the number of member drugs per rule; rules no regimen can meet are
+        reported with 0 members and skipped.
+        """
+        with self._lock:
+            index = MultiDrugRuleIndex()
+            report = {}
+            for rule in rules:
+                requirements = tuple(
+                    (frozenset(self._rule_members(requirement, drugs_in_category)), requirement.get('min_count', 1))
+                    for requirement in rule['requires']
+                )
+                compiled = MultiDrugRule(rule['name'], requirements, severity_code(rule['severity']),
+                                         rule['description'], rule['recommendation'])
+                report[rule['name']] = len(compiled.members()) if index.add(compiled) else 0
+            self.multi_drug_rules = index
+            self.multi_drug_report = report
+            return report
+    
+    def compile_mechanism_interactions(self, profiles: Iterable[Tuple[str, Dict[str, List[str]]]]) -> Dict[str, int]:
+        """Infer candidate interactions from (drug, {enzyme: [roles]}) profiles.
+        
+        Inhibitors and inducers of an enzyme are paired with its substrates
+        through an EnzymeRoleIndex. Interactions already stored (explicit
+        pairs and class rules) take precedence. Returns the number of
+        inferred pairs per enzyme.
+        """
+        with self._lock:
+            index = EnzymeRoleIndex()
+            for drug, enzyme_roles in profiles:
+                index.add(self.resolver.canonical_id(drug), enzyme_roles)
+            inferred = index.infer()
+            
+            report: Dict[str, int] = {}
+            for interaction in inferred.values():
+                for enzyme in dict.fromkeys(mechanism.enzyme for mechanism in interaction.mechanisms):
+                    report[enzyme] = report.get(enzyme, 0) + 1
+            
+            def drug_name(drug_id: int) -> str:
+                return self.resolver.drug_key(drug_id).replace('_', ' ').title()
+            
+            self.mechanism_report = report
+            self.mechanism_pairs = self._store_derived(
+                (interaction.drug1_id, interaction.drug2_id, interaction.severity_code)
+                + interaction.describe(drug_name)
+                for interaction in inferred.values()
+            )
+            return report
+    
+    def _store_derived(self, pairs: Iterable[Tuple[int, int, int, str, str]]) -> int:
+        """Store derived (drug1_id, drug2_id, code, description, recommendation) interactions
+        for pairs that have none yet; returns how many were stored (caller holds the write lock)"""
+        rows = []
+        for drug1_id, drug2_id, code, description, recommendation in pairs:
+            if self.interactions.get(drug1_id, drug2_id) is None:
+                rows.append((self.resolver.drug_key(drug1_id), self.resolver.drug_key(drug2_id),
+                             SEVERITY_LEVELS[code], description, recommendation))
+        
+        if isinstance(self.interactions, CSRInteractionStore):
+            # Keep large expansions packed rather than in the overlay
+            self.load_interactions(rows)
+        else:
+            for row in rows:
+                self._put_interaction(*row)
+        return len(rows)
     
     def extract_drugs_from_text(self, text: str) -> List[str]:
         """Extract drug names using Hugging Face NER model"""
         try:
             payload = {"inputs": text}
-            response = requests.post(self.api_url, headers=self.headers, json=payload)
+            response = get_inference_client().post(self.api_url, json=payload)
             
             if response.status_code == 200:
                 entities = response.json()
@@ -67,32 +272,218 @@ class DrugInteractionChecker:
         """Check for drug interactions"""
         interactions = []
         
-        # Check all combinations of drugs
-        for i in range(len(drugs)):
-            for j in range(i + 1, len(drugs)):
-                drug1, drug2 = drugs[i].lower(), drugs[j].lower()
-                
-                # Check both combinations
-                interaction_key = (drug1, drug2)
-                reverse_key = (drug2, drug1)
-                
-                if interaction_key in self.interaction_database:
-                    interaction_data = self.interaction_database[interaction_key]
-                elif reverse_key in self.interaction_database:
-                    interaction_data = self.interaction_database[reverse_key]
-                else:
-                    continue
-                
+        # Resolve each name once; unknown names cannot interact
+        drug_ids = [self.resolver.resolve(drug) for drug in drugs]
+        
+        # Intersect each drug's interaction neighbours with the regimen
+        for i, j, record in self.interactions.find_in_regimen(drug_ids):
+            interactions.append({
+                'drug1': drugs[i].lower().title(),
+                'drug2': drugs[j].lower().title(),
+                'severity': record.severity,
+                'description': record.description,
+                'recommendation': record.recommendation
+            })
+        
+        return interactions
+    
+    def check_multi_drug_interactions(self, drugs: List[str]) -> List[Dict[str, Any]]:
+        """Check a drug list against the multi-drug rules.
+        
+        Each finding lists the entered names of the drugs involved, in the
+        order given, with the rule's severity, description and recommendation.
+        """
+        names: Dict[int, str] = {}
+        for drug in drugs:
+            drug_id = self.resolver.resolve(drug)
+            if drug_id is not None:
+                names.setdefault(drug_id, drug)
+        
+        findings = []
+        for rule, drug_ids in self.multi_drug_rules.match(set(names)):
+            involved = set(drug_ids)
+            findings.append({
+                'rule': rule.name,
+                'drugs': [name.lower().title() for drug_id, name in names.items() if drug_id in involved],
+                'severity': SEVERITY_LEVELS[rule.severity_code],
+                'description': rule.description,
+                'recommendation': rule.recommendation
+            })
+        return findings
+    
+    def _regimen_positions(self, drugs: List[str]) -> Dict[int, List[int]]:
+        """Map each resolved drug ID to its positions in a drug list"""
+        positions: Dict[int, List[int]] = {}
+        for position, drug in enumerate(drugs):
+            drug_id = self.resolver.resolve(drug)
+            if drug_id is not None:
+                positions.setdefault(drug_id, []).append(position)
+        return positions
+    
+    def _severity_hits(self, regimen: FrozenSet[int], code: int,
+                       anchor_buckets: Dict[int, Tuple[FrozenSet[int], ...]]) -> Iterator[Tuple[int, int]]:
+        """Yield (anchor ID, other ID) pairs of one severity between anchor drugs and a regimen"""
+        for drug_id, buckets in anchor_buckets.items():
+            # Set intersection walks whichever side is smaller
+            for other_id in buckets[code] & regimen:
+                if other_id != drug_id:
+                    yield drug_id, other_id
+    
+    def _anchor_buckets(self, positions: Dict[int, List[int]],
+                        drug: Optional[str] = None) -> Dict[int, Tuple[FrozenSet[int], ...]]:
+        """Severity buckets of the regimen drugs, or of drug alone when given"""
+        if drug is None:
+            anchors = positions
+        else:
+            drug_id = self.resolver.resolve(drug)
+            anchors = [drug_id] if drug_id is not None else []
+        return {drug_id: self.interactions.severity_buckets(drug_id) for drug_id in anchors}
+    
+    def max_severity(self, drugs: List[str], drug: Optional[str] = None) -> Optional[str]:
+        """Get the worst interaction severity in a drug list, or None if nothing interacts.
+        
+        Severities are tried from High down and each stops at the first
+        interacting pair, so no interaction list is built. If drug is given,
+        only its interactions with the list are considered.
+        """
+        positions = self._regimen_positions(drugs)
+        regimen = frozenset(positions)
+        anchor_buckets = self._anchor_buckets(positions, drug)
+        for code in reversed(range(len(SEVERITY_LEVELS))):
+            if next(self._severity_hits(regimen, code, anchor_buckets), None) is not None:
+                return SEVERITY_LEVELS[code]
+        return None
+    
+    def any_high(self, drugs: List[str], drug: Optional[str] = None) -> bool:
+        """Check whether a drug list (or drug against it) has any High severity interaction"""
+        positions = self._regimen_positions(drugs)
+        hits = self._severity_hits(frozenset(positions), SEVERITY_CODES['High'], self._anchor_buckets(positions, drug))
+        return next(hits, None) is not None
+    
+    def top_k(self, drugs: List[str], k: int) -> List[Dict[str, Any]]:
+        """Get the k most severe interactions in check_interactions format.
+        
+        Interactions are ordered by severity, then by drug positions as in
+        check_interactions; lower severities are only searched while fewer
+        than k have been found, and only the returned ones are formatted.
+        """
+        positions = self._regimen_positions(drugs)
+        regimen = frozenset(positions)
+        anchor_buckets = self._anchor_buckets(positions)
+        found = []
+        for code in reversed(range(len(SEVERITY_LEVELS))):
+            if len(found) >= k:
+                break
+            hits = sorted(
+                (min(position, other_position), max(position, other_position), drug_id, other_id)
+                for drug_id, other_id in self._severity_hits(regimen, code, anchor_buckets)
+                if drug_id < other_id
+                for position in positions[drug_id]
+                for other_position in positions[other_id]
+            )
+            found.extend(hits[:k - len(found)])
+        
+        interactions = []
+        for i, j, drug_id, other_id in found:
+            record = self._interaction_between(drug_id, other_id)
+            interactions.append({
+                'drug1': drugs[i].lower().title(),
+                'drug2': drugs[j].lower().title(),
+                'severity': record.severity,
+                'description': record.description,
+                'recommendation': record.recommendation
+            })
+        return interactions
+    
+    def interacting_drugs(self, drug: str, min_severity: str = 'Low') -> List[Dict[str, Any]]:
+        """List the drugs that interact with a drug at min_severity or above.
+        
+        Read from the drug's severity buckets, so the cost is O(degree)
+        rather than a scan of every stored pair. Results are sorted by
+        severity (most severe first), then by drug name.
+        """
+        drug_id = self.resolver.resolve(drug)
+        if drug_id is None:
+            return []
+        
+        buckets = self.interactions.severity_buckets(drug_id)
+        drug_key = self.resolver.drug_key
+        interacting = []
+        for code in reversed(range(severity_code(min_severity), len(SEVERITY_LEVELS))):
+            for other_id in sorted(buckets[code], key=drug_key):
+                record = self.interactions.get(drug_id, other_id)
+                interacting.append({
+                    'drug': drug_key(other_id),
+                    'severity': record.severity,
+                    'description': record.description,
+                    'recommendation': record.recommendation
+                })
+        return interacting
+    
+    def _lookup_pair_uncached(self, drug1_id: int, drug2_id: int) -> Optional[InteractionRecord]:
+        return self.interactions.get(drug1_id, drug2_id)
+    
+    def _interaction_between(self, drug1_id: Optional[int], drug2_id: Optional[int]) -> Optional[InteractionRecord]:
+        """Cached interaction lookup for two resolved drugs (either order)"""
+        if drug1_id is None or drug2_id is None or drug1_id == drug2_id:
+            return None
+        if drug1_id > drug2_id:
+            drug1_id, drug2_id = drug2_id, drug1_id
+        return self._lookup_pair(drug1_id, drug2_id)
+    
+    def check_interaction(self, drug1: str, drug2: str) -> Optional[Dict[str, Any]]:
+        """Check a single drug pair; returns the interaction in check_interactions format, or None"""
+        record = self._interaction_between(self.resolver.resolve(drug1), self.resolver.resolve(drug2))
+        if record is None:
+            return None
+        return {
+            'drug1': drug1.lower().title(),
+            'drug2': drug2.lower().title(),
+            'severity': record.severity,
+            'description': record.description,
+            'recommendation': record.recommendation
+        }
+    
+    def check_interactions_with(self, drug: str, medications: List[str]) -> List[Dict[str, Any]]:
+        """Check one drug against a list of medications in a single pass"""
+        interactions = []
+        drug_id = self.resolver.resolve(drug)
+        if drug_id is None:
+            return interactions
+        
+        for medication in medications:
+            record = self._interaction_between(drug_id, self.resolver.resolve(medication))
+            if record is not None:
                 interactions.append({
-                    'drug1': drug1.title(),
-                    'drug2': drug2.title(),
-                    'severity': interaction_data['severity'],
-                    'description': interaction_data['description'],
-                    'recommendation': interaction_data['recommendation']
+                    'drug1': drug.lower().title(),
+                    'drug2': medication.lower().title(),
+                    'severity': record.severity,
+                    'description': record.description,
+                    'recommendation': record.recommendation
                 })
         
         return interactions
     
+    def check_interactions_batch(self, regimens: Sequence[Sequence[str]]) -> BatchInteractions:
+        """Check many drug lists at once.
+        
+        Returns parallel arrays of regimen index, drug positions, drug IDs and
+        severity codes, with the same pairs and order as calling
+        check_interactions on each regimen. Descriptions can be read with
+        self.interactions.get(drug1_id, drug2_id).
+        """
+        names = list(chain.from_iterable(regimens))
+        # Resolve each distinct name of the batch once; unknown names are -1
+        drug_ids = dict.fromkeys(names, -1)
+        resolve = self.resolver.resolve
+        for name in drug_ids:
+            drug_id = resolve(name)
+            if drug_id is not None:
+                drug_ids[name] = drug_id
+        encoded = np.fromiter(map(drug_ids.__getitem__, names), dtype=np.int64, count=len(names))
+        lengths = np.fromiter(map(len, regimens), dtype=np.int64, count=len(regimens))
+        return screen_regimens(self.interactions.pair_table(), encoded, lengths)
+    
     def analyze_individual_drugs(self, drugs: List[str]) -> List[Dict[str, Any]]:
         """Analyze individual drug information"""
         drug_info = []
@@ -123,17 +514,15 @@ class DrugInteractionChecker:
             'spironolactone': 'Potassium-sparing Diuretic',
             'clarithromycin': 'Macrolide Antibiotic'
         }
-        return categories.get(drug.lower(), 'Unknown')
+        return categories.get(self.resolver.canonical_key(drug), 'Unknown')
     
     def add_interaction(self, drug1: str, drug2: str, severity: str, description: str, recommendation: str) -> bool:
         """Add new drug interaction to database"""
         try:
-            interaction_key = (drug1.lower().strip(), drug2.lower().strip())
-            self.interaction_database[interaction_key] = {
-                'severity': severity,
-                'description': description,
-                'recommendation': recommendation
-            }
+            with self._lock:
+                record = self._put_interaction(drug1, drug2, severity, description, recommendation)
+                if self.store is not None:
+                    self.store.put_interaction(record.drug1, record.drug2, severity, description, recommendation)
             return True
         except Exception as e:
             print(f"Error adding interaction {drug1}-{drug2}: {e}")
@@ -156,16 +545,16 @@ class DrugInteractionChecker:
     
     def get_interaction_stats(self) -> Dict[str, int]:
         """Get statistics about interactions database"""
-        severities = {}
-        for interaction in self.interaction_database.values():
-            severity = interaction['severity']
-            severities[severity] = severities.get(severity, 0) + 1
+        severities = self.interactions.severity_counts()
         
         return {
-            'total_interactions': len(self.interaction_database),
-            'high_severity': severities.get('High', 0),
-            'moderate_severity': severities.get('Moderate', 0),
-            'low_severity': severities.get('Low', 0)
+            'total_interactions': len(self.interactions),
+            'high_severity': severities[SEVERITY_CODES['High']],
+            'moderate_severity': severities[SEVERITY_CODES['Moderate']],
+            'low_severity': severities[SEVERITY_CODES['Low']],
+            'class_rule_pairs': self.class_rule_pairs,
+            'mechanism_pairs': self.mechanism_pairs,
+            'multi_drug_rules': len(self.multi_drug_rules)
         }
     
     def _get_side_effects(self, drug: str) -> List[str]:
@@ -182,7 +571,7 @@ class DrugInteractionChecker:
             'spironolactone': ['Hyperkalemia', 'Gynecomastia', 'Menstrual irregularities'],
             'clarithromycin': ['GI upset', 'QT prolongation', 'Drug interactions']
         }
-        return side_effects.get(drug.lower(), ['Contact healthcare provider'])
+        return side_effects.get(self.resolver.canonical_key(drug), ['Contact healthcare provider'])
     
     def _get_contraindications(self, drug: str) -> List[str]:
         """Get contraindications"""
@@ -198,4 +587,4 @@ class DrugInteractionChecker:
             'spironolactone': ['Hyperkalemia', 'Severe renal impairment', 'Addison disease'],
             'clarithromycin': ['Hypersensitivity', 'Severe hepatic impairment', 'QT prolongation']
         }
-        return contraindications.get(drug.lower(), ['Consult healthcare provider'])
+        return contraindications.get(self.resolver.canonical_key(drug), ['Consult healthcare provider'])
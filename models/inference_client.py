@@ -0,0 +1,129 @@
+"""
+Inference Client
+Shared HTTP client for the Hugging Face Inference API: pooled keep-alive connections,
+per-endpoint timeouts, jittered exponential backoff and bounded concurrency
+"""
+
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# (connect, read) seconds; the read timeout bounds each wait for the model
+DEFAULT_TIMEOUT = (3.05, 10.0)
+
+# Requests in flight at once across every session of the server process
+MAX_CONCURRENCY = 8
+
+# Extra attempts after the first for retryable failures
+MAX_RETRIES = 2
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 8.0
+
+# Rate limited, or the model is loading / the gateway is overloaded
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+Timeout = Union[float, Tuple[float, float]]
+
+
+class InferenceClient:
+    """One requests.Session shared by every model call.
+
+    The session keeps TLS connections to the inference host alive between
+    calls, so only the first call pays for the handshake. A semaphore caps
+    the calls in flight; connection errors and retryable statuses are
+    retried with full-jitter exponential backoff (honouring Retry-After),
+    while read timeouts are not, so a slow model costs one timeout at most.
+    """
+
+    def __init__(self, token: Optional[str] = None, max_concurrency: int = MAX_CONCURRENCY,
+                 max_retries: int = MAX_RETRIES, default_timeout: Timeout = DEFAULT_TIMEOUT):
+        self.token = os.getenv("HUGGINGFACE_API_KEY", "") if token is None else token
+        self.max_retries = max_retries
+        self.default_timeout = default_timeout
+
+        self._session = requests.Session()
+        self._session.headers["Authorization"] = f"Bearer {self.token}"
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_concurrency)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+
+        self._stats_lock = threading.Lock()
+        self._stats = {'requests': 0, 'retries': 0, 'failures': 0}
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def _backoff(self, attempt: int, response: Optional[requests.Response]) -> float:
+        """Seconds to wait before the next attempt"""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                return min(float(retry_after), BACKOFF_CAP)
+        return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+    def post(self, url: str, json: Any = None, data: Optional[bytes] = None,
+             timeout: Optional[Timeout] = None) -> requests.Response:
+        """POST to a model endpoint, retrying transient failures.
+
+        Callers pass the timeout suited to their endpoint. Returns the last
+        response, which may still carry an error status; raises
+        requests.RequestException when no response was received.
+        """
+        if timeout is None:
+            timeout = self.default_timeout
+        # Waiting for a free slot counts against the read timeout
+        slot_timeout = timeout[1] if isinstance(timeout, tuple) else timeout
+
+        attempt = 0
+        while True:
+            if not self._slots.acquire(timeout=slot_timeout):
+                self._count('failures')
+                raise requests.Timeout(f"No free inference slot within {slot_timeout}s")
+            response = None
+            try:
+                self._count('requests')
+                response = self._session.post(url, json=json, data=data, timeout=timeout)
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+            except requests.ConnectionError:
+                # Includes connect timeouts; read timeouts propagate unretried
+                if attempt >= self.max_retries:
+                    self._count('failures')
+                    raise
+            except requests.RequestException:
+                self._count('failures')
+                raise
+            finally:
+                self._slots.release()
+
+            if response is not None:
+                # Hands the connection back to the pool before waiting
+                response.close()
+            time.sleep(self._backoff(attempt, response))
+            attempt += 1
+            self._count('retries')
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self._stats)
+
+
+_client: Optional[InferenceClient] = None
+_client_lock = threading.Lock()
+
+
+def get_inference_client() -> InferenceClient:
+    """Get the process-wide inference client, creating it on first use"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = InferenceClient()
+    return _client
@@ -0,0 +1,570 @@
+"""
+Interaction Store
+Undirected drug-interaction adjacency keyed by integer drug ID
+"""
+
+from array import array
+from collections.abc import Mapping
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+# Severity labels in increasing order; codes are their positions
+SEVERITY_LEVELS = ('Low', 'Moderate', 'High')
+SEVERITY_CODES = {severity: code for code, severity in enumerate(SEVERITY_LEVELS)}
+SEVERITY_LOW, SEVERITY_MODERATE, SEVERITY_HIGH = range(len(SEVERITY_LEVELS))
+
+# Labels used by other interaction sources
+_SEVERITY_ALIASES = {
+    'Minor': SEVERITY_LOW,
+    'Mild': SEVERITY_LOW,
+    'Medium': SEVERITY_MODERATE,
+    'Major': SEVERITY_HIGH,
+    'Severe': SEVERITY_HIGH,
+    'Contraindicated': SEVERITY_HIGH
+}
+
+
+def severity_code(severity: str) -> int:
+    """Get the code for a severity label; unknown labels count as Moderate"""
+    label = str(severity).strip().title()
+    code = SEVERITY_CODES.get(label)
+    if code is None:
+        code = _SEVERITY_ALIASES.get(label, SEVERITY_MODERATE)
+    return code
+
+
+class InteractionRecord(NamedTuple):
+    """One stored interaction; drug keys keep the order they were added in"""
+    drug1: str
+    drug2: str
+    severity_code: int
+    description: str
+    recommendation: str
+
+    @property
+    def severity(self) -> str:
+        return SEVERITY_LEVELS[self.severity_code]
+
+    def to_dict(self) -> Dict[str, str]:
+        """Convert to the interaction dict format used by the pages"""
+        return {
+            'severity': self.severity,
+            'description': self.description,
+            'recommendation': self.recommendation
+        }
+
+
+class BatchInteractions(NamedTuple):
+    """Interacting pairs found across many regimens, as parallel arrays.
+
+    Rows are ordered by regimen and then by drug positions, like the
+    results of check_interactions for each regimen in turn.
+    """
+    regimen: np.ndarray
+    position1: np.ndarray
+    position2: np.ndarray
+    drug1_id: np.ndarray
+    drug2_id: np.ndarray
+    severity_code: np.ndarray
+
+
+def pair_keys(drug1_ids: np.ndarray, drug2_ids: np.ndarray) -> np.ndarray:
+    """Encode unordered drug ID pairs as int64 keys (low ID in the high bits)"""
+    drug1_ids = drug1_ids.astype(np.int64)
+    drug2_ids = drug2_ids.astype(np.int64)
+    return (np.minimum(drug1_ids, drug2_ids) << 32) | np.maximum(drug1_ids, drug2_ids)
+
+
+# Multiplier of the Fibonacci hash behind the pair key filter
+_KEY_HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+# Filter bits per stored pair; about 1 in 64 absent pairs passes the filter
+_FILTER_BITS_PER_KEY = 64
+
+
+class PairTable(NamedTuple):
+    """Sorted pair keys with their severity codes, and a bitset over the key hashes.
+
+    Most candidate pairs of a regimen do not interact; the filter rules
+    them out with one bit probe, so only the few that pass are looked up
+    in the sorted keys.
+    """
+    keys: np.ndarray
+    codes: np.ndarray
+    key_filter: np.ndarray
+    filter_shift: int
+
+    @classmethod
+    def build(cls, keys: np.ndarray, codes: np.ndarray) -> 'PairTable':
+        filter_shift = 64 - max(6, int(len(keys) * _FILTER_BITS_PER_KEY).bit_length())
+        flags = np.zeros(1 << (64 - filter_shift), dtype=bool)
+        flags[_key_hashes(keys, filter_shift)] = True
+        return cls(keys, codes, np.packbits(flags, bitorder='little').view('<u8'), filter_shift)
+
+    def might_contain(self, candidate_keys: np.ndarray) -> np.ndarray:
+        """Mask of the candidate keys that may be in the table; never False for a stored key"""
+        hashes = _key_hashes(candidate_keys, self.filter_shift)
+        return ((self.key_filter[hashes >> np.uint64(6)] >> (hashes & np.uint64(63))) & np.uint64(1)).astype(bool)
+
+
+def _key_hashes(keys: np.ndarray, shift: int) -> np.ndarray:
+    """Fibonacci hashes of pair keys, keeping the top 64 - shift bits"""
+    return (keys.astype(np.uint64) * _KEY_HASH_MULTIPLIER) >> np.uint64(shift)
+
+
+def encode_regimens(regimens: Sequence[Sequence[Optional[int]]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Encode regimens as a sparse regimen x drug incidence list.
+
+    Returns the drug IDs of every regimen concatenated (-1 for unresolved
+    names) and the length of each regimen.
+    """
+    lengths = np.fromiter(map(len, regimens), dtype=np.int64, count=len(regimens))
+    drug_ids = np.array([-1 if drug_id is None else drug_id for regimen in regimens for drug_id in regimen],
+                        dtype=np.int64)
+    return drug_ids, lengths
+
+
+def screen_regimens(pair_table: PairTable, drug_ids: np.ndarray, lengths: np.ndarray) -> BatchInteractions:
+    """Find every interacting pair in many encoded regimens with array operations.
+
+    Every within-regimen pair of the incidence list is generated at once;
+    the pair table's filter drops most of those that do not interact, and
+    the rest are joined against its sorted pair keys.
+    """
+    keys, codes = pair_table.keys, pair_table.codes
+    regimen_index = np.repeat(np.arange(len(lengths), dtype=np.int64), lengths)
+    positions = np.arange(len(drug_ids), dtype=np.int64) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+
+    # Drop unresolved names; entries stay grouped by regimen in position order
+    known = drug_ids >= 0
+    drug_ids, regimen_index, positions = drug_ids[known], regimen_index[known], positions[known]
+    known_lengths = np.bincount(regimen_index, minlength=len(lengths))
+    remaining = np.repeat(known_lengths, known_lengths) - 1 - (
+        np.arange(len(drug_ids)) - np.repeat(np.cumsum(known_lengths) - known_lengths, known_lengths))
+
+    # Every entry paired with each later entry of its regimen
+    left = np.repeat(np.arange(len(drug_ids)), remaining)
+    right = left + 1 + np.arange(len(left)) - np.repeat(np.cumsum(remaining) - remaining, remaining)
+
+    if len(keys) and len(left):
+        candidate_keys = pair_keys(drug_ids[left], drug_ids[right])
+        # Candidates keep regimen and position order throughout
+        hits = np.flatnonzero(pair_table.might_contain(candidate_keys))
+        candidate_keys = candidate_keys[hits]
+        matched = np.minimum(np.searchsorted(keys, candidate_keys), len(keys) - 1)
+        found = keys[matched] == candidate_keys
+        hits, matched = hits[found], matched[found]
+        left, right = left[hits], right[hits]
+    else:
+        left = right = matched = np.empty(0, dtype=np.int64)
+
+    return BatchInteractions(
+        regimen_index[left].astype(np.int32), positions[left].astype(np.int32), positions[right].astype(np.int32),
+        drug_ids[left].astype(np.int32), drug_ids[right].astype(np.int32), codes[matched]
+    )
+
+
+def _bucket_by_severity(neighbors: Iterable[Tuple[int, int]]) -> Tuple[FrozenSet[int], ...]:
+    """Group (other drug ID, severity code) entries into one set per severity code"""
+    buckets: List[Set[int]] = [set() for _ in SEVERITY_LEVELS]
+    for other_id, code in neighbors:
+        buckets[code].add(other_id)
+    return tuple(frozenset(bucket) for bucket in buckets)
+
+
+class AdjacencyInteractionStore:
+    """Interactions stored once per unordered drug pair as an adjacency map.
+
+    Each drug ID maps to its interacting drug IDs; both directions share the
+    same record. Checking a regimen intersects every drug's neighbours with
+    the regimen, so the cost is O(k * min(degree, k)) for k drugs instead of
+    probing all k^2 pairs.
+    """
+
+    def __init__(self):
+        self._neighbors: Dict[int, Dict[int, InteractionRecord]] = {}
+        self._count = 0
+        self._pair_table: Optional[PairTable] = None
+        self._buckets: Dict[int, Tuple[FrozenSet[int], ...]] = {}
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[InteractionRecord]:
+        """Iterate over every stored interaction once"""
+        for drug_id, neighbors in self._neighbors.items():
+            for other_id, record in neighbors.items():
+                if drug_id <= other_id:
+                    yield record
+
+    def iter_pairs(self) -> Iterator[Tuple[int, int, InteractionRecord]]:
+        """Iterate over (drug1_id, drug2_id, record) for every stored interaction once"""
+        for drug_id, neighbors in self._neighbors.items():
+            for other_id, record in neighbors.items():
+                if drug_id <= other_id:
+                    yield drug_id, other_id, record
+
+    def put(self, drug1_id: int, drug2_id: int, record: InteractionRecord) -> Optional[InteractionRecord]:
+        """Store the interaction for a drug pair, returning the record it replaced"""
+        previous = self._neighbors.setdefault(drug1_id, {}).get(drug2_id)
+        self._neighbors[drug1_id][drug2_id] = record
+        self._neighbors.setdefault(drug2_id, {})[drug1_id] = record
+        if previous is None:
+            self._count += 1
+        self._pair_table = None
+        self._buckets.pop(drug1_id, None)
+        self._buckets.pop(drug2_id, None)
+        return previous
+
+    def get(self, drug1_id: int, drug2_id: int) -> Optional[InteractionRecord]:
+        """Get the interaction between two drugs in either order"""
+        neighbors = self._neighbors.get(drug1_id)
+        return neighbors.get(drug2_id) if neighbors is not None else None
+
+    def neighbors(self, drug_id: int) -> Dict[int, InteractionRecord]:
+        """Get the interacting drugs of a drug (read-only)"""
+        return self._neighbors.get(drug_id, {})
+
+    def degree(self, drug_id: int) -> int:
+        return len(self._neighbors.get(drug_id, ()))
+
+    def severity_buckets(self, drug_id: int) -> Tuple[FrozenSet[int], ...]:
+        """Get the interacting drug IDs of a drug per severity code, cached until the drug changes"""
+        buckets = self._buckets.get(drug_id)
+        if buckets is None:
+            buckets = self._buckets[drug_id] = _bucket_by_severity(
+                (other_id, record.severity_code) for other_id, record in self._neighbors.get(drug_id, {}).items()
+            )
+        return buckets
+
+    def find_in_regimen(self, drug_ids: Sequence[Optional[int]]) -> List[Tuple[int, int, InteractionRecord]]:
+        """Find every interacting pair in a regimen.
+
+        Returns (position, other_position, record) tuples with position <
+        other_position, in the order of a pairwise scan. Positions holding
+        None (unresolved names) are skipped.
+        """
+        positions: Dict[int, List[int]] = {}
+        for position, drug_id in enumerate(drug_ids):
+            if drug_id is not None:
+                positions.setdefault(drug_id, []).append(position)
+
+        results = []
+        for position, drug_id in enumerate(drug_ids):
+            neighbors = self._neighbors.get(drug_id) if drug_id is not None else None
+            if not neighbors:
+                continue
+            # Walk whichever side is smaller
+            if len(neighbors) < len(positions):
+                matches = [other_id for other_id in neighbors if other_id in positions]
+            else:
+                matches = [other_id for other_id in positions if other_id in neighbors]
+            for other_id in matches:
+                record = neighbors[other_id]
+                for other_position in positions[other_id]:
+                    if other_position > position:
+                        results.append((position, other_position, record))
+
+        results.sort(key=lambda result: (result[0], result[1]))
+        return results
+
+    def pair_table(self) -> PairTable:
+        """Sorted pair keys and their severity codes, cached until the next put"""
+        pair_table = self._pair_table
+        if pair_table is None:
+            drug1_ids, drug2_ids, codes = array('q'), array('q'), array('B')
+            for drug_id, neighbors in self._neighbors.items():
+                for other_id, record in neighbors.items():
+                    if drug_id < other_id:
+                        drug1_ids.append(drug_id)
+                        drug2_ids.append(other_id)
+                        codes.append(record.severity_code)
+            codes = np.frombuffer(codes, dtype=np.uint8)
+            keys = pair_keys(np.frombuffer(drug1_ids, dtype=np.int64), np.frombuffer(drug2_ids, dtype=np.int64))
+            order = np.argsort(keys)
+            pair_table = self._pair_table = PairTable.build(keys[order], codes[order])
+        return pair_table
+
+    def find_in_regimens(self, regimens: Sequence[Sequence[Optional[int]]]) -> BatchInteractions:
+        """Find the interacting pairs of many regimens at once"""
+        return screen_regimens(self.pair_table(), *encode_regimens(regimens))
+
+    def severity_counts(self) -> List[int]:
+        """Count interactions per severity code"""
+        counts = [0] * len(SEVERITY_LEVELS)
+        for record in self:
+            counts[record.severity_code] += 1
+        return counts
+
+
+class InteractionDatabaseView(Mapping):
+    """Read-only view of an interaction store as the original interaction dict.
+
+    Keys are (drug1, drug2) tuples in the order the interaction was added;
+    values are severity/description/recommendation dicts.
+    """
+
+    def __init__(self, store, drug_id: Callable[[str], Optional[int]]):
+        self._store = store
+        self._drug_id = drug_id
+
+    def __getitem__(self, key: Tuple[str, str]) -> Dict[str, str]:
+        drug1, drug2 = key
+        drug1_id, drug2_id = self._drug_id(drug1), self._drug_id(drug2)
+        record = self._store.get(drug1_id, drug2_id) if drug1_id is not None and drug2_id is not None else None
+        if record is None or (record.drug1, record.drug2) != (drug1, drug2):
+            raise KeyError(key)
+        return record.to_dict()
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        for record in self._store:
+            yield record.drug1, record.drug2
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+
+class CSRInteractionStore:
+    """Read-optimized interaction store in compressed sparse row form.
+
+    Both directions of every pair are kept as sorted int32 neighbour arrays
+    indexed by drug ID; per-pair severity codes are uint8 and descriptions
+    and recommendations are indexes into a shared, deduplicated string
+    table. Records are only materialized on lookup. Interactions put after
+    the build go to a small AdjacencyInteractionStore overlay that shadows
+    the compressed pairs, so the store has the same API as the adjacency
+    store.
+    """
+
+    def __init__(self, drug_key: Callable[[int], str]):
+        self._drug_key = drug_key
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._indices = np.empty(0, dtype=np.int32)
+        self._entry_pairs = np.empty(0, dtype=np.int32)
+        # Per pair: drug IDs in their stored order, severity and string indexes
+        self._pair_drugs = np.empty((0, 2), dtype=np.int32)
+        self._severity = np.empty(0, dtype=np.uint8)
+        self._description = np.empty(0, dtype=np.int32)
+        self._recommendation = np.empty(0, dtype=np.int32)
+        self._strings: List[str] = []
+        self._overlay = AdjacencyInteractionStore()
+        self._shadowed = 0
+        self._pair_table: Optional[PairTable] = None
+        self._buckets: Dict[int, Tuple[FrozenSet[int], ...]] = {}
+
+    @classmethod
+    def build(cls, drug_key: Callable[[int], str],
+              rows: Iterable[Tuple[int, int, int, str, str]]) -> 'CSRInteractionStore':
+        """Build a store from (drug1_id, drug2_id, severity_code, description, recommendation) rows.
+
+        A pair given more than once keeps its last row.
+        """
+        store = cls(drug_key)
+        string_ids: Dict[str, int] = {}
+        drug1_ids = array('i')
+        drug2_ids = array('i')
+        severities = array('B')
+        descriptions = array('i')
+        recommendations = array('i')
+        for drug1_id, drug2_id, code, description, recommendation in rows:
+            drug1_ids.append(drug1_id)
+            drug2_ids.append(drug2_id)
+            severities.append(code)
+            descriptions.append(string_ids.setdefault(description, len(string_ids)))
+            recommendations.append(string_ids.setdefault(recommendation, len(string_ids)))
+        store._strings = list(string_ids)
+
+        drug1 = np.frombuffer(drug1_ids, dtype=np.int32)
+        drug2 = np.frombuffer(drug2_ids, dtype=np.int32)
+        if not len(drug1):
+            return store
+
+        # Keep the last row of every unordered pair
+        low = np.minimum(drug1, drug2).astype(np.int64)
+        high = np.maximum(drug1, drug2).astype(np.int64)
+        keys = (low << 32) | high
+        _, last_from_end = np.unique(keys[::-1], return_index=True)
+        keep = len(keys) - 1 - last_from_end
+        pair_count = len(keep)
+
+        store._pair_drugs = np.stack((drug1[keep], drug2[keep]), axis=1)
+        store._severity = np.frombuffer(severities, dtype=np.uint8)[keep].copy()
+        store._description = np.frombuffer(descriptions, dtype=np.int32)[keep].copy()
+        store._recommendation = np.frombuffer(recommendations, dtype=np.int32)[keep].copy()
+
+        # Both directions, sorted by (drug, neighbour)
+        source = np.concatenate((low[keep], high[keep]))
+        target = np.concatenate((high[keep], low[keep]))
+        pairs = np.concatenate((np.arange(pair_count), np.arange(pair_count)))
+        order = np.lexsort((target, source))
+        drug_count = int(source.max()) + 1
+        store._indices = target[order].astype(np.int32)
+        store._entry_pairs = pairs[order].astype(np.int32)
+        store._indptr = np.zeros(drug_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(source, minlength=drug_count), out=store._indptr[1:])
+        return store
+
+    def _record(self, pair: int) -> InteractionRecord:
+        drug1_id, drug2_id = self._pair_drugs[pair].tolist()
+        return InteractionRecord(
+            self._drug_key(drug1_id), self._drug_key(drug2_id), int(self._severity[pair]),
+            self._strings[self._description[pair]], self._strings[self._recommendation[pair]]
+        )
+
+    def _row(self, drug_id: int) -> Tuple[int, int]:
+        if drug_id < 0 or drug_id + 1 >= len(self._indptr):
+            return 0, 0
+        return int(self._indptr[drug_id]), int(self._indptr[drug_id + 1])
+
+    def _base_pair(self, drug1_id: int, drug2_id: int) -> Optional[int]:
+        """Get the compressed pair index for two drugs, if any"""
+        start, end = self._row(drug1_id)
+        if start == end:
+            return None
+        position = start + int(np.searchsorted(self._indices[start:end], drug2_id))
+        if position < end and self._indices[position] == drug2_id:
+            return int(self._entry_pairs[position])
+        return None
+
+    def __len__(self) -> int:
+        return len(self._severity) + len(self._overlay) - self._shadowed
+
+    def __iter__(self) -> Iterator[InteractionRecord]:
+        for pair, (drug1_id, drug2_id) in enumerate(self._pair_drugs.tolist()):
+            if self._overlay.get(drug1_id, drug2_id) is None:
+                yield self._record(pair)
+        yield from self._overlay
+
+    def put(self, drug1_id: int, drug2_id: int, record: InteractionRecord) -> Optional[InteractionRecord]:
+        """Store the interaction for a drug pair in the overlay, returning the record it replaced"""
+        previous = self._overlay.put(drug1_id, drug2_id, record)
+        if previous is None:
+            pair = self._base_pair(drug1_id, drug2_id)
+            if pair is not None:
+                self._shadowed += 1
+                previous = self._record(pair)
+        self._pair_table = None
+        self._buckets.pop(drug1_id, None)
+        self._buckets.pop(drug2_id, None)
+        return previous
+
+    def get(self, drug1_id: int, drug2_id: int) -> Optional[InteractionRecord]:
+        """Get the interaction between two drugs in either order"""
+        record = self._overlay.get(drug1_id, drug2_id)
+        if record is not None:
+            return record
+        pair = self._base_pair(drug1_id, drug2_id)
+        return self._record(pair) if pair is not None else None
+
+    def neighbors(self, drug_id: int) -> Dict[int, InteractionRecord]:
+        """Get the interacting drugs of a drug (materialized)"""
+        start, end = self._row(drug_id)
+        neighbors = {
+            other_id: self._record(pair)
+            for other_id, pair in zip(self._indices[start:end].tolist(), self._entry_pairs[start:end].tolist())
+        }
+        neighbors.update(self._overlay.neighbors(drug_id))
+        return neighbors
+
+    def degree(self, drug_id: int) -> int:
+        start, end = self._row(drug_id)
+        overlay_only = sum(1 for other_id in self._overlay.neighbors(drug_id)
+                           if self._base_pair(drug_id, other_id) is None)
+        return end - start + overlay_only
+
+    def severity_buckets(self, drug_id: int) -> Tuple[FrozenSet[int], ...]:
+        """Get the interacting drug IDs of a drug per severity code, cached until the drug changes"""
+        buckets = self._buckets.get(drug_id)
+        if buckets is None:
+            start, end = self._row(drug_id)
+            neighbors = dict(zip(self._indices[start:end].tolist(),
+                                 self._severity[self._entry_pairs[start:end]].tolist()))
+            for other_id, record in self._overlay.neighbors(drug_id).items():
+                neighbors[other_id] = record.severity_code
+            buckets = self._buckets[drug_id] = _bucket_by_severity(neighbors.items())
+        return buckets
+
+    def find_in_regimen(self, drug_ids: Sequence[Optional[int]]) -> List[Tuple[int, int, InteractionRecord]]:
+        """Find every interacting pair in a regimen (same contract as AdjacencyInteractionStore)"""
+        positions: Dict[int, List[int]] = {}
+        for position, drug_id in enumerate(drug_ids):
+            if drug_id is not None:
+                positions.setdefault(drug_id, []).append(position)
+        found = {}
+        regimen = np.array(sorted(positions), dtype=np.int64)
+        regimen = regimen[(regimen >= 0) & (regimen < len(self._indptr) - 1)]
+        if len(regimen) > 1:
+            # Gather the neighbour rows of every regimen drug and keep the
+            # entries pointing back into the regimen, each pair once
+            starts = self._indptr[regimen]
+            lengths = self._indptr[regimen + 1] - starts
+            offsets = np.arange(int(lengths.sum())) + np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+            sources = np.repeat(regimen, lengths)
+            targets = self._indices[offsets]
+            matched = np.minimum(np.searchsorted(regimen, targets), len(regimen) - 1)
+            hits = (regimen[matched] == targets) & (sources < targets)
+            for drug_id, other_id, pair in zip(sources[hits].tolist(), targets[hits].tolist(),
+                                                self._entry_pairs[offsets[hits]].tolist()):
+                found[drug_id, other_id] = pair
+        for drug_id in positions:
+            for other_id in self._overlay.neighbors(drug_id):
+                if drug_id < other_id and other_id in positions:
+                    found[drug_id, other_id] = None
+
+        results = []
+        for (drug_id, other_id), pair in found.items():
+            record = self._overlay.get(drug_id, other_id) if pair is None or len(self._overlay) else None
+            if record is None:
+                record = self._record(pair)
+            for position in positions[drug_id]:
+                for other_position in positions[other_id]:
+                    if position < other_position:
+                        results.append((position, other_position, record))
+                    else:
+                        results.append((other_position, position, record))
+
+        results.sort(key=lambda result: (result[0], result[1]))
+        return results
+
+    def pair_table(self) -> PairTable:
+        """Sorted pair keys and their severity codes, cached until the next put"""
+        pair_table = self._pair_table
+        if pair_table is None:
+            # Packed pairs are already in key order
+            keys = pair_keys(self._pair_drugs[:, 0], self._pair_drugs[:, 1])
+            codes = self._severity
+            if len(self._overlay):
+                overlay = self._overlay.pair_table()
+                keys = np.concatenate((keys, overlay.keys))
+                codes = np.concatenate((codes, overlay.codes))
+                # Overlay pairs come last and win over packed ones
+                keys, last_from_end = np.unique(keys[::-1], return_index=True)
+                codes = codes[len(codes) - 1 - last_from_end]
+            pair_table = self._pair_table = PairTable.build(keys, codes)
+        return pair_table
+
+    def find_in_regimens(self, regimens: Sequence[Sequence[Optional[int]]]) -> BatchInteractions:
+        """Find the interacting pairs of many regimens at once"""
+        return screen_regimens(self.pair_table(), *encode_regimens(regimens))
+
+    def severity_counts(self) -> List[int]:
+        """Count interactions per severity code"""
+        counts = np.bincount(self._severity, minlength=len(SEVERITY_LEVELS)).tolist()
+        for drug1_id, drug2_id, record in self._overlay.iter_pairs():
+            pair = self._base_pair(drug1_id, drug2_id)
+            if pair is not None:
+                counts[int(self._severity[pair])] -= 1
+            counts[record.severity_code] += 1
+        return counts
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'pairs': len(self),
+            'drugs': len(self._indptr) - 1,
+            'strings': len(self._strings),
+            'overlay_pairs': len(self._overlay),
+            'array_bytes': sum(values.nbytes for values in (
+                self._indptr, self._indices, self._entry_pairs, self._pair_drugs,
+                self._severity, self._description, self._recommendation))
+        }
@@ -0,0 +1,103 @@
+"""
+Mechanism Inference
+Derives candidate drug interactions from enzyme and transporter roles
+"""
+
+from typing import Callable, Dict, Iterable, List, Mapping, NamedTuple, Tuple
+
+from models.interaction_store import SEVERITY_HIGH, SEVERITY_MODERATE
+
+ENZYME_ROLES = ('substrate', 'inhibitor', 'strong_inhibitor', 'inducer')
+
+# Perpetrator role -> (severity, verb, effect on the victim drug)
+PERPETRATOR_EFFECTS = {
+    'strong_inhibitor': (SEVERITY_HIGH, 'strongly inhibits', 'raising {victim} exposure'),
+    'inhibitor': (SEVERITY_MODERATE, 'inhibits', 'raising {victim} exposure'),
+    'inducer': (SEVERITY_MODERATE, 'induces', 'lowering {victim} exposure')
+}
+
+
+class Mechanism(NamedTuple):
+    """One enzyme-level reason two drugs interact"""
+    perpetrator_id: int
+    victim_id: int
+    enzyme: str
+    role: str
+
+
+class InferredInteraction(NamedTuple):
+    """Candidate interaction for a drug pair, perpetrator first, and the mechanisms behind it"""
+    drug1_id: int
+    drug2_id: int
+    severity_code: int
+    mechanisms: Tuple[Mechanism, ...]
+
+    def describe(self, drug_name: Callable[[int], str]) -> Tuple[str, str]:
+        """Build the (description, recommendation) texts"""
+        reasons = []
+        advice = []
+        for mechanism in self.mechanisms:
+            _, verb, effect = PERPETRATOR_EFFECTS[mechanism.role]
+            victim = drug_name(mechanism.victim_id)
+            reasons.append(f"{drug_name(mechanism.perpetrator_id)} {verb} {mechanism.enzyme}, "
+                           f"{effect.format(victim=victim)}")
+            if mechanism.role == 'inducer':
+                advice.append(f"monitor for reduced {victim} efficacy")
+            else:
+                advice.append(f"monitor for increased {victim} effects")
+        description = "Predicted from enzyme profiles: " + "; ".join(reasons)
+        recommendation = ("Verify clinical significance; " + ", ".join(dict.fromkeys(advice))
+                          + " and consider dose adjustment or an alternative")
+        return description, recommendation
+
+
+class EnzymeRoleIndex:
+    """Posting lists of drug IDs per enzyme and role.
+
+    Inference joins each enzyme's perpetrator postings (inhibitors and
+    inducers) with its substrate postings, so the cost is the sum over
+    enzymes of perpetrators x substrates - the number of candidate pairs -
+    rather than comparing the profiles of all N^2 drug pairs.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[str, List[int]]] = {}
+
+    def add(self, drug_id: int, enzyme_roles: Mapping[str, Iterable[str]]) -> None:
+        """Index a drug's {enzyme: [roles]} profile; unknown roles are ignored"""
+        for enzyme, roles in enzyme_roles.items():
+            for role in roles:
+                if role in ENZYME_ROLES:
+                    self._postings.setdefault(enzyme, {}).setdefault(role, []).append(drug_id)
+
+    def infer(self) -> Dict[Tuple[int, int], InferredInteraction]:
+        """Derive candidate interactions keyed by (low drug ID, high drug ID).
+
+        Mechanisms are listed in the order the enzymes and drugs were added.
+        """
+        mechanisms: Dict[Tuple[int, int], List[Mechanism]] = {}
+        for enzyme, postings in self._postings.items():
+            victims = postings.get('substrate')
+            if not victims:
+                continue
+            for role in PERPETRATOR_EFFECTS:
+                for perpetrator_id in postings.get(role, ()):
+                    for victim_id in victims:
+                        if victim_id == perpetrator_id:
+                            continue
+                        pair = (perpetrator_id, victim_id) if perpetrator_id < victim_id else (victim_id, perpetrator_id)
+                        mechanisms.setdefault(pair, []).append(Mechanism(perpetrator_id, victim_id, enzyme, role))
+
+        inferred = {}
+        for pair, pair_mechanisms in mechanisms.items():
+            severity = max(PERPETRATOR_EFFECTS[mechanism.role][0] for mechanism in pair_mechanisms)
+            # Name the perpetrator first so the orientation does not depend on drug IDs
+            first = pair_mechanisms[0]
+            inferred[pair] = InferredInteraction(first.perpetrator_id, first.victim_id, severity, tuple(pair_mechanisms))
+        return inferred
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'enzymes': len(self._postings),
+            'entries': sum(len(drugs) for postings in self._postings.values() for drugs in postings.values())
+        }
@@ -0,0 +1,108 @@
+"""
+Micro-Batcher
+Groups concurrent single-item requests to one endpoint into batched calls
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Items sent in one batched call at most
+DEFAULT_MAX_BATCH = 16
+
+# Seconds the first item of a batch waits for others to join it
+DEFAULT_MAX_WAIT = 0.005
+
+# Batched calls in flight at once
+DEFAULT_MAX_IN_FLIGHT = 8
+
+
+class MicroBatcher:
+    """Collects items submitted from many threads and sends them in batches.
+
+    submit() blocks its caller until the item's result is back. A collector
+    thread takes the first queued item, waits up to max_wait for up to
+    max_batch - 1 more, and hands the batch to a sender thread; send_batch
+    gets the items in order and must return one result per item. A batch
+    only starts forming once a sender is free, so under load items queue up
+    and batches fill without waiting. A failed call fails every item of its
+    batch. With max_batch <= 1 items are sent one at a time on the caller's
+    thread.
+    """
+
+    def __init__(self, send_batch: Callable[[List[Any]], Sequence[Any]],
+                 max_batch: int = DEFAULT_MAX_BATCH, max_wait: float = DEFAULT_MAX_WAIT,
+                 max_in_flight: int = DEFAULT_MAX_IN_FLIGHT, name: str = 'micro-batch'):
+        self.send_batch = send_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.name = name
+        self._queue: 'queue.Queue[Tuple[Any, Future]]' = queue.Queue()
+        self._slots = threading.Semaphore(max_in_flight)
+        self._senders = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix=name)
+        self._collector: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stats = {'items': 0, 'batches': 0, 'largest_batch': 0, 'failed_batches': 0}
+
+    def submit(self, item: Any, timeout: Optional[float] = None) -> Any:
+        """Send one item as part of a batch and return its result, or raise the batch's error"""
+        if self.max_batch <= 1:
+            self._count([item], failed=False)
+            return self.send_batch([item])[0]
+
+        if self._collector is None:
+            with self._lock:
+                if self._collector is None:
+                    self._collector = threading.Thread(target=self._collect, name=f"{self.name}-collector",
+                                                       daemon=True)
+                    self._collector.start()
+        future: Future = Future()
+        self._queue.put((item, future))
+        return future.result(timeout)
+
+    def _collect(self) -> None:
+        while True:
+            self._slots.acquire()
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._senders.submit(self._send, batch)
+
+    def _send(self, batch: List[Tuple[Any, Future]]) -> None:
+        try:
+            try:
+                results = self.send_batch([item for item, _ in batch])
+                if len(results) != len(batch):
+                    raise ValueError(f"Batched call returned {len(results)} results for {len(batch)} items")
+            except Exception as e:
+                self._count(batch, failed=True)
+                for _, future in batch:
+                    future.set_exception(e)
+                return
+            self._count(batch, failed=False)
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+        finally:
+            self._slots.release()
+
+    def _count(self, batch: Sequence[Any], failed: bool) -> None:
+        with self._lock:
+            self._stats['items'] += len(batch)
+            self._stats['batches'] += 1
+            self._stats['largest_batch'] = max(self._stats['largest_batch'], len(batch))
+            if failed:
+                self._stats['failed_batches'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+        stats['mean_batch'] = stats['items'] / stats['batches'] if stats['batches'] else 0.0
+        stats['queued'] = self._queue.qsize()
+        return stats
@@ -0,0 +1,87 @@
+"""
+Multi-Drug Rules
+Interaction rules that need three or more drugs, matched through an anchor index
+"""
+
+from itertools import combinations
+from typing import AbstractSet, Dict, FrozenSet, List, NamedTuple, Sequence, Tuple
+
+
+class MultiDrugRule(NamedTuple):
+    """Hazard raised when every requirement is met by distinct drugs of a regimen.
+
+    Each requirement is (member drug IDs, minimum count): a combination rule
+    such as ACE inhibitor + diuretic + NSAID has three requirements of one
+    drug each, while a threshold rule such as "3 or more QT-prolonging
+    drugs" has a single requirement with a minimum count of 3.
+    """
+    name: str
+    requirements: Tuple[Tuple[FrozenSet[int], int], ...]
+    severity_code: int
+    description: str
+    recommendation: str
+
+    def members(self) -> FrozenSet[int]:
+        return frozenset().union(*(members for members, _ in self.requirements))
+
+
+def _satisfied(requirements: Sequence[Tuple[FrozenSet[int], int]], present: AbstractSet[int],
+               used: FrozenSet[int] = frozenset()) -> bool:
+    """Check that every requirement can be met without counting a drug twice"""
+    if not requirements:
+        return True
+    (members, min_count), rest = requirements[0], requirements[1:]
+    available = sorted((members & present) - used)
+    for chosen in combinations(available, min_count):
+        if _satisfied(rest, present, used.union(chosen)):
+            return True
+    return False
+
+
+class MultiDrugRuleIndex:
+    """Rules indexed by the members of their rarest requirement.
+
+    A rule can only match if its requirement with the fewest member drugs
+    (the anchor) is met, so each rule is listed under the anchor members
+    only. A regimen check looks up its own drugs in that index and
+    evaluates just the rules anchored on one of them, instead of scanning
+    every rule.
+    """
+
+    def __init__(self):
+        self._rules: List[MultiDrugRule] = []
+        # anchor member drug ID -> positions of the rules it anchors
+        self._by_anchor: Dict[int, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def add(self, rule: MultiDrugRule) -> bool:
+        """Index a rule; returns False for rules no regimen can match"""
+        if not rule.requirements or any(len(members) < min_count for members, min_count in rule.requirements):
+            return False
+        position = len(self._rules)
+        self._rules.append(rule)
+        anchor, _ = min(rule.requirements, key=lambda requirement: len(requirement[0]))
+        for drug_id in anchor:
+            self._by_anchor.setdefault(drug_id, []).append(position)
+        return True
+
+    def match(self, drug_ids: AbstractSet[int]) -> List[Tuple[MultiDrugRule, List[int]]]:
+        """Find the rules a set of drug IDs meets, with the regimen drugs each one involves"""
+        positions = set()
+        for drug_id in drug_ids:
+            positions.update(self._by_anchor.get(drug_id, ()))
+
+        matches = []
+        for position in sorted(positions):
+            rule = self._rules[position]
+            if _satisfied(rule.requirements, drug_ids):
+                matches.append((rule, sorted(rule.members() & drug_ids)))
+        return matches
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'rules': len(self._rules),
+            'anchor_drugs': len(self._by_anchor)
+        }
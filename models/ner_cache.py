@@ -0,0 +1,235 @@
+"""
+NER Result Cache
+Content-addressed cache of NER model results: a bounded in-memory LRU in front of an
+optional SQLite file shared by every server process
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+# Results kept in memory per process
+DEFAULT_MAX_ENTRIES = 1024
+
+# Results older than this are treated as missing in both tiers
+DEFAULT_TTL = 7 * 24 * 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ner_results (
+    model TEXT NOT NULL,
+    text_hash TEXT NOT NULL,
+    entities TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    PRIMARY KEY (model, text_hash)
+);
+CREATE INDEX IF NOT EXISTS idx_ner_results_stored_at ON ner_results(stored_at);
+CREATE TABLE IF NOT EXISTS ner_model_versions (
+    model TEXT PRIMARY KEY,
+    version TEXT NOT NULL
+);
+"""
+
+Entities = List[Dict[str, Any]]
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form of a text for caching; models are sent this form so cached offsets match"""
+    return unicodedata.normalize('NFC', text).replace('\r\n', '\n').strip()
+
+
+# An ASCII character and the non-ASCII characters after it; canonical
+# composition never reaches across an ASCII character
+_NORMALIZATION_CLUSTER = re.compile(r'[\x00-\x7f][^\x00-\x7f]*|[^\x00-\x7f]+')
+
+
+def normalize_text_with_offsets(text: str) -> Tuple[str, List[int]]:
+    """Normalize a text like normalize_text, with the original offset of every normalized offset.
+
+    The offset list has one entry per normalized character plus one for the
+    end, so model offsets into the normalized text map back to the caller's.
+    Characters changed by composition map to the start of their cluster.
+    """
+    if text.isascii() and '\r' not in text:
+        normalized = text.strip()
+        lead = len(text) - len(text.lstrip())
+        return normalized, list(range(lead, lead + len(normalized) + 1))
+
+    parts = []
+    offsets: List[int] = []
+    for match in _NORMALIZATION_CLUSTER.finditer(text):
+        cluster = match.group()
+        if cluster == '\r' and text.startswith('\n', match.end()):
+            continue
+        composed = unicodedata.normalize('NFC', cluster)
+        parts.append(composed)
+        if composed == cluster:
+            offsets.extend(range(match.start(), match.end()))
+        else:
+            offsets.extend([match.start()] * len(composed))
+    offsets.append(len(text))
+
+    joined = ''.join(parts)
+    normalized = joined.strip()
+    lead = len(joined) - len(joined.lstrip())
+    return normalized, offsets[lead:lead + len(normalized) + 1]
+
+
+def text_hash(text: str) -> str:
+    """SHA-256 of the normalized text"""
+    return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+
+
+class NERCache:
+    """Two-tier cache from (model, text hash) to extracted entities.
+
+    Lookups try the per-process LRU first and then the SQLite file, which
+    every server process opens; disk hits are promoted into the LRU. Entries
+    expire after the TTL. Recording a new version for a model drops its
+    entries from both tiers, so results from an older model are never served.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 ttl: float = DEFAULT_TTL):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._entries: 'OrderedDict[Tuple[str, str], Tuple[Entities, float]]' = OrderedDict()
+        self._versions: Dict[str, str] = {}
+        self._stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'stores': 0, 'expired': 0}
+
+        self._conn = None
+        if path:
+            # Other processes may hold the write lock briefly; wait rather than fail
+            self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+            self._conn.execute("PRAGMA journal_mode = WAL")
+            with self._conn:
+                self._conn.executescript(_SCHEMA)
+                self._conn.execute("DELETE FROM ner_results WHERE stored_at < ?", (time.time() - ttl,))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def get(self, model: str, text: str) -> Optional[Entities]:
+        """Get the cached entities a model produced for a text, or None"""
+        key = (model, text_hash(text))
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry[1] < self.ttl:
+                    self._entries.move_to_end(key)
+                    self._stats['memory_hits'] += 1
+                    return [dict(entity) for entity in entry[0]]
+                del self._entries[key]
+                self._stats['expired'] += 1
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT entities, stored_at FROM ner_results WHERE model = ? AND text_hash = ? AND stored_at >= ?",
+                    (model, key[1], now - self.ttl)
+                ).fetchone()
+                if row is not None:
+                    entities = json.loads(row[0])
+                    self._remember(key, entities, row[1])
+                    self._stats['disk_hits'] += 1
+                    return [dict(entity) for entity in entities]
+
+            self._stats['misses'] += 1
+            return None
+
+    def _remember(self, key: Tuple[str, str], entities: Entities, stored_at: float) -> None:
+        """Add an entry to the LRU, evicting the least recently used (caller holds the lock)"""
+        self._entries[key] = (entities, stored_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def put(self, model: str, text: str, entities: Entities) -> None:
+        """Cache the entities a model produced for a text"""
+        key = (model, text_hash(text))
+        stored_at = time.time()
+        entities = [dict(entity) for entity in entities]
+        with self._lock:
+            self._remember(key, entities, stored_at)
+            self._stats['stores'] += 1
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO ner_results (model, text_hash, entities, stored_at) VALUES (?, ?, ?, ?)",
+                        (model, key[1], json.dumps(entities), stored_at)
+                    )
+
+    def invalidate(self, model: Optional[str] = None) -> None:
+        """Drop the cached results of one model, or of every model"""
+        with self._lock:
+            if model is None:
+                self._entries.clear()
+            else:
+                for key in [key for key in self._entries if key[0] == model]:
+                    del self._entries[key]
+            if self._conn is not None:
+                with self._conn:
+                    if model is None:
+                        self._conn.execute("DELETE FROM ner_results")
+                    else:
+                        self._conn.execute("DELETE FROM ner_results WHERE model = ?", (model,))
+
+    def set_model_version(self, model: str, version: str) -> bool:
+        """Record the version of a model, invalidating its results if the version changed.
+
+        Returns True when cached results were dropped.
+        """
+        with self._lock:
+            if self._versions.get(model) == version:
+                return False
+            previous = self._versions.get(model)
+            if self._conn is not None:
+                row = self._conn.execute("SELECT version FROM ner_model_versions WHERE model = ?",
+                                         (model,)).fetchone()
+                previous = row[0] if row else previous
+            self._versions[model] = version
+            # A model seen for the first time has nothing cached to drop
+            changed = previous is not None and previous != version
+            if changed:
+                self.invalidate(model)
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO ner_model_versions (model, version) VALUES (?, ?)", (model, version)
+                    )
+            return changed
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats['memory_entries'] = len(self._entries)
+            lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+            stats['hit_rate'] = (stats['memory_hits'] + stats['disk_hits']) / lookups if lookups else 0.0
+            if self._conn is not None:
+                stats['disk_entries'] = self._conn.execute("SELECT COUNT(*) FROM ner_results").fetchone()[0]
+            return stats
+
+
+_cache: Optional[NERCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_ner_cache() -> NERCache:
+    """Get the process-wide NER cache; NER_CACHE_PATH enables the shared SQLite tier"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = NERCache(os.getenv("NER_CACHE_PATH", "") or None)
+    return _cache
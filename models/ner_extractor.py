@@ -1,12 +1,71 @@
 import os
-import requests
-from typing import List, Dict, Any
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 import streamlit as st
+from data.drug_database import DrugDatabase
+from models.inference_client import MAX_CONCURRENCY, get_inference_client
+from models.micro_batcher import DEFAULT_MAX_BATCH, DEFAULT_MAX_WAIT, MicroBatcher
+from models.ner_cache import get_ner_cache, normalize_text_with_offsets
+
+# Overall time budget for the model calls of one analysis; models still
+# running past it are reported as timed out and pattern matching is used
+ANALYSIS_DEADLINE = 12.0
+
+# Shared by every session so concurrent analyses stay within the client's limit
+_model_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENCY, thread_name_prefix='ner-model')
+
+# Texts sent to one model in a single request, and how long a text waits for
+# others to join it; NER_MAX_BATCH=1 sends every text on its own
+NER_MAX_BATCH = int(os.getenv("NER_MAX_BATCH", str(DEFAULT_MAX_BATCH)))
+NER_MAX_WAIT = float(os.getenv("NER_MAX_WAIT_MS", str(DEFAULT_MAX_WAIT * 1000))) / 1000
+
+# Model URL -> batcher shared by every session
+_batchers: Dict[str, MicroBatcher] = {}
+_batchers_lock = threading.Lock()
+
+def _post_entity_batch(api_url: str, texts: List[str]) -> List[Any]:
+    """Send texts to a token classification model in one request; returns the raw entities per text"""
+    # A single text keeps the plain payload, whose response is one entity list
+    payload = {"inputs": texts[0] if len(texts) == 1 else texts}
+    response = get_inference_client().post(api_url, json=payload)
+    response.raise_for_status()
+    results = response.json()
+    if len(texts) == 1:
+        return [results]
+    if not isinstance(results, list) or len(results) != len(texts):
+        raise ValueError(f"Expected {len(texts)} entity lists from {api_url}")
+    return results
+
+def get_batcher(api_url: str) -> MicroBatcher:
+    """Get the process-wide micro-batcher for a model endpoint"""
+    batcher = _batchers.get(api_url)
+    if batcher is None:
+        with _batchers_lock:
+            batcher = _batchers.get(api_url)
+            if batcher is None:
+                batcher = _batchers[api_url] = MicroBatcher(
+                    lambda texts: _post_entity_batch(api_url, texts),
+                    max_batch=NER_MAX_BATCH, max_wait=NER_MAX_WAIT, max_in_flight=MAX_CONCURRENCY,
+                    name='ner-batch'
+                )
+    return batcher
+
+# Capitalized name followed by a strength, for drugs outside the catalog ("Zyxtra 20 mg")
+STRENGTH_MENTION_PATTERN = re.compile(r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)\s+\d+(?:\.\d+)?\s*(?:mg|mcg|g|ml)\b')
+
+DISEASE_PATTERNS = [
+    re.compile(r'\b(?:hypertension|diabetes|depression|anxiety|asthma|copd|arthritis|pneumonia|bronchitis|sinusitis|migraine|insomnia|gerd|ibs|uti|infection)\b', re.IGNORECASE),
+    re.compile(r'\b(?:high blood pressure|type 2 diabetes|heart failure|atrial fibrillation|coronary artery disease)\b', re.IGNORECASE)
+]
 
 class NERExtractor:
-    def __init__(self):
+    def __init__(self, drug_db: Optional[DrugDatabase] = None):
+        # Catalog used by the pattern-matching fallback; the shared knowledge
+        # base is used when none is given
+        self.drug_db = drug_db
         self.huggingface_token = os.getenv("HUGGINGFACE_API_KEY", "")
-        self.headers = {"Authorization": f"Bearer {self.huggingface_token}"}
         
         # Model URLs for different entity types
         self.models = {
@@ -14,80 +73,142 @@ class NERExtractor:
             'diseases': "https://api-inference.huggingface.co/models/OpenMed/OpenMed-NER-DiseaseDetect-SuperClinical-184M",
             'clinical': "https://api-inference.huggingface.co/models/Posos/ClinicalNER"
         }
+        
+        # Model results by (model, text hash); changing NER_MODEL_VERSION
+        # drops results cached from the previous models
+        self.cache = get_ner_cache()
+        model_version = os.getenv("NER_MODEL_VERSION", "")
+        for api_url in self.models.values():
+            self.cache.set_model_version(api_url, model_version)
     
     def extract_entities(self, text: str, entity_type: str = 'drugs') -> List[Dict[str, Any]]:
         """Extract entities from medical text using specified model"""
+        return self._extract_entities_with_status(text, entity_type)[0]
+    
+    def _extract_entities_with_status(self, text: str, entity_type: str) -> Tuple[List[Dict[str, Any]], str]:
+        """Extract entities, reporting whether the model ('model'), the result cache ('cache') or pattern matching ('fallback') produced them"""
         try:
             if not self.huggingface_token:
-                return self._extract_entities_fallback(text, entity_type)
+                return self._extract_entities_fallback(text, entity_type), 'fallback'
             
             if entity_type not in self.models:
-                return self._extract_entities_fallback(text, entity_type)
+                return self._extract_entities_fallback(text, entity_type), 'fallback'
             
             api_url = self.models[entity_type]
-            payload = {"inputs": text}
+            # Models see the normalized text so cached offsets match any equal text;
+            # offsets are mapped back to this text on the way out
+            normalized_text, offsets = normalize_text_with_offsets(text)
+            cached_entities = self.cache.get(api_url, text)
+            if cached_entities is not None:
+                return self._map_offsets(cached_entities, offsets), 'cache'
             
-            response = requests.post(api_url, headers=self.headers, json=payload, timeout=10)
+            # Concurrent texts for the same model share one request
+            entities = get_batcher(api_url).submit(normalized_text)
             
-            if response.status_code == 200:
-                entities = response.json()
-                if isinstance(entities, list) and entities:
-                    processed_entities = []
-                    
-                    for entity in entities:
-                        processed_entity = {
-                            'text': entity.get('word', ''),
-                            'label': entity.get('entity_group', entity.get('entity', '')),
-                            'confidence': entity.get('score', 0.0),
-                            'start': entity.get('start', 0),
-                            'end': entity.get('end', 0)
-                        }
-                        processed_entities.append(processed_entity)
-                    
-                    return processed_entities
-                else:
-                    return self._extract_entities_fallback(text, entity_type)
+            if isinstance(entities, list) and entities:
+                processed_entities = []
+                
+                for entity in entities:
+                    processed_entity = {
+                        'text': entity.get('word', ''),
+                        'label': entity.get('entity_group', entity.get('entity', '')),
+                        'confidence': entity.get('score', 0.0),
+                        'start': entity.get('start', 0),
+                        'end': entity.get('end', 0)
+                    }
+                    processed_entities.append(processed_entity)
+                
+                self.cache.put(api_url, text, processed_entities)
+                return self._map_offsets(processed_entities, offsets), 'model'
             else:
-                return self._extract_entities_fallback(text, entity_type)
+                return self._extract_entities_fallback(text, entity_type), 'fallback'
                 
         except Exception as e:
-            return self._extract_entities_fallback(text, entity_type)
+            return self._extract_entities_fallback(text, entity_type), 'fallback'
+    
+    def _map_offsets(self, entities: List[Dict[str, Any]], offsets: List[int]) -> List[Dict[str, Any]]:
+        """Map entity offsets from the normalized text the model saw to the original text"""
+        last = len(offsets) - 1
+        mapped = []
+        for entity in entities:
+            entity = dict(entity)
+            for key in ('start', 'end'):
+                if isinstance(entity.get(key), int):
+                    entity[key] = offsets[min(max(entity[key], 0), last)]
+            mapped.append(entity)
+        return mapped
+    
+    def extract_entities_concurrently(self, text: str, entity_types: Iterable[str],
+                                      deadline: float = ANALYSIS_DEADLINE
+                                      ) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, str]]:
+        """Query the models for several entity types at once, under one overall deadline.
+        
+        Returns the entities and a status per entity type: 'model', 'cache',
+        'fallback', or 'timeout' when the model missed the deadline and
+        pattern matching results were used instead.
+        """
+        entity_types = list(dict.fromkeys(entity_types))
+        if not self.huggingface_token:
+            # Pattern matching only; nothing to wait for
+            return ({entity_type: self._extract_entities_fallback(text, entity_type) for entity_type in entity_types},
+                    {entity_type: 'fallback' for entity_type in entity_types})
+        
+        futures = {entity_type: _model_executor.submit(self._extract_entities_with_status, text, entity_type)
+                   for entity_type in entity_types}
+        wait(futures.values(), timeout=deadline)
+        
+        entities = {}
+        model_status = {}
+        for entity_type, future in futures.items():
+            if future.done():
+                entities[entity_type], model_status[entity_type] = future.result()
+            else:
+                # A call already in flight finishes in the background
+                future.cancel()
+                entities[entity_type] = self._extract_entities_fallback(text, entity_type)
+                model_status[entity_type] = 'timeout'
+        return entities, model_status
+    
+    def _get_drug_db(self) -> DrugDatabase:
+        if self.drug_db is None:
+            from data.database_loader import get_knowledge_base
+            self.drug_db = get_knowledge_base().drug_db
+        return self.drug_db
     
     def _extract_entities_fallback(self, text: str, entity_type: str) -> List[Dict[str, Any]]:
         """Fallback method for entity extraction using pattern matching"""
-        import re
-        
         entities = []
-        text_lower = text.lower()
         
         if entity_type == 'drugs':
-            # Common drug name patterns
-            drug_patterns = [
-                r'\b(?:metformin|lisinopril|atorvastatin|amlodipine|metoprolol|losartan|simvastatin|aspirin|ibuprofen|acetaminophen|warfarin|furosemide|prednisone|omeprazole|levothyroxine|insulin|tramadol|sertraline|fluoxetine|gabapentin|hydrochlorothiazide|albuterol|montelukast|ciprofloxacin|amoxicillin|azithromycin|pantoprazole|citalopram|trazodone|alprazolam|lorazepam|hydrocodone|glipizide|sitagliptin)\b',
-                r'\b\w+(?:in|ol|ide|ine|ate|pam|zole|statin|cillin|mycin|prazole|lol|pine|sartan|ide)\b',
-                r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)?\s+\d+\s*mg\b'
-            ]
+            # Every catalog drug, generic and brand name in one pass
+            for mention in self._get_drug_db().find_drug_mentions(text):
+                entities.append({
+                    'text': mention['text'],
+                    'label': 'DRUG',
+                    'confidence': 0.9,
+                    'start': mention['start'],
+                    'end': mention['end'],
+                    'drug': mention['drug']
+                })
             
-            for pattern in drug_patterns:
-                matches = re.finditer(pattern, text, re.IGNORECASE)
-                for match in matches:
+            # Names outside the catalog are only taken when a strength follows
+            spans = [(entity['start'], entity['end']) for entity in entities]
+            for match in STRENGTH_MENTION_PATTERN.finditer(text):
+                start, end = match.span(1)
+                if not any(start < span_end and span_start < end for span_start, span_end in spans):
                     entities.append({
-                        'text': match.group(),
+                        'text': match.group(1),
                         'label': 'DRUG',
-                        'confidence': 0.85,
-                        'start': match.start(),
-                        'end': match.end()
+                        'confidence': 0.75,
+                        'start': start,
+                        'end': end
                     })
+            entities.sort(key=lambda entity: entity['start'])
         
         elif entity_type == 'diseases':
             # Common medical conditions
-            disease_patterns = [
-                r'\b(?:hypertension|diabetes|depression|anxiety|asthma|copd|arthritis|pneumonia|bronchitis|sinusitis|migraine|insomnia|gerd|ibs|uti|infection)\b',
-                r'\b(?:high blood pressure|type 2 diabetes|heart failure|atrial fibrillation|coronary artery disease)\b'
-            ]
-            
-            for pattern in disease_patterns:
-                matches = re.finditer(pattern, text, re.IGNORECASE)
+            for pattern in DISEASE_PATTERNS:
+                matches = pattern.finditer(text)
                 for match in matches:
                     entities.append({
                         'text': match.group(),
@@ -99,10 +220,11 @@ class NERExtractor:
         
         return entities
     
-    def extract_drug_details(self, text: str) -> Dict[str, List[str]]:
+    def extract_drug_details(self, text: str) -> Dict[str, Any]:
         """Extract detailed drug information from text"""
-        drug_entities = self.extract_entities(text, 'drugs')
-        clinical_entities = self.extract_entities(text, 'clinical')
+        entities, model_status = self.extract_entities_concurrently(text, ['drugs', 'clinical'])
+        drug_entities = entities['drugs']
+        clinical_entities = entities['clinical']
         
         # Combine and categorize entities
         drug_details = {
@@ -140,14 +262,17 @@ class NERExtractor:
                 if text_content not in drug_details['forms']:
                     drug_details['forms'].append(text_content)
         
+        drug_details['model_status'] = model_status
         return drug_details
     
     def analyze_medical_text(self, text: str) -> Dict[str, Any]:
         """Comprehensive analysis of medical text"""
+        entities, model_status = self.extract_entities_concurrently(text, ['drugs', 'diseases', 'clinical'])
         analysis_result = {
-            'drugs': self.extract_entities(text, 'drugs'),
-            'diseases': self.extract_entities(text, 'diseases'),
-            'clinical_info': self.extract_entities(text, 'clinical'),
+            'drugs': entities['drugs'],
+            'diseases': entities['diseases'],
+            'clinical_info': entities['clinical'],
+            'model_status': model_status,
             'summary': {}
         }
         
@@ -160,6 +285,7 @@ class NERExtractor:
             'total_diseases_found': disease_count,
             'confidence_threshold': 0.8,
             'text_length': len(text),
+            'models_timed_out': [entity_type for entity_type, status in model_status.items() if status == 'timeout'],
             'analysis_timestamp': self._get_timestamp()
         }
         
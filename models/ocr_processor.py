@@ -1,5 +1,4 @@
 import os
-import requests
 from PIL import Image
 import streamlit as st
 from typing import Optional, Dict, Any
@@ -8,6 +7,10 @@ import io
 import pytesseract
 import cv2
 import numpy as np
+from models.inference_client import DEFAULT_TIMEOUT, get_inference_client
+
+# Image models take longer to answer than the text models
+OCR_TIMEOUT = (DEFAULT_TIMEOUT[0], 15.0)
 
 class OCRProcessor:
     def __init__(self):
@@ -17,7 +20,7 @@ class OCRProcessor:
         self.minicpm_url = "https://api-inference.huggingface.co/models/openbmb/MiniCPM-o-2_6"
         self.blip_url = "https://api-inference.huggingface.co/models/Salesforce/blip-image-captioning-base"
         self.git_url = "https://api-inference.huggingface.co/models/microsoft/git-base-coco"
-        self.headers = {"Authorization": f"Bearer {self.huggingface_token}"}
+        self.client = get_inference_client()
     
     def process_prescription_image(self, image: Image.Image, ocr_type: str = "printed") -> Dict[str, Any]:
         """Process prescription image and extract text using real OCR"""
@@ -179,11 +182,10 @@ class OCRProcessor:
             
             for api_url, model_name in api_endpoints:
                 try:
-                    response = requests.post(
+                    response = self.client.post(
                         api_url, 
-                        headers=self.headers, 
                         data=img_byte_arr,
-                        timeout=15
+                        timeout=OCR_TIMEOUT
                     )
                     
                     if response.status_code == 200:
@@ -0,0 +1,186 @@
+"""
+Regimen
+Drug list that keeps its interaction findings up to date as drugs are added and removed
+"""
+
+from collections import Counter
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from models.drug_interaction import DrugInteractionChecker
+from models.interaction_store import InteractionRecord
+
+
+class Regimen:
+    """Incrementally checked drug list.
+
+    Every entered drug is an entry with the drug ID it resolves to. Adding a
+    drug only looks up pairs between it and the current entries, walking
+    whichever is smaller of its interaction neighbours and the regimen, so
+    one change costs O(min(degree, regimen size)) instead of a full
+    re-check. Findings are kept per entry pair; removing a drug drops only
+    that entry's findings. If the checker's interactions change, the next
+    read rebuilds the findings once.
+    """
+
+    def __init__(self, checker: DrugInteractionChecker, drugs: Optional[List[str]] = None):
+        self.checker = checker
+        self._revision = checker.revision
+        self._next_entry = 0
+        # entry -> (entered name, drug id)
+        self._entries: Dict[int, Tuple[str, Optional[int]]] = {}
+        # drug id / lowercased name -> entries holding that drug, oldest first
+        self._entries_by_drug: Dict[int, List[int]] = {}
+        self._entries_by_name: Dict[str, List[int]] = {}
+        # (earlier entry, later entry) -> interaction
+        self._findings: Dict[Tuple[int, int], InteractionRecord] = {}
+        self._entry_findings: Dict[int, Set[Tuple[int, int]]] = {}
+        for drug in drugs or []:
+            self.add(drug)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def drugs(self) -> List[str]:
+        """Entered drug names in the order they were added"""
+        return [name for name, _ in self._entries.values()]
+
+    def _link(self, entry: int, other_entry: int, record: InteractionRecord) -> Tuple[int, int]:
+        pair = (other_entry, entry) if other_entry < entry else (entry, other_entry)
+        self._findings[pair] = record
+        self._entry_findings.setdefault(pair[0], set()).add(pair)
+        self._entry_findings.setdefault(pair[1], set()).add(pair)
+        return pair
+
+    def _check_entry(self, entry: int, drug_id: int) -> List[Tuple[int, int]]:
+        """Find the interactions between one entry and the rest of the regimen"""
+        interactions = self.checker.interactions
+        if len(self._entries_by_drug) <= interactions.degree(drug_id):
+            matches = []
+            for other_id in self._entries_by_drug:
+                if other_id != drug_id:
+                    record = interactions.get(drug_id, other_id)
+                    if record is not None:
+                        matches.append((other_id, record))
+        else:
+            matches = [(other_id, record) for other_id, record in interactions.neighbors(drug_id).items()
+                       if other_id in self._entries_by_drug]
+
+        new_pairs = []
+        for other_id, record in matches:
+            for other_entry in self._entries_by_drug[other_id]:
+                if other_entry != entry:
+                    new_pairs.append(self._link(entry, other_entry, record))
+        return sorted(new_pairs)
+
+    def _finding(self, pair: Tuple[int, int]) -> Dict[str, Any]:
+        record = self._findings[pair]
+        return {
+            'drug1': self._entries[pair[0]][0].lower().title(),
+            'drug2': self._entries[pair[1]][0].lower().title(),
+            'severity': record.severity,
+            'description': record.description,
+            'recommendation': record.recommendation
+        }
+
+    def _insert(self, entry: int, drug: str, drug_id: Optional[int]) -> List[Tuple[int, int]]:
+        self._entries[entry] = (drug, drug_id)
+        self._entries_by_name.setdefault(drug.strip().lower(), []).append(entry)
+        if drug_id is None:
+            return []
+        new_pairs = self._check_entry(entry, drug_id)
+        self._entries_by_drug.setdefault(drug_id, []).append(entry)
+        return new_pairs
+
+    def _refresh(self) -> None:
+        """Re-check every entry once the checker's interactions have changed"""
+        if self._revision == self.checker.revision:
+            return
+        self._revision = self.checker.revision
+        entries = list(self._entries.items())
+        self._entries.clear()
+        self._entries_by_drug.clear()
+        self._entries_by_name.clear()
+        self._findings.clear()
+        self._entry_findings.clear()
+        for entry, (drug, drug_id) in entries:
+            self._insert(entry, drug, drug_id)
+
+    def add(self, drug: str) -> List[Dict[str, Any]]:
+        """Add a drug and return the interactions it introduces"""
+        self._refresh()
+        entry = self._next_entry
+        self._next_entry += 1
+        new_pairs = self._insert(entry, drug, self.checker.resolver.resolve(drug))
+        return [self._finding(pair) for pair in new_pairs]
+
+    def remove(self, drug: str) -> List[Dict[str, Any]]:
+        """Remove the most recently added entry of a drug and return the interactions it resolved"""
+        self._refresh()
+        entry = self._find_entry(drug)
+        if entry is None:
+            return []
+        removed = [self._finding(pair) for pair in sorted(self._entry_findings.get(entry, ()))]
+        for pair in self._entry_findings.pop(entry, ()):
+            del self._findings[pair]
+            other_entry = pair[1] if pair[0] == entry else pair[0]
+            self._entry_findings[other_entry].discard(pair)
+
+        name, drug_id = self._entries.pop(entry)
+        for index, key in ((self._entries_by_name, name.strip().lower()), (self._entries_by_drug, drug_id)):
+            if key is None:
+                continue
+            entries = index[key]
+            entries.remove(entry)
+            if not entries:
+                del index[key]
+        return removed
+
+    def _find_entry(self, drug: str) -> Optional[int]:
+        """Find the latest entry with the same name, else the latest with the same drug ID"""
+        entries = self._entries_by_name.get(drug.strip().lower())
+        if entries:
+            return entries[-1]
+        drug_id = self.checker.resolver.resolve(drug)
+        entries = self._entries_by_drug.get(drug_id) if drug_id is not None else None
+        return entries[-1] if entries else None
+
+    def diff(self, drugs: List[str]) -> Tuple[List[str], List[str]]:
+        """Compare with another drug list; returns (names to add, names to remove)"""
+        current = Counter(name.strip().lower() for name in self.drugs)
+        wanted = Counter(name.strip().lower() for name in drugs)
+        to_add = []
+        for name in drugs:
+            key = name.strip().lower()
+            if current[key] > 0:
+                current[key] -= 1
+            else:
+                to_add.append(name)
+        to_remove = []
+        for name in self.drugs:
+            key = name.strip().lower()
+            if wanted[key] > 0:
+                wanted[key] -= 1
+            else:
+                to_remove.append(name)
+        return to_add, to_remove
+
+    def sync(self, drugs: List[str]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Apply the difference to another drug list; returns (added, resolved) interactions"""
+        to_add, to_remove = self.diff(drugs)
+        resolved = []
+        for name in to_remove:
+            resolved.extend(self.remove(name))
+        added = []
+        for name in to_add:
+            added.extend(self.add(name))
+        return added, resolved
+
+    def findings(self) -> List[Dict[str, Any]]:
+        """Current interactions in check_interactions format, in the order drugs were added"""
+        self._refresh()
+        return [self._finding(pair) for pair in sorted(self._findings)]
+
+    def combination_findings(self) -> List[Dict[str, Any]]:
+        """Multi-drug rule findings for the current drugs (see check_multi_drug_interactions)"""
+        return self.checker.check_multi_drug_interactions(self.drugs)
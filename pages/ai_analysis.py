@@ -8,6 +8,7 @@ from models.ner_extractor import NERExtractor
 from data.database_loader import get_drug_alternatives_detailed, initialize_system_database
 import pandas as pd
 import re
+from typing import Optional
 
 def show():
     st.markdown("## 🤖 AI-Powered Medical Analysis")
@@ -18,7 +19,7 @@ def show():
     
     # Initialize NER extractor
     if 'ner_extractor' not in st.session_state:
-        st.session_state.ner_extractor = NERExtractor()
+        st.session_state.ner_extractor = NERExtractor(st.session_state.drug_db)
     
     # Input section
     col1, col2 = st.columns([2, 1])
@@ -106,6 +107,11 @@ def show():
                     }
                 }
                 
+                timed_out = [entity_type for entity_type, status in analysis_result['model_status'].items()
+                             if status == 'timeout']
+                if timed_out:
+                    st.warning(f"The {', '.join(timed_out)} model(s) did not answer in time; "
+                               f"pattern matching results are shown instead.")
                 st.success("Analysis completed!")
         else:
             st.error("Please enter a medical condition or symptoms")
@@ -117,9 +123,10 @@ def show():
 def analyze_medical_text(text: str, ner_extractor: NERExtractor) -> dict:
     """Analyze medical text to extract conditions and symptoms"""
     
-    # Extract diseases and drugs using NER
-    diseases = ner_extractor.extract_entities(text, 'diseases')
-    drugs = ner_extractor.extract_entities(text, 'drugs')
+    # Extract diseases and drugs using NER; both models are queried at once
+    entities, model_status = ner_extractor.extract_entities_concurrently(text, ['diseases', 'drugs'])
+    diseases = entities['diseases']
+    drugs = entities['drugs']
     
     # Extract symptoms using pattern matching
     symptoms = extract_symptoms_from_text(text)
@@ -130,6 +137,7 @@ def analyze_medical_text(text: str, ner_extractor: NERExtractor) -> dict:
     return {
         'diseases': diseases,
         'drugs': drugs,
+        'model_status': model_status,
         'symptoms': symptoms,
         'severity': severity,
         'original_text': text
@@ -189,6 +197,15 @@ def get_drug_recommendations(analysis: dict, age: int, weight: float, history: l
     
     drug_db = st.session_state.drug_db
     
+    # Drugs with a High severity interaction with any current medication,
+    # read once from each medication's interaction neighbourhood
+    high_risk_drugs = set()
+    medications = [med.strip() for med in current_meds if med.strip()]
+    if 'interaction_checker' in st.session_state:
+        for medication in medications:
+            high_risk_drugs.update(interaction['drug'] for interaction in
+                                   st.session_state.interaction_checker.interacting_drugs(medication, 'High'))
+    
     # Map detected diseases to drug categories
     disease_to_drug_mapping = {
         'hypertension': ['amlodipine', 'lisinopril', 'metoprolol', 'losartan'],
@@ -204,6 +221,13 @@ def get_drug_recommendations(analysis: dict, age: int, weight: float, history: l
     # Find relevant drugs based on detected diseases
     detected_conditions = [disease['text'].lower() for disease in analysis['diseases']]
     
+    # Candidate drugs contraindicated by the patient's history, from the condition index
+    candidates = [drug_name for drug_list in disease_to_drug_mapping.values() for drug_name in drug_list]
+    contraindicated = {}
+    for finding in drug_db.check_patient_conditions(candidates, history):
+        if finding['type'] == 'Contraindication':
+            contraindicated.setdefault(finding['drug'], f"{finding['condition']}: {finding['detail']}")
+    
     for condition in detected_conditions:
         for disease_key, drug_list in disease_to_drug_mapping.items():
             if disease_key in condition or condition in disease_key:
@@ -215,7 +239,7 @@ def get_drug_recommendations(analysis: dict, age: int, weight: float, history: l
                         age_info = drug_info.get('age_restrictions', {}).get(age_category, '')
                         
                         # Check for contraindications with current medications
-                        interaction_risk = check_interaction_risk(drug_name, current_meds)
+                        interaction_risk = check_interaction_risk(drug_name, current_meds, high_risk_drugs)
                         
                         recommendation = {
                             'drug_name': drug_name.title(),
@@ -228,6 +252,11 @@ def get_drug_recommendations(analysis: dict, age: int, weight: float, history: l
                             'age_specific_dosing': age_info
                         }
                         
+                        contraindication = contraindicated.get(drug_name.title())
+                        if contraindication is not None:
+                            recommendations['contraindications'].append(f"{drug_name.title()} - {contraindication}")
+                            continue
+                        
                         if recommendation['age_appropriate'] and interaction_risk == 'Low':
                             recommendations['primary_recommendations'].append(recommendation)
                         else:
@@ -245,23 +274,25 @@ def get_drug_recommendations(analysis: dict, age: int, weight: float, history: l
     
     return recommendations
 
-def check_interaction_risk(drug_name: str, current_meds: list) -> str:
-    """Check interaction risk with current medications"""
+def check_interaction_risk(drug_name: str, current_meds: list, high_risk_drugs: Optional[set] = None) -> str:
+    """Check interaction risk with current medications.
+    
+    high_risk_drugs, when given, holds the drug keys with a High severity
+    interaction with the current medications, so the check is a set lookup.
+    """
     
     if not current_meds or 'interaction_checker' not in st.session_state:
         return 'Low'
     
     interaction_checker = st.session_state.interaction_checker
-    high_risk_count = 0
-    
-    for med in current_meds:
-        med = med.strip().lower()
-        if med:
-            interactions = interaction_checker.check_interaction(drug_name.lower(), med)
-            if interactions and any(interaction.get('severity', '').lower() == 'high' for interaction in interactions):
-                high_risk_count += 1
+    if high_risk_drugs is not None:
+        is_high = interaction_checker.resolver.canonical_key(drug_name) in high_risk_drugs
+    else:
+        # Stops at the first High severity interaction with the current medications
+        medications = [med.strip() for med in current_meds if med.strip()]
+        is_high = interaction_checker.any_high(medications, drug=drug_name)
     
-    if high_risk_count > 0:
+    if is_high:
         return 'High'
     elif len(current_meds) > 3:
         return 'Moderate'
@@ -360,6 +391,13 @@ def display_ai_analysis_results():
         for requirement in recommendations['monitoring_requirements']:
             st.info(f"ℹ️ {requirement}")
     
+    # Candidates excluded by the patient's medical history
+    if recommendations['contraindications']:
+        st.markdown("### ⛔ Contraindicated for This Patient")
+        
+        for contraindication in recommendations['contraindications']:
+            st.error(contraindication)
+    
     # Patient-specific warnings
     st.markdown("### ⚠️ Patient-Specific Considerations")
     
@@ -1,5 +1,4 @@
 import streamlit as st
-from data.drug_database import DrugDatabase
 from data.database_loader import get_drug_alternatives_detailed, initialize_system_database
 from models.ner_extractor import NERExtractor
 import pandas as pd
@@ -12,11 +11,8 @@ def show():
     initialize_system_database()
     
     # Initialize models
-    if 'drug_database' not in st.session_state:
-        st.session_state.drug_database = DrugDatabase()
-    
     if 'ner_extractor' not in st.session_state:
-        st.session_state.ner_extractor = NERExtractor()
+        st.session_state.ner_extractor = NERExtractor(st.session_state.drug_db)
     
     # Input section
     col1, col2 = st.columns([2, 1])
@@ -56,12 +52,21 @@ def show():
             height=80,
             key="alternative_allergies"
         )
+        
+        # Current medications; interacting alternatives are excluded
+        current_medications = st.text_area(
+            "Current medications (comma-separated)",
+            placeholder="e.g., Warfarin, Sertraline",
+            height=80,
+            key="alternative_current_medications"
+        )
     
     # Search button
     if st.button("🔍 Find Detailed Alternatives", type="primary", disabled=not drug_search):
         with st.spinner("Finding comprehensive alternatives..."):
             # Get detailed alternatives from comprehensive database
-            detailed_alternatives = get_drug_alternatives_detailed(drug_search)
+            medications = [m.strip() for m in current_medications.split(',') if m.strip()]
+            detailed_alternatives = get_drug_alternatives_detailed(drug_search, medications)
             
             if 'error' not in detailed_alternatives:
                 st.session_state.alternative_results = detailed_alternatives
@@ -172,6 +177,13 @@ def show():
                     else:
                         st.info(f"ℹ️ **Age Consideration:** {age_info}")
         
+        # Alternatives left out because they interact with current medications
+        if results.get('excluded_alternatives'):
+            st.markdown("### 🚫 Excluded Due to Interactions")
+            for excluded in results['excluded_alternatives']:
+                st.warning(f"**{excluded['name']}** interacts with {excluded['interacts_with']} "
+                           f"({excluded['severity']} severity): {excluded['description']}")
+        
         # Summary recommendations
         st.markdown("### 📊 Clinical Summary")
         col1, col2 = st.columns(2)
@@ -243,7 +255,7 @@ def show():
     
     if condition_search:
         with st.spinner("Searching drugs for condition..."):
-            condition_drugs = st.session_state.drug_database.search_drugs(condition_search)
+            condition_drugs = st.session_state.drug_db.search_drugs(condition_search)
             
             if condition_drugs:
                 st.success(f"Found {len(condition_drugs)} drugs for '{condition_search}':")
@@ -252,7 +264,7 @@ def show():
                 cols = st.columns(min(len(condition_drugs), 4))
                 for i, drug in enumerate(condition_drugs):
                     with cols[i % 4]:
-                        drug_info = st.session_state.drug_database.get_drug_info(drug)
+                        drug_info = st.session_state.drug_db.get_drug_info(drug)
                         category = drug_info.get('category', 'Unknown') if drug_info else 'Unknown'
                         st.info(f"**{drug.title()}**\n{category}")
     
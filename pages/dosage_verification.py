@@ -1,17 +1,17 @@
 import streamlit as st
 from utils.dosage_calculator import DosageCalculator
-from data.drug_database import DrugDatabase
+from data.database_loader import initialize_system_database
 import pandas as pd
 
 def show():
     st.markdown("## 💊 Enhanced Dosage Verification & Calculation")
     
+    # Shared comprehensive database
+    initialize_system_database()
+    
     # Initialize models
     if 'dosage_calculator' not in st.session_state:
-        st.session_state.dosage_calculator = DosageCalculator()
-    
-    if 'drug_database' not in st.session_state:
-        st.session_state.drug_database = DrugDatabase()
+        st.session_state.dosage_calculator = DosageCalculator(resolver=st.session_state.drug_db.resolver)
     
     # Create columns
     col1, col2 = st.columns([1, 1])
@@ -91,7 +91,7 @@ def show():
         st.markdown("### 💊 Drug Information")
         
         # Drug Name
-        available_drugs = st.session_state.drug_database.get_all_drugs()
+        available_drugs = st.session_state.drug_db.get_all_drugs()
         drug_name = st.selectbox(
             "Drug Name",
             [""] + [drug.title() for drug in available_drugs],
@@ -130,7 +130,7 @@ def show():
         # Medical Conditions
         medical_conditions = st.multiselect(
             "Medical Conditions",
-            st.session_state.drug_database.get_medical_conditions(),
+            st.session_state.drug_db.get_medical_conditions(),
             key="dosage_medical_conditions"
         )
     
@@ -162,6 +162,14 @@ def show():
                 patient_weight
             )
             
+            # Patient conditions that contraindicate the drug
+            for finding in st.session_state.drug_db.check_patient_conditions([drug_name], medical_conditions):
+                if finding['type'] == 'Contraindication':
+                    verification_result['is_appropriate'] = False
+                    verification_result['warnings'].append(
+                        f"Contraindicated in {finding['condition']} ({finding['detail']})"
+                    )
+            
             st.session_state.dosage_verification_result = verification_result
     
     # Display Verification Results
@@ -220,6 +228,11 @@ def show():
                 patient_weight,
                 medical_conditions
             )
+            recommendation['contraindications'] = [
+                f"{finding['condition']}: {finding['detail']}"
+                for finding in st.session_state.drug_db.check_patient_conditions([drug_name], medical_conditions)
+                if finding['type'] == 'Contraindication'
+            ]
             
             st.session_state.dosage_recommendation = recommendation
     
@@ -254,7 +267,7 @@ def show():
     
     # Drug Information Display
     if drug_name:
-        drug_info = st.session_state.drug_database.get_drug_info(drug_name.lower())
+        drug_info = st.session_state.drug_db.get_drug_info(drug_name.lower())
         if drug_info:
             with st.expander(f"📚 {drug_name} - Drug Information"):
                 col1, col2 = st.columns(2)
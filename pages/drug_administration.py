@@ -1,18 +1,15 @@
 import streamlit as st
 import json
+import pandas as pd
 from typing import Dict, Any, List
-from data.drug_database import DrugDatabase
-from models.drug_interaction import DrugInteractionChecker
+from data.database_loader import initialize_system_database
 
 def show_drug_administration():
     st.title("🔧 Drug Database Administration")
     st.markdown("Add and manage drugs, interactions, and alternatives in the system database")
     
-    # Initialize components
-    if 'drug_db' not in st.session_state:
-        st.session_state.drug_db = DrugDatabase()
-    if 'interaction_checker' not in st.session_state:
-        st.session_state.interaction_checker = DrugInteractionChecker()
+    # Initialize components (shared by all sessions)
+    initialize_system_database()
     
     tab1, tab2, tab3, tab4 = st.tabs(["📊 Database Stats", "💊 Add Drugs", "⚠️ Add Interactions", "📋 Bulk Import"])
     
@@ -48,6 +45,27 @@ def show_database_stats():
     with col4:
         st.metric("Medical Conditions", drug_stats['total_conditions'])
     
+    class_rule_report = st.session_state.interaction_checker.class_rule_report
+    if class_rule_report:
+        with st.expander(f"Class Interaction Rules ({interaction_stats['class_rule_pairs']} drug pairs added)"):
+            st.dataframe(pd.DataFrame(
+                [{'Rule': name, 'Drug Pairs': pairs} for name, pairs in class_rule_report.items()]
+            ), use_container_width=True)
+    
+    mechanism_report = st.session_state.interaction_checker.mechanism_report
+    if mechanism_report:
+        with st.expander(f"Enzyme Mechanism Inferences ({interaction_stats['mechanism_pairs']} drug pairs added)"):
+            st.dataframe(pd.DataFrame(
+                [{'Enzyme': enzyme, 'Drug Pairs': pairs} for enzyme, pairs in mechanism_report.items()]
+            ), use_container_width=True)
+
+    multi_drug_report = st.session_state.interaction_checker.multi_drug_report
+    if multi_drug_report:
+        with st.expander(f"Multi-Drug Rules ({interaction_stats['multi_drug_rules']} active)"):
+            st.dataframe(pd.DataFrame(
+                [{'Rule': name, 'Member Drugs': members} for name, members in multi_drug_report.items()]
+            ), use_container_width=True)
+
     st.subheader("Current Drugs in Database")
     drugs_list = st.session_state.drug_db.get_all_drugs()
     if drugs_list:
@@ -1,17 +1,18 @@
 import streamlit as st
-from models.drug_interaction import DrugInteractionChecker
+from data.database_loader import initialize_system_database
 from models.ner_extractor import NERExtractor
+from models.regimen import Regimen
 import pandas as pd
 
 def show():
     st.markdown("## 🔍 Drug Interaction Detection")
     
-    # Initialize models
-    if 'drug_checker' not in st.session_state:
-        st.session_state.drug_checker = DrugInteractionChecker()
+    # Initialize comprehensive database
+    initialize_system_database()
     
+    # Initialize models
     if 'ner_extractor' not in st.session_state:
-        st.session_state.ner_extractor = NERExtractor()
+        st.session_state.ner_extractor = NERExtractor(st.session_state.drug_db)
     
     # Create two columns
     col1, col2 = st.columns([1, 1])
@@ -65,17 +66,29 @@ def show():
                 if drugs_to_check:
                     st.success(f"Extracted drugs: {', '.join(drugs_to_check)}")
         
+        # Keep the session regimen in step with the entered drugs; each rerun
+        # only checks the drugs that were added or removed
+        if ('regimen' not in st.session_state
+                or st.session_state.regimen.checker is not st.session_state.interaction_checker):
+            st.session_state.regimen = Regimen(st.session_state.interaction_checker)
+        regimen = st.session_state.regimen
+        regimen.sync(drugs_to_check)
+        
         # Check interactions button
         if st.button("Check Drug Interactions", type="primary", disabled=len(drugs_to_check) < 2):
             if len(drugs_to_check) < 2:
                 st.warning("Please enter at least 2 drugs to check for interactions.")
             else:
                 with st.spinner("Checking for drug interactions..."):
-                    # Check for interactions
-                    interactions = st.session_state.drug_checker.check_interactions(drugs_to_check)
+                    # Findings are already up to date for the entered drugs
+                    interactions = regimen.findings()
                     
                     # Store results in session state
                     st.session_state.interaction_results = interactions
+                    st.session_state.combination_results = regimen.combination_findings()
+                    st.session_state.duplication_results = st.session_state.drug_db.find_therapeutic_duplications(
+                        drugs_to_check
+                    )
                     st.session_state.checked_drugs = drugs_to_check
     
     with col2:
@@ -103,15 +116,22 @@ def show():
         # Existing conditions
         existing_conditions = st.multiselect(
             "Existing Conditions",
-            options=[
-                "Hypertension", "Diabetes Type 2", "Hyperlipidemia",
-                "Atrial Fibrillation", "Coronary Artery Disease", "Heart Failure",
-                "Chronic Kidney Disease", "Osteoarthritis", "Depression",
-                "Anxiety", "COPD", "Asthma", "Hypothyroidism", "GERD"
-            ],
+            options=st.session_state.drug_db.get_medical_conditions(),
             key="existing_conditions"
         )
     
+    # Contraindications and precautions for the patient's conditions
+    condition_findings = st.session_state.drug_db.check_patient_conditions(drugs_to_check, existing_conditions)
+    if condition_findings:
+        st.markdown("---")
+        st.markdown("## 🩺 Patient Condition Alerts")
+        for finding in condition_findings:
+            message = f"**{finding['drug']}** - {finding['condition']}: {finding['detail']}"
+            if finding['type'] == 'Contraindication':
+                st.error(f"⛔ Contraindicated: {message}")
+            else:
+                st.info(f"ℹ️ Precaution: {message}")
+    
     # Display results
     if hasattr(st.session_state, 'interaction_results') and st.session_state.interaction_results:
         st.markdown("---")
@@ -147,12 +167,36 @@ def show():
         else:
             st.success("✅ No known interactions found between the specified drugs.")
     
+    # Hazards that need three or more drugs together
+    if st.session_state.get('combination_results'):
+        st.markdown("---")
+        st.markdown("## ⚠️ Multi-Drug Combination Hazards")
+        
+        for combination in st.session_state.combination_results:
+            severity_color = "🔴" if combination['severity'] == 'High' else "🟡"
+            
+            with st.expander(f"{severity_color} {combination['rule']}: {' + '.join(combination['drugs'])}"):
+                st.write(f"**Description:** {combination['description']}")
+                st.write(f"**Recommendation:** {combination['recommendation']}")
+    
+    # Same-class drugs entered together
+    if st.session_state.get('duplication_results'):
+        st.markdown("---")
+        st.markdown("## 📑 Therapeutic Duplication")
+        
+        for duplication in st.session_state.duplication_results:
+            if len(duplication['drugs']) > 1:
+                st.warning(f"**{' + '.join(duplication['drugs'])}**: multiple drugs from the same class "
+                           f"({duplication['category']}); confirm the duplication is intended")
+            for names in duplication['repeated']:
+                st.warning(f"**{' + '.join(names)}**: the same drug appears more than once ({duplication['category']})")
+    
     # Individual drug analysis
     if hasattr(st.session_state, 'checked_drugs') and st.session_state.checked_drugs:
         st.markdown("---")
         st.markdown("## 💊 Individual Drug Analysis")
         
-        drug_info = st.session_state.drug_checker.analyze_individual_drugs(st.session_state.checked_drugs)
+        drug_info = st.session_state.interaction_checker.analyze_individual_drugs(st.session_state.checked_drugs)
         
         for drug in drug_info:
             with st.expander(f"📋 {drug['name']} - {drug['category']}"):
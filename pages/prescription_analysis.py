@@ -1,6 +1,7 @@
 import streamlit as st
 from models.ocr_processor import OCRProcessor
 from models.ner_extractor import NERExtractor
+from data.database_loader import initialize_system_database
 from PIL import Image
 import pandas as pd
 
@@ -8,12 +9,15 @@ def show():
     st.markdown("## 📄 Prescription Image Analysis")
     st.markdown("Upload a prescription image to extract drug names and check for interactions")
     
+    # Shared comprehensive database
+    initialize_system_database()
+    
     # Initialize models
     if 'ocr_processor' not in st.session_state:
         st.session_state.ocr_processor = OCRProcessor()
     
     if 'ner_extractor' not in st.session_state:
-        st.session_state.ner_extractor = NERExtractor()
+        st.session_state.ner_extractor = NERExtractor(st.session_state.drug_db)
     
     # Create columns
     col1, col2 = st.columns([1, 1])
@@ -121,6 +125,9 @@ def show():
         
         # Summary metrics
         summary = analysis['summary']
+        if summary.get('models_timed_out'):
+            st.warning(f"The {', '.join(summary['models_timed_out'])} model(s) did not answer in time; "
+                       f"pattern matching results are shown instead.")
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
@@ -137,8 +144,25 @@ def show():
             st.markdown("### 💊 Detected Drugs")
             drug_entities = st.session_state.ner_extractor.format_entities_for_display(analysis['drugs'])
             if drug_entities:
+                # OCR output is often misspelled; match it against the catalog
+                for drug_entity in drug_entities:
+                    matches = st.session_state.drug_db.resolve_fuzzy(drug_entity['Entity'], limit=1)
+                    if matches:
+                        drug_entity['Catalog Match'] = matches[0]['drug'].replace('_', ' ').title()
+                        drug_entity['Edit Distance'] = matches[0]['distance']
+                    else:
+                        drug_entity['Catalog Match'] = 'Not found'
+                        drug_entity['Edit Distance'] = None
                 df_drugs = pd.DataFrame(drug_entities)
                 st.dataframe(df_drugs, use_container_width=True)
+                
+                # Two statins or two PPIs on one prescription are easy to miss; a
+                # drug mentioned twice, or by brand and generic name, is not a duplication
+                matched_drugs = list(dict.fromkeys(drug_entity['Catalog Match'] for drug_entity in drug_entities
+                                                   if drug_entity['Catalog Match'] != 'Not found'))
+                for duplication in st.session_state.drug_db.find_therapeutic_duplications(matched_drugs):
+                    st.warning(f"⚠️ **Therapeutic duplication ({duplication['category']}):** "
+                               f"{' + '.join(duplication['drugs'])}")
         
         # Diseases section
         if analysis['diseases']:
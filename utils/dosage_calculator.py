@@ -1,8 +1,13 @@
-from typing import Dict, Any, Tuple, List
+from typing import Dict, Any, Tuple, List, Optional
 import re
+from data.conditions import condition_warnings, normalize_conditions
+from data.name_resolver import DrugNameResolver
 
 class DosageCalculator:
-    def __init__(self):
+    def __init__(self, resolver: Optional[DrugNameResolver] = None):
+        # Resolves brand, salt and formulation names to the guideline keys
+        self.resolver = resolver if resolver is not None else DrugNameResolver()
+        
         # Age categories
         self.age_categories = {
             'pediatric': (0, 17),
@@ -100,7 +105,7 @@ class DosageCalculator:
     def verify_dosage(self, drug_name: str, dosage: str, patient_age: int, 
                      patient_weight: float = 70.0) -> Dict[str, Any]:
         """Verify if prescribed dosage is appropriate for patient"""
-        drug_key = drug_name.lower().strip()
+        drug_key = self.resolver.canonical_key(drug_name)
         age_category = self.calculate_age_category(patient_age)
         parsed_dosage = self.parse_dosage(dosage)
         
@@ -160,7 +165,7 @@ class DosageCalculator:
     def calculate_recommended_dosage(self, drug_name: str, patient_age: int, 
                                    patient_weight: float, medical_conditions: List[str] = []) -> Dict[str, Any]:
         """Calculate recommended dosage based on patient parameters"""
-        drug_key = drug_name.lower().strip()
+        drug_key = self.resolver.canonical_key(drug_name)
         age_category = self.calculate_age_category(patient_age)
         
         recommendation = {
@@ -217,36 +222,4 @@ class DosageCalculator:
     
     def _get_condition_warnings(self, drug_name: str, conditions: List[str]) -> List[str]:
         """Get warnings based on patient's medical conditions"""
-        warnings = []
-        condition_lower = [c.lower() for c in conditions]
-        
-        condition_warnings = {
-            'aspirin': {
-                'chronic kidney disease': 'Use with caution, monitor renal function',
-                'heart failure': 'Monitor for fluid retention',
-                'gerd': 'Increased risk of GI bleeding'
-            },
-            'metformin': {
-                'chronic kidney disease': 'Contraindicated if eGFR <30, use caution if eGFR 30-45',
-                'heart failure': 'Monitor for lactic acidosis risk'
-            },
-            'lisinopril': {
-                'chronic kidney disease': 'Monitor renal function and potassium',
-                'diabetes type 2': 'Beneficial for renal protection'
-            },
-            'warfarin': {
-                'atrial fibrillation': 'Indicated for stroke prevention',
-                'chronic kidney disease': 'Monitor INR more frequently'
-            },
-            'simvastatin': {
-                'diabetes type 2': 'Monitor for increased glucose levels',
-                'chronic kidney disease': 'Use with caution in severe impairment'
-            }
-        }
-        
-        drug_warnings = condition_warnings.get(drug_name, {})
-        for condition, warning in drug_warnings.items():
-            if any(condition in c for c in condition_lower):
-                warnings.append(warning)
-        
-        return warnings
+        return condition_warnings(drug_name, normalize_conditions(conditions))